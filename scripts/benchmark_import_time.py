@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Measure the cold-start import cost of each pipeline entry script.
+
+Every measurement runs in a fresh interpreter and loads the entry script's
+module-level code (its imports) without calling ``main()``.  The "eager" column
+additionally imports the plotting/modeling stack up front, which is what every
+entry script paid before the pipelines package switched to lazy imports.
+
+Usage
+-----
+python scripts/benchmark_import_time.py [--repeats 5] [--json output/import_times.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+ENTRY_SCRIPTS = [
+    "run_week1_pipeline.py",
+    "run_week2_pipeline.py",
+    "run_week3_pipeline.py",
+    "run_all_pipelines.py",
+]
+
+HEAVY_MODULES = [
+    "matplotlib.pyplot",
+    "seaborn",
+    "scipy.stats",
+    "sklearn.ensemble",
+    "sklearn.metrics",
+    "sklearn.model_selection",
+]
+
+PROBE = """
+import importlib, json, runpy, sys, time
+start = time.perf_counter()
+if {eager}:
+    for name in {heavy!r}:
+        importlib.import_module(name)
+runpy.run_path({script!r}, run_name="__benchmark__")
+elapsed = time.perf_counter() - start
+loaded = [name for name in ("matplotlib", "seaborn", "scipy", "sklearn") if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure(script: Path, eager: bool) -> dict:
+    code = PROBE.format(eager=eager, heavy=HEAVY_MODULES, script=str(script))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark(repeats: int) -> list[dict]:
+    rows = []
+    for name in ENTRY_SCRIPTS:
+        script = PROJECT_ROOT / "scripts" / name
+        lazy_runs = [measure(script, eager=False) for _ in range(repeats)]
+        eager_runs = [measure(script, eager=True) for _ in range(repeats)]
+        lazy = statistics.median(run["seconds"] for run in lazy_runs)
+        eager = statistics.median(run["seconds"] for run in eager_runs)
+        rows.append(
+            {
+                "script": name,
+                "lazy_seconds": round(lazy, 4),
+                "eager_seconds": round(eager, 4),
+                "saved_seconds": round(eager - lazy, 4),
+                "speedup": round(eager / lazy, 2) if lazy > 0 else None,
+                "heavy_modules_loaded": lazy_runs[-1]["loaded"],
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark entry-script import time.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--json", type=Path, default=None, help="Optional JSON output path.")
+    args = parser.parse_args()
+
+    rows = benchmark(args.repeats)
+    print(f"{'script':<24} {'lazy (s)':>9} {'eager (s)':>10} {'speedup':>8}  heavy modules loaded")
+    for row in rows:
+        loaded = ", ".join(row["heavy_modules_loaded"]) or "-"
+        print(
+            f"{row['script']:<24} {row['lazy_seconds']:>9.3f} {row['eager_seconds']:>10.3f} "
+            f"{row['speedup']:>7.1f}x  {loaded}"
+        )
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
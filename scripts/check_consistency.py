@@ -5,32 +5,55 @@ DataLynn 数据清洗一致性检查脚本
 
 用途：验证 Meta、Google、TikTok 三平台的数据清洗是否保持一致
 
-检查项：
+检查项（规则定义见 src/pipelines/validation.py，每个文件只读取一次）：
 1. 字段名是否一致
-2. 计算公式是否一致
-3. CTR/CVR 值范围是否合理（应在0-1之间）
-4. 是否有无穷大值（除零错误未处理）
+2. 数据类型是否为数字
+3. CTR/CVR 值范围是否合理（应在0-1之间），指标非负
+4. 是否有无穷大值（除零错误未处理）、关键字段是否缺失
+5. 重复行、spend / conversions ≈ cpa 恒等式（警告，不影响退出码）
 
 使用方法：
-    python scripts/check_consistency.py
+    python scripts/check_consistency.py [--report output/reports/data_quality_report.json]
 
 输出：
     - 检查通过：✅ All checks passed
     - 检查失败：❌ Consistency check failed（并列出具体问题）
+    - 机器可读报告：JSON，包含每条规则的违规行数
 """
 
-import pandas as pd
-import numpy as np
+import argparse
 import sys
 from pathlib import Path
 
+import pandas as pd
+
 # 定义项目根目录（相对于脚本位置）
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.pipelines.validation import DEFAULT_RULES, validate_frames  # noqa: E402
 
 # 定义数据文件路径
 META_FILE = PROJECT_ROOT / "data/processed/meta_cleaned.csv"
 GOOGLE_FILE = PROJECT_ROOT / "data/processed/google_cleaned.csv"
 TIKTOK_FILE = PROJECT_ROOT / "data/processed/tiktok_cleaned.csv"
+REPORT_FILE = PROJECT_ROOT / "output/reports/data_quality_report.json"
+
+FILES = {
+    "Meta": META_FILE,
+    "Google": GOOGLE_FILE,
+    "TikTok": TIKTOK_FILE,
+}
+
+# 规则类型 → 汇总中的检查项名称
+CHECK_GROUPS = [
+    ("字段名一致性", {"required_columns"}),
+    ("数据类型检查", {"numeric"}),
+    ("值范围检查", {"range"}),
+    ("无穷大值/空值检查", {"finite", "not_null"}),
+    ("重复行与恒等式检查", {"unique", "identity"}),
+]
 
 
 def check_file_exists():
@@ -38,14 +61,8 @@ def check_file_exists():
     print("\n🔍 Step 1: 检查文件是否存在")
     print("-" * 50)
 
-    files = {
-        "Meta": META_FILE,
-        "Google": GOOGLE_FILE,
-        "TikTok": TIKTOK_FILE
-    }
-
     all_exist = True
-    for platform, file_path in files.items():
+    for platform, file_path in FILES.items():
         if file_path.exists():
             print(f"✅ {platform}: {file_path}")
         else:
@@ -55,162 +72,59 @@ def check_file_exists():
     return all_exist
 
 
-def check_columns_consistency():
-    """检查三平台的必需字段是否一致"""
-    print("\n🔍 Step 2: 检查字段名一致性")
-    print("-" * 50)
-
-    # 必需字段（所有平台必须包含）
-    required_columns = [
-        'date',
-        'platform',
-        'campaign_name',
-        'spend',
-        'impressions',
-        'clicks',
-        'conversions',
-        'revenue',
-        'ctr',
-        'cvr',
-        'cpa',
-        'roas'
-    ]
-
-    try:
-        df_meta = pd.read_csv(META_FILE)
-        df_google = pd.read_csv(GOOGLE_FILE)
-        df_tiktok = pd.read_csv(TIKTOK_FILE)
-    except Exception as e:
-        print(f"❌ 读取文件失败: {e}")
-        return False
-
-    # 检查每个平台是否包含所有必需字段
-    all_consistent = True
-
-    for platform, df in [("Meta", df_meta), ("Google", df_google), ("TikTok", df_tiktok)]:
-        missing = [col for col in required_columns if col not in df.columns]
-        if missing:
-            print(f"❌ {platform} 缺少字段: {missing}")
-            all_consistent = False
-        else:
-            print(f"✅ {platform}: 包含所有必需字段")
-
-    return all_consistent
-
-
-def check_value_ranges():
-    """检查 CTR、CVR 值范围是否合理"""
-    print("\n🔍 Step 3: 检查 CTR/CVR 值范围")
-    print("-" * 50)
-
-    try:
-        df_meta = pd.read_csv(META_FILE)
-        df_google = pd.read_csv(GOOGLE_FILE)
-        df_tiktok = pd.read_csv(TIKTOK_FILE)
-    except Exception as e:
-        print(f"❌ 读取文件失败: {e}")
-        return False
-
-    all_valid = True
-
-    for platform, df in [("Meta", df_meta), ("Google", df_google), ("TikTok", df_tiktok)]:
-        # 检查 CTR（应该在0-1之间，除了 NaN）
-        if 'ctr' in df.columns:
-            invalid_ctr = df[(df['ctr'] < 0) | (df['ctr'] > 1)].shape[0]
-            if invalid_ctr > 0:
-                print(f"⚠️ {platform}: {invalid_ctr} 行 CTR 超出范围 [0, 1]")
-                all_valid = False
-            else:
-                print(f"✅ {platform}: CTR 值范围正常")
-
-        # 检查 CVR（应该在0-1之间，除了 NaN）
-        if 'cvr' in df.columns:
-            invalid_cvr = df[(df['cvr'] < 0) | (df['cvr'] > 1)].shape[0]
-            if invalid_cvr > 0:
-                print(f"⚠️ {platform}: {invalid_cvr} 行 CVR 超出范围 [0, 1]")
-                all_valid = False
-            else:
-                print(f"✅ {platform}: CVR 值范围正常")
-
-    return all_valid
-
-
-def check_infinity_values():
-    """检查是否有无穷大值（除零错误未处理）"""
-    print("\n🔍 Step 4: 检查无穷大值（除零错误）")
-    print("-" * 50)
-
-    try:
-        df_meta = pd.read_csv(META_FILE)
-        df_google = pd.read_csv(GOOGLE_FILE)
-        df_tiktok = pd.read_csv(TIKTOK_FILE)
-    except Exception as e:
-        print(f"❌ 读取文件失败: {e}")
-        return False
-
-    columns_to_check = ['ctr', 'cvr', 'cpa', 'roas']
-    all_clean = True
-
-    for platform, df in [("Meta", df_meta), ("Google", df_google), ("TikTok", df_tiktok)]:
-        for col in columns_to_check:
-            if col in df.columns:
-                inf_count = np.isinf(df[col]).sum()
-                if inf_count > 0:
-                    print(f"❌ {platform}.{col}: 发现 {inf_count} 个无穷大值（除零错误未处理）")
-                    all_clean = False
-
-        if all_clean:
-            print(f"✅ {platform}: 无无穷大值")
-
-    return all_clean
+def load_frames():
+    """每个文件只读取一次"""
+    frames = {}
+    for platform, file_path in FILES.items():
+        try:
+            frames[platform] = pd.read_csv(file_path)
+        except Exception as e:
+            print(f"❌ 读取 {platform} 文件失败: {e}")
+    return frames
 
 
-def check_data_types():
-    """检查数据类型是否正确"""
-    print("\n🔍 Step 5: 检查数据类型")
+def print_group(step, title, kinds, report):
+    """打印一组规则的结果，返回该组是否通过（警告不算失败）"""
+    print(f"\n🔍 Step {step}: {title}")
     print("-" * 50)
 
-    try:
-        df_meta = pd.read_csv(META_FILE)
-        df_google = pd.read_csv(GOOGLE_FILE)
-        df_tiktok = pd.read_csv(TIKTOK_FILE)
-    except Exception as e:
-        print(f"❌ 读取文件失败: {e}")
-        return False
+    passed = True
+    for result in report.results:
+        if result.kind not in kinds:
+            continue
+        target = f"{result.dataset} [{result.rule}]"
+        if result.passed:
+            print(f"✅ {target}: 通过")
+            continue
+        icon = "❌" if result.severity == "error" else "⚠️"
+        problem = f"{result.offending_rows} 行违规" if result.offending_rows else result.detail
+        print(f"{icon} {target}: {problem}（列: {', '.join(result.columns) or '全部'}）")
+        if result.severity == "error":
+            passed = False
 
-    # 应该是数字类型的字段
-    numeric_columns = ['spend', 'impressions', 'clicks', 'conversions', 'revenue',
-                       'ctr', 'cvr', 'cpa', 'roas']
-
-    all_correct = True
-
-    for platform, df in [("Meta", df_meta), ("Google", df_google), ("TikTok", df_tiktok)]:
-        for col in numeric_columns:
-            if col in df.columns:
-                if not pd.api.types.is_numeric_dtype(df[col]):
-                    print(f"❌ {platform}.{col}: 数据类型应为数字，实际为 {df[col].dtype}")
-                    all_correct = False
-
-        if all_correct:
-            print(f"✅ {platform}: 所有数字字段类型正确")
-
-    return all_correct
+    return passed
 
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="DataLynn 数据清洗一致性检查")
+    parser.add_argument("--report", type=Path, default=REPORT_FILE, help="JSON 报告输出路径")
+    args = parser.parse_args()
+
     print("=" * 50)
     print("DataLynn 数据清洗一致性检查")
     print("=" * 50)
 
-    # 执行所有检查
-    checks = [
-        ("文件存在检查", check_file_exists()),
-        ("字段名一致性", check_columns_consistency()),
-        ("值范围检查", check_value_ranges()),
-        ("无穷大值检查", check_infinity_values()),
-        ("数据类型检查", check_data_types())
-    ]
+    files_ok = check_file_exists()
+    frames = load_frames()
+    checks = [("文件存在检查", files_ok and len(frames) == len(FILES))]
+
+    report = validate_frames(frames, DEFAULT_RULES)
+    for step, (title, kinds) in enumerate(CHECK_GROUPS, start=2):
+        checks.append((title, print_group(step, title, kinds, report)))
+
+    report.write_json(args.report)
+    print(f"\n📄 机器可读报告: {args.report}")
 
     # 汇总结果
     print("\n" + "=" * 50)
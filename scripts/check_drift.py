@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Report feature drift since the Week 2 model was trained.
+
+Usage
+-----
+python scripts/check_drift.py [--min-drifted 1] [--min-days 14] [--reset]
+
+Reads the drift monitor saved by `scripts/run_week2_pipeline.py` and fed by
+`scripts/update_feature_state.py --drift`, prints PSI/KS of the live window per
+feature against the training sketches and writes them to
+`output/reports/drift_report.csv`.  A feature has drifted when its PSI exceeds
+both 0.25 and the largest PSI any window inside the training period reached.  Exits with status 1 when a retrain
+is recommended so schedulers can chain `run_week2_pipeline.py` on failure.
+`--reset` clears the live rows (e.g. after retraining by other means).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.pipelines.drift import DriftMonitor  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Week 2 feature drift report.")
+    parser.add_argument("--monitor", type=Path, default=PROJECT_ROOT / "output" / "models" / "drift_monitor.json")
+    parser.add_argument("--report", type=Path, default=PROJECT_ROOT / "output" / "reports" / "drift_report.csv")
+    parser.add_argument("--min-drifted", type=int, default=1, help="Drifted features needed to retrain.")
+    parser.add_argument("--min-days", type=int, default=None, help="Live days needed before deciding.")
+    parser.add_argument("--reset", action="store_true", help="Clear live rows and exit.")
+    args = parser.parse_args()
+
+    monitor = DriftMonitor.load(args.monitor)
+    if args.reset:
+        monitor.reset()
+        monitor.save(args.monitor)
+        print(f"Cleared live rows in {args.monitor}")
+        return
+
+    report = monitor.report()
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(args.report, index=False)
+
+    retrain, drifted = monitor.should_retrain(min_drifted=args.min_drifted, min_days=args.min_days)
+    span = f"{monitor.live_dates[0]} – {monitor.live_dates[-1]}" if monitor.live_dates else "no dates"
+    print(f"Model trained through {monitor.trained_at}; {monitor.live_rows} live rows ({span}).")
+    print(report.head(10).to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    print(f"Report saved to: {args.report}")
+    if retrain:
+        print(f"Retrain recommended: {', '.join(drifted)}")
+        sys.exit(1)
+    print("No retrain needed.")
+
+
+if __name__ == "__main__":
+    main()
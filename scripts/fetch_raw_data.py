@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Download the platform reports into `data/raw/` concurrently.
+
+Usage
+-----
+python scripts/fetch_raw_data.py --base-url https://ads-gateway.example.com [--start 2024-12-30 --end 2024-12-30]
+python scripts/fetch_raw_data.py --mock [--mock-latency 0.05] [--mock-rate-limit 20] [--out data/raw_fetched]
+
+All platforms are fetched at once over a shared keep-alive connection pool;
+pages are requested concurrently and written in order, and 429 responses are
+retried after `Retry-After` (see `src/pipelines/ingestion.py`).  The token in
+`DATALYNN_API_TOKEN`, if set, is sent as a bearer token.
+
+`--mock` starts `MockAdsAPI` on a local port, serving the exports currently in
+`data/raw/` (as written by `scripts/generate_raw_data.py`), and fetches from it
+into `data/raw_fetched/` (never into `data/raw/`, which would rewrite the
+exports being served and invalidate the Week 1 stage cache); use it to
+exercise the client without API credentials.  `--connections 1`
+reproduces the old one-request-at-a-time behaviour for comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.pipelines.ingestion import DEFAULT_PLATFORMS, FetchConfig, ingest  # noqa: E402
+from src.pipelines.mock_ads_api import MockAdsAPI  # noqa: E402
+
+
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+# --mock serves RAW_DIR, so its downloads must not overwrite it.
+MOCK_OUT_DIR = PROJECT_ROOT / "data" / "raw_fetched"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fetch platform reports into data/raw/.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--base-url",
+        default=os.environ.get("DATALYNN_API_URL"),
+        help="Reporting API base URL (default: $DATALYNN_API_URL).",
+    )
+    source.add_argument("--mock", action="store_true", help="Serve data/raw/ from a local mock API and fetch from it.")
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=None,
+        help="Directory for the raw exports (default: data/raw/, or data/raw_fetched/ with --mock).",
+    )
+    parser.add_argument("--platforms", nargs="+", default=list(DEFAULT_PLATFORMS))
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First report date (inclusive).")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last report date (inclusive).")
+    parser.add_argument("--window-days", type=int, default=None, help="Split the date range into windows.")
+    parser.add_argument("--connections", type=int, default=8, help="Maximum concurrent connections.")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--mock-latency", type=float, default=0.05, help="Mock per-request delay in seconds.")
+    parser.add_argument("--mock-rate-limit", type=float, default=None, help="Mock requests per second.")
+    args = parser.parse_args()
+    if not args.mock and not args.base_url:
+        parser.error("pass --base-url (or set DATALYNN_API_URL) or --mock")
+    if args.out is None:
+        args.out = MOCK_OUT_DIR if args.mock else RAW_DIR
+    if args.mock and args.out.resolve() == RAW_DIR.resolve():
+        parser.error("--mock serves data/raw/; pass another --out so the served exports are not rewritten")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    headers = {}
+    if os.environ.get("DATALYNN_API_TOKEN"):
+        headers["Authorization"] = f"Bearer {os.environ['DATALYNN_API_TOKEN']}"
+    config = FetchConfig(page_size=args.page_size, max_connections=args.connections, headers=headers)
+
+    mock = None
+    base_url = args.base_url
+    if args.mock:
+        mock = MockAdsAPI(RAW_DIR, latency=args.mock_latency, rate_limit=args.mock_rate_limit).start()
+        base_url = mock.url
+        print(f"Mock API serving {RAW_DIR} at {base_url}")
+    try:
+        started = time.perf_counter()
+        results, stats = ingest(
+            base_url,
+            args.out,
+            platforms=args.platforms,
+            start=args.start,
+            end=args.end,
+            window_days=args.window_days,
+            config=config,
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        if mock is not None:
+            mock.stop()
+
+    for result in results:
+        print(f"{result.key:<8} {result.rows:>8} rows {result.pages:>5} pages {result.seconds:7.2f}s → {result.path}")
+    print(
+        f"Fetched in {elapsed:.2f}s: {stats.requests} requests, {stats.retries} retries "
+        f"({stats.rate_limited} rate-limited), {stats.connections_opened} connections"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Plan the length of a creative A/B test from simulated power curves.
+
+Usage
+-----
+python scripts/plan_ab_test.py [--lifts 0 0.05 0.1 0.2] [--days 14 56 7] [--experiments 2000]
+                               [--metric roas] [--target 0.8] [--learning-period 7] [--seed 0]
+
+Simulates `--experiments` tests per lift with Creative A's parameters for both
+arms (the treatment's conversion rate raised by the lift), applies Week 3's
+analysis (learning period dropped, Welch's t-test, promote when p < 0.05 and
+B > A) and reports the share of tests that promote B for each test length
+(see `src/pipelines/power_analysis.py`).  Writes
+`output/reports/ab_test_power.csv` and `output/figures/ab_test_power_curves.png`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.pipelines.power_analysis import METRICS, required_days, run_power_analysis  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="A/B test power analysis.")
+    parser.add_argument("--lifts", type=float, nargs="+", default=[0.0, 0.02, 0.05, 0.1, 0.15, 0.2],
+                        help="Relative conversion-rate lifts of the treatment.")
+    parser.add_argument("--days", type=int, nargs=3, default=[14, 56, 7], metavar=("MIN", "MAX", "STEP"),
+                        help="Test lengths to evaluate, including the learning period.")
+    parser.add_argument("--experiments", type=int, default=2000, help="Simulated tests per lift.")
+    parser.add_argument("--metric", default="roas", choices=METRICS)
+    parser.add_argument("--target", type=float, default=0.8, help="Power required for a recommendation.")
+    parser.add_argument("--learning-period", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    first, last, step = args.days
+    outputs = run_power_analysis(
+        reports_dir=PROJECT_ROOT / "output" / "reports",
+        figures_dir=PROJECT_ROOT / "output" / "figures",
+        target=args.target,
+        lifts=args.lifts,
+        days=range(first, last + 1, step),
+        n_experiments=args.experiments,
+        learning_period=args.learning_period,
+        metric=args.metric,
+        seed=args.seed,
+    )
+    curves = pd.read_csv(outputs.table_csv)
+    print(curves.pivot(index="num_days", columns="lift", values="power").to_string())
+    print(f"\nShortest test reaching {args.target:.0%} power:")
+    print(required_days(curves, args.target).to_string(index=False))
+    print(f"\nPower table saved to: {outputs.table_csv}")
+    print(f"Figure saved to:      {outputs.figure}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Query the Week 1 outputs through the local SQLite warehouse.
+
+Usage
+-----
+python scripts/query_data.py build [--force]
+python scripts/query_data.py views
+python scripts/query_data.py view platform_quarter [--platform Meta] [--limit 10] [--format table|csv|json]
+python scripts/query_data.py sql "SELECT platform, SUM(spend) FROM fact_ads GROUP BY platform"
+python scripts/query_data.py quantiles --by platform month [--metric cpa roas] [--q 0.5 0.9]
+
+The database (`data/warehouse/datalynn.sqlite`) is built from
+`data/processed/integrated_data.csv` and rebuilt only when that file changes;
+`view` and `sql` build it first if needed.  Tables: `fact_ads` (one row per
+platform/campaign/day, with year/quarter/month/day_of_week),
+`agg_daily_platform` and `agg_campaign_quarter`; views are named `v_<view>`.
+
+`quantiles` does not touch the warehouse: it merges the per platform/campaign/day
+t-digests written by Week 1 (`data/processed/metric_sketches.*`) up to the
+requested grouping (`platform`, `campaign_name`, `date`, `month`, `week`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.pipelines.quantile_sketch import (  # noqa: E402
+    SKETCH_METRICS,
+    read_sketches,
+    rollup_quantiles,
+    sketch_path,
+)
+from src.pipelines.warehouse import DASHBOARD_PAGES, VIEWS, Warehouse, build_warehouse  # noqa: E402
+
+
+INTEGRATED_PATH = PROJECT_ROOT / "data" / "processed" / "integrated_data.csv"
+SKETCH_PATH = sketch_path(PROJECT_ROOT / "data" / "processed")
+DB_PATH = PROJECT_ROOT / "data" / "warehouse" / "datalynn.sqlite"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query the DataLynn SQLite warehouse.")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="Warehouse database path.")
+    parser.add_argument("--source", type=Path, default=INTEGRATED_PATH, help="Integrated CSV to load.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build or refresh the database.")
+    build.add_argument("--force", action="store_true", help="Rebuild even if the CSV is unchanged.")
+
+    commands.add_parser("views", help="List the dashboard views.")
+
+    view = commands.add_parser("view", help="Print one dashboard view.")
+    view.add_argument("name", choices=sorted(VIEWS))
+    view.add_argument("--platform", default=None, help="Restrict to one platform.")
+    view.add_argument("--limit", type=int, default=None)
+    view.add_argument("--format", default="table", choices=["table", "csv", "json"])
+
+    sql = commands.add_parser("sql", help="Run an arbitrary read-only query.")
+    sql.add_argument("query")
+    sql.add_argument("--limit", type=int, default=None)
+    sql.add_argument("--format", default="table", choices=["table", "csv", "json"])
+
+    quantiles = commands.add_parser("quantiles", help="Percentiles from the Week 1 metric sketches.")
+    quantiles.add_argument("--by", nargs="*", default=["platform"], help="Grouping columns (none = all data).")
+    quantiles.add_argument("--metric", nargs="+", default=list(SKETCH_METRICS), choices=SKETCH_METRICS)
+    quantiles.add_argument("--q", nargs="+", type=float, default=[0.5, 0.9], help="Quantiles in [0, 1].")
+    quantiles.add_argument("--sketches", type=Path, default=SKETCH_PATH, help="Sketch table written by Week 1.")
+    quantiles.add_argument("--format", default="table", choices=["table", "csv", "json"])
+    return parser.parse_args()
+
+
+def _cell(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:,.4f}" if abs(value) < 100 else f"{value:,.2f}"
+    return "" if value is None else str(value)
+
+
+def print_rows(columns: list[str], rows: list[tuple], fmt: str) -> None:
+    if fmt == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        writer.writerows(rows)
+        return
+    if fmt == "json":
+        print(json.dumps([dict(zip(columns, row)) for row in rows], indent=2, ensure_ascii=False))
+        return
+    cells = [[_cell(value) for value in row] for row in rows]
+    widths = [max([len(name)] + [len(row[index]) for row in cells]) for index, name in enumerate(columns)]
+    print("  ".join(name.rjust(width) for name, width in zip(columns, widths)))
+    for row in cells:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "views":
+        for page, names in DASHBOARD_PAGES.items():
+            print(f"{page}: {', '.join(names)}")
+        return
+
+    if args.command == "quantiles":
+        started = time.perf_counter()
+        table = rollup_quantiles(read_sketches(args.sketches), by=args.by, quantiles=args.q, metrics=args.metric)
+        elapsed = time.perf_counter() - started
+        print_rows(list(table.columns), list(table.itertuples(index=False, name=None)), args.format)
+        if args.format == "table":
+            print(f"\n{len(table)} rows in {elapsed * 1000:.1f} ms")
+        return
+
+    started = time.perf_counter()
+    rebuilt = build_warehouse(args.source, args.db, force=getattr(args, "force", False))
+    if args.command == "build":
+        state = "built" if rebuilt else "up to date"
+        print(f"Warehouse {state}: {args.db} ({time.perf_counter() - started:.2f}s)")
+        return
+
+    with Warehouse(args.db) as warehouse:
+        started = time.perf_counter()
+        if args.command == "view":
+            columns, rows = warehouse.view(args.name, platform=args.platform, limit=args.limit)
+        else:
+            query = args.query if args.limit is None else f"SELECT * FROM ({args.query}) LIMIT {args.limit:d}"
+            columns, rows = warehouse.query(query)
+        elapsed = time.perf_counter() - started
+    print_rows(columns, rows, args.format)
+    if args.format == "table":
+        print(f"\n{len(rows)} rows in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
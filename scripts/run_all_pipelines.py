@@ -1,20 +1,27 @@
 #!/usr/bin/env python3
 """
 一键运行 DataLynn 项目的三条核心流水线：
-1. Week 1 数据清洗
-2. Week 2 ROAS 建模
+1. Week 1 数据清洗（并刷新本地 SQLite 查询库）
+2. Week 2 ROAS 建模（并输出特征重要性排名）、多触点归因与营销组合模型（预算优化报告）
 3. Week 3 创意 A/B 测试分析
 
 使用方法
 --------
-python scripts/run_all_pipelines.py
+python scripts/run_all_pipelines.py [--force] [--serial] [--profile] [--cprofile] [--retrain-on-drift]
 
-该脚本只负责调度，方便一次性跑通；如需单独排查，可继续使用
-`scripts/run_week{1,2,3}_pipeline.py`。
+各阶段声明了输入/输出文件，由 `src/pipelines/orchestrator.py` 按依赖关系调度：
+Week 3 与 Week 1 → Week 2 并行执行；输入文件与代码均未变化的阶段会被跳过
+（状态记录在 `output/.pipeline_state.json`）。`--force` 强制全部重跑，
+`--serial` 在当前进程内串行执行。`--profile` 记录每个函数的耗时、CPU、
+峰值内存与行数（写入 `output/run_logs/`），`--cprofile` 额外保存每个阶段的
+cProfile 文件。`--retrain-on-drift` 时先把新数据中训练截止日之后的特征行计入漂移监控，
+Week 2 仅在监控建议重训（或尚无模型、没有可判断的新数据）时重新训练（见 `scripts/check_drift.py`）。如需单独排查，可继续使用 `scripts/run_week{1,2,3}_pipeline.py`。
 """
 
 from __future__ import annotations
 
+import argparse
+import functools
 from pathlib import Path
 import sys
 
@@ -23,54 +30,147 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
-from src.pipelines.week1_data_prep import run_week1_pipeline  # noqa: E402
-from src.pipelines.week2_roas_modeling import run_week2_pipeline  # noqa: E402
-from src.pipelines.week3_ab_testing import (  # noqa: E402
-    run_week3_pipeline,
-    simulate_dataset,
-)
+from src.pipelines.instrumentation import RunLog, collect_stage  # noqa: E402
+from src.pipelines.orchestrator import Stage, run_stages  # noqa: E402
+from src.pipelines.quantile_sketch import sketch_path  # noqa: E402
+
+
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+AB_TEST_DIR = PROJECT_ROOT / "data" / "ab_test"
+MODELS_DIR = PROJECT_ROOT / "output" / "models"
+REPORTS_DIR = PROJECT_ROOT / "output" / "reports"
+FIGURES_DIR = PROJECT_ROOT / "output" / "figures"
+RAW_CACHE_DIR = PROJECT_ROOT / "data" / "cache" / "raw"
+PARTITION_DIR = PROCESSED_DIR / "partitioned"
+WAREHOUSE_PATH = PROJECT_ROOT / "data" / "warehouse" / "datalynn.sqlite"
+STATE_PATH = PROJECT_ROOT / "output" / ".pipeline_state.json"
+RUN_LOG_DIR = PROJECT_ROOT / "output" / "run_logs"
+SKETCH_PATH = sketch_path(PROCESSED_DIR)
+REACH_PATH = PROCESSED_DIR / "reach_sketches.npz"
+# Modules every stage runs through; editing them invalidates all stage caches.
+COMMON_CODE = ["src.pipelines.hashing", "src.pipelines.instrumentation"]
 
 
 def run_week1() -> None:
-    raw_dir = PROJECT_ROOT / "data" / "raw"
-    processed_dir = PROJECT_ROOT / "data" / "processed"
-    outputs = run_week1_pipeline(raw_dir=raw_dir, processed_dir=processed_dir)
+    from src.pipelines.validation import QualityGate
+    from src.pipelines.week1_data_prep import run_week1_pipeline
+
+    # 清洗后立即在内存中校验，坏数据在 Week 2 训练前就会中止流水线。
+    outputs = run_week1_pipeline(
+        raw_dir=RAW_DIR,
+        processed_dir=PROCESSED_DIR,
+        quality_gate=QualityGate(mode="fail"),
+        cache_dir=RAW_CACHE_DIR,
+        partition_dir=PARTITION_DIR,
+        sketch_path=SKETCH_PATH,
+        reach_path=REACH_PATH,
+    )
     print("\n✅ Week 1 完成：")
     print(f"   Meta cleaned    → {outputs.meta_cleaned}")
     print(f"   Google cleaned  → {outputs.google_cleaned}")
     print(f"   TikTok cleaned  → {outputs.tiktok_cleaned}")
     print(f"   Integrated data → {outputs.integrated}")
+    print(f"   Quality report  → {outputs.quality_report}")
+    print(f"   Partitions      → {outputs.partition_manifest}")
+    print(f"   Metric sketches → {outputs.metric_sketches}")
+    print(f"   Reach rollup    → {outputs.reach_rollup}")
+
+
+def run_warehouse() -> None:
+    from src.pipelines.warehouse import build_warehouse
+
+    build_warehouse(PROCESSED_DIR / "integrated_data.csv", WAREHOUSE_PATH, force=True)
+    print("\n✅ 查询库已更新：")
+    print(f"   SQLite warehouse → {WAREHOUSE_PATH}")
+
+
+def run_week2(retrain_on_drift: bool = False) -> None:
+    from src.pipelines.week2_roas_modeling import feed_drift_monitor, run_week2_pipeline
 
+    monitor_path = MODELS_DIR / "drift_monitor.json"
+    if retrain_on_drift and monitor_path.exists() and (MODELS_DIR / "random_forest_roas.pkl").exists():
+        # 先把本次 integrated_data.csv 中训练截止日之后的特征行计入监控窗口，再做判断。
+        monitor = feed_drift_monitor(PROCESSED_DIR / "integrated_data.csv", MODELS_DIR)
+        retrain, drifted = monitor.should_retrain()
+        if not monitor.days:
+            print("\n⚠️  训练截止日之后没有新数据可供漂移判断，重新训练 Week 2 模型。")
+        elif not retrain:
+            print("\n⏭️  Week 2 跳过：特征分布未明显漂移，沿用现有模型。")
+            return
+        else:
+            print(f"\n⚠️  检测到特征漂移（{', '.join(drifted)}），重新训练 Week 2 模型。")
 
-def run_week2() -> None:
-    integrated_path = PROJECT_ROOT / "data" / "processed" / "integrated_data.csv"
-    models_dir = PROJECT_ROOT / "output" / "models"
-    reports_dir = PROJECT_ROOT / "output" / "reports"
     artifacts = run_week2_pipeline(
-        integrated_path=integrated_path,
-        models_dir=models_dir,
-        metrics_dir=reports_dir,
+        integrated_path=PROCESSED_DIR / "integrated_data.csv",
+        models_dir=MODELS_DIR,
+        metrics_dir=REPORTS_DIR,
     )
     print("\n✅ Week 2 完成：")
     print(f"   Model saved   → {artifacts.model_path}")
     print(f"   Metrics saved → {artifacts.metrics_path}")
 
 
-def run_week3() -> None:
-    data_dir = PROJECT_ROOT / "data" / "ab_test"
-    figures_dir = PROJECT_ROOT / "output" / "figures"
-    reports_dir = PROJECT_ROOT / "output" / "reports"
+def run_importance() -> None:
+    from src.pipelines.feature_importance import run_feature_importance
+
+    outputs = run_feature_importance(
+        integrated_path=PROCESSED_DIR / "integrated_data.csv",
+        models_dir=MODELS_DIR,
+        reports_dir=REPORTS_DIR,
+        figures_dir=FIGURES_DIR,
+    )
+    print("\n✅ 特征重要性完成：")
+    print(f"   Ranking CSV   → {outputs.table_csv}")
+    print(f"   Figure        → {outputs.figure}")
+
+
+def run_attribution() -> None:
+    from src.pipelines.attribution import run_attribution as attribute
+
+    outputs = attribute(
+        integrated_path=PROCESSED_DIR / "integrated_data.csv",
+        reports_dir=REPORTS_DIR,
+        figures_dir=FIGURES_DIR,
+    )
+    print("\n✅ 多触点归因完成：")
+    print(f"   Campaign CSV  → {outputs.campaign_csv}")
+    print(f"   Platform CSV  → {outputs.platform_csv}")
+    print(f"   Figure        → {outputs.figure}")
+
+
+def run_mmm() -> None:
+    from src.pipelines.mmm import run_mmm as fit_mmm
 
-    creative_a = data_dir / "creative_a.csv"
-    creative_b = data_dir / "creative_b.csv"
+    outputs = fit_mmm(
+        integrated_path=PROCESSED_DIR / "integrated_data.csv",
+        models_dir=MODELS_DIR,
+        reports_dir=REPORTS_DIR,
+        figures_dir=FIGURES_DIR,
+    )
+    print("\n✅ 营销组合模型完成：")
+    print(f"   Fit CSV       → {outputs.fit_csv}")
+    print(f"   Curves cache  → {outputs.curves}")
+    print(f"   Budget report → {outputs.report_md}")
+
+
+def ensure_ab_test_data() -> None:
+    from src.pipelines.week3_ab_testing import simulate_dataset
+
+    creative_a = AB_TEST_DIR / "creative_a.csv"
+    creative_b = AB_TEST_DIR / "creative_b.csv"
     if not creative_a.exists() or not creative_b.exists():
         print("   未找到 A/B 测试原始 CSV，自动生成模拟数据...")
-        simulate_dataset(data_dir)
+        simulate_dataset(AB_TEST_DIR)
+
+
+def run_week3() -> None:
+    from src.pipelines.week3_ab_testing import run_week3_pipeline
 
     outputs = run_week3_pipeline(
-        data_dir=data_dir,
-        figures_dir=figures_dir,
-        reports_dir=reports_dir,
+        data_dir=AB_TEST_DIR,
+        figures_dir=FIGURES_DIR,
+        reports_dir=REPORTS_DIR,
     )
     print("\n✅ Week 3 完成：")
     print(f"   Summary CSV   → {outputs.summary_csv}")
@@ -80,11 +180,197 @@ def run_week3() -> None:
     print(f"   Report MD     → {outputs.report_md}")
 
 
+def build_stages(retrain_on_drift: bool = False) -> list[Stage]:
+    integrated = PROCESSED_DIR / "integrated_data.csv"
+    creatives = [AB_TEST_DIR / "creative_a.csv", AB_TEST_DIR / "creative_b.csv"]
+    stages = [
+        Stage(
+            name="week1",
+            func=run_week1,
+            inputs=[
+                RAW_DIR / "meta_ads_raw.csv",
+                RAW_DIR / "google_ads_raw.csv",
+                RAW_DIR / "tiktok_ads_raw.csv",
+            ],
+            outputs=[
+                PROCESSED_DIR / "meta_cleaned.csv",
+                PROCESSED_DIR / "google_cleaned.csv",
+                PROCESSED_DIR / "tiktok_cleaned.csv",
+                integrated,
+                PROCESSED_DIR / "quality_report.json",
+                PARTITION_DIR / "_manifest.json",
+                SKETCH_PATH,
+                REACH_PATH,
+                PROCESSED_DIR / "reach_rollup.csv",
+            ],
+            code=[
+                "src.pipelines.week1_data_prep",
+                "src.pipelines.adapters",
+                "src.pipelines.parsing",
+                "src.pipelines.raw_cache",
+                "src.pipelines.partitioning",
+                "src.pipelines.quantile_sketch",
+                "src.pipelines.reach",
+                "src.pipelines.validation",
+            ],
+        ),
+        Stage(
+            name="warehouse",
+            func=run_warehouse,
+            inputs=[integrated],
+            outputs=[WAREHOUSE_PATH],
+            code=["src.pipelines.warehouse"],
+        ),
+        Stage(
+            name="week2",
+            func=functools.partial(run_week2, retrain_on_drift=retrain_on_drift),
+            inputs=[integrated],
+            outputs=[
+                MODELS_DIR / "random_forest_roas.pkl",
+                MODELS_DIR / "feature_encoder.pkl",
+                MODELS_DIR / "drift_monitor.json",
+                REPORTS_DIR / "random_forest_roas_metrics.json",
+            ],
+            code=[
+                "src.pipelines.week2_roas_modeling",
+                "src.pipelines.marketing_calendar",
+                "src.pipelines.encoding",
+                "src.pipelines.drift",
+            ],
+        ),
+        Stage(
+            name="importance",
+            func=run_importance,
+            inputs=[
+                integrated,
+                MODELS_DIR / "random_forest_roas.pkl",
+                MODELS_DIR / "feature_encoder.pkl",
+            ],
+            outputs=[
+                REPORTS_DIR / "feature_importance.csv",
+                FIGURES_DIR / "feature_importance.png",
+            ],
+            code=[
+                "src.pipelines.feature_importance",
+                "src.pipelines.week2_roas_modeling",
+                "src.pipelines.rendering",
+            ],
+        ),
+        Stage(
+            name="attribution",
+            func=run_attribution,
+            inputs=[integrated],
+            outputs=[
+                REPORTS_DIR / "attribution_by_campaign.csv",
+                REPORTS_DIR / "attribution_by_platform.csv",
+                FIGURES_DIR / "attribution_by_platform.png",
+            ],
+            code=["src.pipelines.attribution", "src.pipelines.rendering"],
+        ),
+        Stage(
+            name="mmm",
+            func=run_mmm,
+            inputs=[integrated],
+            outputs=[
+                REPORTS_DIR / "mmm_fit.csv",
+                REPORTS_DIR / "budget_optimization_report.md",
+                MODELS_DIR / "mmm_params.json",
+                MODELS_DIR / "mmm_response_curves.npz",
+                FIGURES_DIR / "mmm_response_curves.png",
+            ],
+            code=[
+                "src.pipelines.mmm",
+                "src.pipelines.week2_roas_modeling",
+                "src.pipelines.marketing_calendar",
+                "src.pipelines.rendering",
+            ],
+        ),
+        Stage(
+            name="ab_test_data",
+            func=ensure_ab_test_data,
+            outputs=creatives,
+        ),
+        Stage(
+            name="week3",
+            func=run_week3,
+            inputs=creatives,
+            outputs=[
+                REPORTS_DIR / "ab_test_summary.csv",
+                REPORTS_DIR / "ab_test_ttest_results.csv",
+                REPORTS_DIR / "ab_test_report.md",
+                FIGURES_DIR / "ab_test_roas_trend.png",
+                FIGURES_DIR / "ab_test_comparison.png",
+            ],
+            code=["src.pipelines.week3_ab_testing", "src.pipelines.rendering"],
+        ),
+    ]
+    for stage in stages:
+        stage.code = [*stage.code, *COMMON_CODE]
+    return stages
+
+
+def with_profiling(stages: list[Stage], run_log: RunLog) -> list[Stage]:
+    """Wrap each stage so its instrumentation records are returned to this process."""
+    for stage in stages:
+        stage.func = functools.partial(
+            collect_stage,
+            stage.name,
+            stage.func,
+            profile_dir=run_log.profile_dir,
+            run_id=run_log.run_id,
+        )
+    return stages
+
+
+def print_run_log(run_log: RunLog) -> None:
+    print("\n性能记录：")
+    print(f"   {'stage':<28} {'wall(s)':>8} {'cpu(s)':>8} {'peak MB':>8} {'rows':>9}")
+    for record in run_log.records:
+        indent = "  " * record.depth
+        rows = record.rows_out if record.rows_out is not None else "-"
+        peak = f"{record.peak_rss_mb:.1f}" if record.peak_rss_mb is not None else "-"
+        print(
+            f"   {indent + record.stage:<28} {record.wall_seconds:>8.2f} "
+            f"{record.cpu_seconds:>8.2f} {peak:>8} {rows:>9}"
+        )
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the DataLynn Week 1-3 pipelines.")
+    parser.add_argument("--force", action="store_true", help="重跑所有阶段，忽略缓存。")
+    parser.add_argument("--serial", action="store_true", help="在当前进程内串行执行。")
+    parser.add_argument("--profile", action="store_true", help="记录各函数耗时与内存。")
+    parser.add_argument("--cprofile", action="store_true", help="为每个阶段保存 cProfile 文件。")
+    parser.add_argument("--retrain-on-drift", action="store_true", help="仅在特征漂移时重训 Week 2 模型。")
+    args = parser.parse_args()
+
+    stages = build_stages(retrain_on_drift=args.retrain_on_drift)
+    run_log = None
+    if args.profile or args.cprofile:
+        run_log = RunLog(profile_dir=RUN_LOG_DIR if args.cprofile else None)
+        stages = with_profiling(stages, run_log)
+
     print("🚀 正在运行 DataLynn 全流程流水线...")
-    run_week1()
-    run_week2()
-    run_week3()
+    results = run_stages(
+        stages,
+        cache_path=STATE_PATH,
+        force=args.force,
+        executor="serial" if args.serial else "process",
+    )
+
+    print("\n阶段汇总：")
+    for result in results:
+        label = "执行" if result.status == "ran" else "跳过（未变化）"
+        print(f"   {result.name:<13} {label:<10} {result.seconds:7.2f}s")
+
+    if run_log is not None:
+        for result in results:
+            if result.status == "ran":
+                run_log.extend(result.value)
+        json_path, csv_path = run_log.write(RUN_LOG_DIR)
+        print_run_log(run_log)
+        print(f"\n   Run log → {json_path}")
+        print(f"           {csv_path}")
     print("\n🎉 全部流水线执行完成，可以继续检查输出或推送仓库。")
 
 
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pipeline stages on scaled synthetic exports.
+
+Fixtures are derived from `data/raw/` (run `scripts/generate_raw_data.py`
+first) and cached under `data/benchmarks/scale_<n>/`.  Results are written to
+`output/benchmarks/` and can be compared against an earlier run.
+
+Usage
+-----
+python scripts/run_benchmarks.py --scales 10 100
+python scripts/run_benchmarks.py --scales 10 --compare output/benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.pipelines.benchmarking import (  # noqa: E402
+    compare_results,
+    ensure_fixture,
+    run_scale,
+    write_results,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages at scale.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeats", type=int, default=1, help="Best-of-N wall time.")
+    parser.add_argument(
+        "--search-iterations",
+        type=int,
+        default=2,
+        help="RandomizedSearchCV iterations used for the training benchmark.",
+    )
+    parser.add_argument("--raw-dir", type=Path, default=PROJECT_ROOT / "data" / "raw")
+    parser.add_argument(
+        "--fixtures-dir", type=Path, default=PROJECT_ROOT / "data" / "benchmarks"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=None, help="Results JSON (default: timestamped)."
+    )
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--regenerate", action="store_true", help="Rebuild cached fixtures.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    results = []
+    for scale in args.scales:
+        fixture_dir = ensure_fixture(args.raw_dir, args.fixtures_dir, scale, args.regenerate)
+        print(f"Scale {scale}x: fixtures in {fixture_dir}")
+        scale_results = run_scale(
+            fixture_dir,
+            scale,
+            work_dir=fixture_dir / "work",
+            repeats=args.repeats,
+            search_iterations=args.search_iterations,
+        )
+        for result in scale_results:
+            throughput = f"{result.rows_per_second:,.0f}" if result.rows_per_second else "-"
+            peak = f"{result.peak_rss_mb:.1f}" if result.peak_rss_mb is not None else "-"
+            print(
+                f"   {result.stage:<30} rows={result.rows:>10,} wall={result.wall_seconds:8.3f}s "
+                f"rows/s={throughput:>12} peak={peak:>8} MB"
+            )
+        results.extend(scale_results)
+
+    output = args.output or (
+        PROJECT_ROOT / "output" / "benchmarks" / f"bench_{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    write_results(results, output)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        comparison = compare_results(results, args.compare, args.threshold)
+        print("\nComparison against", args.compare)
+        print(comparison.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+        if comparison["regression"].any():
+            print(f"\nRegression: at least one stage is more than {args.threshold:.0%} slower.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
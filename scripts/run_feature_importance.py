@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Rank the features of the saved Week 2 model on its test window.
+
+Usage
+-----
+python scripts/run_feature_importance.py [--repeats 10] [--workers 4] [--no-contributions]
+
+Permutation importance repeats are stacked per feature and features are spread
+over worker processes; tree-path contributions come from one sparse product
+over the forest's decision paths (see `src/pipelines/feature_importance.py`).
+Run `scripts/run_week2_pipeline.py` first; `--region` must match the training
+run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.pipelines.feature_importance import run_feature_importance  # noqa: E402
+from src.pipelines.marketing_calendar import REGIONS  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Week 2 feature importance report.")
+    parser.add_argument("--repeats", type=int, default=10, help="Permutations per feature.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (1 = in-process).")
+    parser.add_argument("--no-contributions", action="store_true", help="Skip tree-path contributions.")
+    parser.add_argument("--region", default="US", choices=REGIONS, help="Marketing calendar region.")
+    args = parser.parse_args()
+
+    outputs = run_feature_importance(
+        integrated_path=PROJECT_ROOT / "data" / "processed" / "integrated_data.csv",
+        models_dir=PROJECT_ROOT / "output" / "models",
+        reports_dir=PROJECT_ROOT / "output" / "reports",
+        figures_dir=PROJECT_ROOT / "output" / "figures",
+        region=args.region,
+        n_repeats=args.repeats,
+        max_workers=args.workers,
+        contributions=not args.no_contributions,
+    )
+    print("Feature importance completed.")
+    print(f"Ranking saved to: {outputs.table_csv}")
+    print(f"Figure saved to:  {outputs.figure}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,24 @@ Run the Week 1 data preparation pipeline end-to-end.
 
 Usage
 -----
-python scripts/run_week1_pipeline.py
+python scripts/run_week1_pipeline.py [--validate off|fail|quarantine] [--adapters extra.json] [--no-cache]
+
+`--adapters` registers additional platforms from a JSON file (see
+`src/pipelines/adapters.py`); their exports must sit in `data/raw/`.
+Parsed exports are cached under `data/cache/raw/` and reused until the raw
+file changes; `--no-cache` parses the CSVs directly.  The integrated data is
+also written as `data/processed/partitioned/platform=<P>/month=<YYYY-MM>/`,
+and CPA/ROAS/CTR/CVR t-digests per platform/campaign/day as
+`data/processed/metric_sketches.parquet` (CSV without pyarrow) for
+`scripts/query_data.py quantiles`.  Daily Meta reach is sketched with
+HyperLogLog into `data/processed/reach_sketches.npz`, and deduplicated weekly
+and monthly reach per campaign and platform is written to
+`data/processed/reach_rollup.csv` for Power BI.
 """
 
 from __future__ import annotations
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -17,18 +30,66 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from src.pipelines.adapters import load_adapters  # noqa: E402
+from src.pipelines.quantile_sketch import sketch_path  # noqa: E402
+from src.pipelines.validation import QualityGate  # noqa: E402
 from src.pipelines.week1_data_prep import run_week1_pipeline  # noqa: E402
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Week 1 data preparation pipeline.")
+    parser.add_argument(
+        "--validate",
+        default="off",
+        choices=["fail", "quarantine", "off"],
+        help="Skip checks (default), stop on bad rows, or move them to data/processed/quarantine/.",
+    )
+    parser.add_argument(
+        "--adapters",
+        type=Path,
+        default=None,
+        help="JSON file with additional platform adapters.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse the raw CSVs instead of using the data/cache/raw/ cache.",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    args = parse_args()
     raw_dir = PROJECT_ROOT / "data" / "raw"
     processed_dir = PROJECT_ROOT / "data" / "processed"
-    outputs = run_week1_pipeline(raw_dir=raw_dir, processed_dir=processed_dir)
+    gate = None
+    if args.validate != "off":
+        gate = QualityGate(mode=args.validate, quarantine_dir=processed_dir / "quarantine")
+    extra_adapters = load_adapters(args.adapters) if args.adapters else []
+    outputs = run_week1_pipeline(
+        raw_dir=raw_dir,
+        processed_dir=processed_dir,
+        quality_gate=gate,
+        extra_adapters=extra_adapters,
+        cache_dir=None if args.no_cache else PROJECT_ROOT / "data" / "cache" / "raw",
+        partition_dir=processed_dir / "partitioned",
+        sketch_path=sketch_path(processed_dir),
+        reach_path=processed_dir / "reach_sketches.npz",
+    )
     print("Week1 pipeline completed.")
     print(f"Meta cleaned:     {outputs.meta_cleaned}")
     print(f"Google cleaned:   {outputs.google_cleaned}")
     print(f"TikTok cleaned:   {outputs.tiktok_cleaned}")
+    for key, path in outputs.extra_cleaned.items():
+        print(f"{key + ' cleaned:':<18}{path}")
     print(f"Integrated data:  {outputs.integrated}")
+    print(f"Partitions:       {outputs.partition_manifest}")
+    print(f"Metric sketches:  {outputs.metric_sketches}")
+    print(f"Reach rollup:     {outputs.reach_rollup}")
+    if outputs.quality_report is not None:
+        print(f"Quality report:   {outputs.quality_report}")
+        for dataset, rows in gate.report.quarantined.items():
+            print(f"Quarantined:      {rows} {dataset} rows → {gate.quarantine_path(dataset)}")
 
 
 if __name__ == "__main__":
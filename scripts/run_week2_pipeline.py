@@ -4,11 +4,16 @@ Train the Week 2 ROAS prediction model and persist artifacts.
 
 Usage
 -----
-python scripts/run_week2_pipeline.py
+python scripts/run_week2_pipeline.py [--region US|UK|CA] [--encoding onehot|sparse|ordinal|target]
+
+`--region` selects the holiday and promo calendar used for the calendar
+features (see `src/pipelines/marketing_calendar.py`); `--encoding` selects how
+month and platform are encoded (see `src/pipelines/encoding.py`).
 """
 
 from __future__ import annotations
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -17,10 +22,17 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from src.pipelines.encoding import ENCODINGS  # noqa: E402
+from src.pipelines.marketing_calendar import REGIONS  # noqa: E402
 from src.pipelines.week2_roas_modeling import run_week2_pipeline  # noqa: E402
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the Week 2 ROAS model.")
+    parser.add_argument("--region", default="US", choices=REGIONS, help="Marketing calendar region.")
+    parser.add_argument("--encoding", default="onehot", choices=ENCODINGS, help="Categorical encoding.")
+    args = parser.parse_args()
+
     integrated_path = PROJECT_ROOT / "data" / "processed" / "integrated_data.csv"
     models_dir = PROJECT_ROOT / "output" / "models"
     metrics_dir = PROJECT_ROOT / "output" / "reports"
@@ -29,6 +41,8 @@ def main() -> None:
         integrated_path=integrated_path,
         models_dir=models_dir,
         metrics_dir=metrics_dir,
+        region=args.region,
+        encoding=args.encoding,
     )
     print("Week2 modeling pipeline completed.")
     print(f"Model saved to:   {artifacts.model_path}")
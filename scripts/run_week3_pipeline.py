@@ -4,10 +4,15 @@ Execute the Week 3 A/B testing analysis pipeline.
 
 The script optionally generates synthetic creative data if the CSVs are missing,
 then runs the statistical analysis and writes out figures/reports.
+
+Usage
+-----
+python scripts/run_week3_pipeline.py [--format png|svg|pdf] [--dpi 150] [--force-render]
 """
 
 from __future__ import annotations
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -21,6 +26,7 @@ from src.pipelines.week3_ab_testing import (  # noqa: E402
     run_week3_pipeline,
     simulate_dataset,
 )
+from src.pipelines.rendering import RenderConfig  # noqa: E402
 
 
 def ensure_data_exists(data_dir: Path) -> None:
@@ -29,7 +35,25 @@ def ensure_data_exists(data_dir: Path) -> None:
         simulate_dataset(data_dir)
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Week 3 A/B testing analysis.")
+    parser.add_argument("--format", default="png", choices=["png", "svg", "pdf"])
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument(
+        "--force-render",
+        action="store_true",
+        help="Re-render figures even if their input data is unchanged.",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    args = parse_args()
+    render_config = RenderConfig(
+        fmt=args.format,
+        dpi=args.dpi,
+        skip_unchanged=not args.force_render,
+    )
     data_dir = PROJECT_ROOT / "data" / "ab_test"
     figures_dir = PROJECT_ROOT / "output" / "figures"
     reports_dir = PROJECT_ROOT / "output" / "reports"
@@ -39,6 +63,7 @@ def main() -> None:
         data_dir=data_dir,
         figures_dir=figures_dir,
         reports_dir=reports_dir,
+        render_config=render_config,
     )
     print("Week3 A/B testing pipeline completed.")
     print(f"Summary CSV:      {outputs.summary_csv}")
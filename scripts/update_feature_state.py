@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Update the Week 2 feature state with new days and score them.
+
+Usage
+-----
+python scripts/update_feature_state.py --bootstrap
+python scripts/update_feature_state.py --day new_rows.csv [--score] [--features-out features.csv]
+
+`--bootstrap` builds the state from `data/processed/integrated_data.csv` (the
+model's training history).  Each `--day` file holds integrated rows for one or
+more new dates; they are applied in date order, touching only the per-platform
+rolling buffers (see `src/pipelines/feature_state.py`), and the state is saved
+again.  `--score` predicts ROAS for the new rows with the saved Week 2 model
+and its categorical encoder; `--drift` adds the new rows to the drift monitor
+saved at training time (see `scripts/check_drift.py`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.pipelines.feature_state import FeatureState  # noqa: E402
+from src.pipelines.marketing_calendar import REGIONS  # noqa: E402
+
+
+INTEGRATED_PATH = PROJECT_ROOT / "data" / "processed" / "integrated_data.csv"
+MODELS_DIR = PROJECT_ROOT / "output" / "models"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Incrementally update Week 2 features.")
+    parser.add_argument("--state", type=Path, default=MODELS_DIR / "feature_state.json")
+    parser.add_argument("--bootstrap", action="store_true", help="Rebuild the state from --history first.")
+    parser.add_argument("--history", type=Path, default=INTEGRATED_PATH)
+    parser.add_argument("--region", default="US", choices=REGIONS, help="Marketing calendar region.")
+    parser.add_argument("--lag-days", type=int, default=7)
+    parser.add_argument("--day", type=Path, nargs="*", default=[], help="CSV files with new integrated rows.")
+    parser.add_argument("--score", action="store_true", help="Predict ROAS with the saved model.")
+    parser.add_argument("--model", type=Path, default=MODELS_DIR / "random_forest_roas.pkl")
+    parser.add_argument("--encoder", type=Path, default=MODELS_DIR / "feature_encoder.pkl")
+    parser.add_argument("--drift", action="store_true", help="Feed the new rows to the drift monitor.")
+    parser.add_argument("--monitor", type=Path, default=MODELS_DIR / "drift_monitor.json")
+    parser.add_argument("--features-out", type=Path, default=None, help="Write the emitted feature rows here.")
+    args = parser.parse_args()
+    if not args.bootstrap and not args.state.exists():
+        parser.error(f"{args.state} does not exist; run with --bootstrap first")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    if args.bootstrap:
+        history = pd.read_csv(args.history)
+        history["date"] = pd.to_datetime(history["date"])
+        state = FeatureState.from_history(history, lag_days=args.lag_days, region=args.region)
+        print(f"Bootstrapped state from {args.history} through {state.last_date.date()}")
+    else:
+        state = FeatureState.load(args.state)
+
+    rows = []
+    if args.day:
+        new_rows = pd.concat([pd.read_csv(path) for path in args.day], ignore_index=True)
+        new_rows["date"] = pd.to_datetime(new_rows["date"])
+        for _, day in new_rows.groupby("date", sort=True):
+            rows.append(state.update(day))
+    state.save(args.state)
+    print(f"State saved to {args.state} (last date {state.last_date.date()})")
+
+    if not rows:
+        return
+    features = pd.concat(rows, ignore_index=True)
+    if args.features_out:
+        args.features_out.parent.mkdir(parents=True, exist_ok=True)
+        features.to_csv(args.features_out, index=False)
+        print(f"Features saved to {args.features_out}")
+
+    if not (args.score or args.drift):
+        return
+    from src.pipelines.week2_roas_modeling import build_feature_matrix, feature_matrix_columns
+
+    encoder = pd.read_pickle(args.encoder)
+    X, _, roas_last = build_feature_matrix(features, lag_days=state.lag_days, encoder=encoder)
+    if not isinstance(X, pd.DataFrame):
+        X = pd.DataFrame(X.toarray(), columns=feature_matrix_columns(features, encoder))
+
+    if args.score:
+        model = pd.read_pickle(args.model)
+        features["roas_pred"] = roas_last + model.predict(X)
+        for row in features.itertuples():
+            print(f"{row.date.date()} {row.platform:<8} predicted ROAS {row.roas_pred:.3f}")
+
+    if args.drift:
+        from src.pipelines.drift import DriftMonitor
+
+        monitor = DriftMonitor.load(args.monitor)
+        monitor.update(X, dates=features["date"])
+        monitor.save(args.monitor)
+        retrain, drifted = monitor.should_retrain()
+        print(f"Drift monitor: {monitor.live_rows} live rows; retrain {'recommended' if retrain else 'not needed'}")
+        if drifted:
+            print(f"Drifted features: {', '.join(drifted)}")
+
+
+if __name__ == "__main__":
+    main()
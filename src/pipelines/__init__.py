@@ -1,26 +1,66 @@
 """
 Pipeline modules for the Datalynn project.
+
+Public names are resolved lazily: ``from src.pipelines import run_week1_pipeline``
+only imports the Week 1 module, so jobs that never train a model or draw a
+figure do not pay for scikit-learn, scipy or matplotlib.
 """
 
-from .week1_data_prep import (
-    Week1Outputs,
-    clean_google_ads,
-    clean_meta_ads,
-    clean_tiktok_ads,
-    integrate_platforms,
-    run_week1_pipeline,
-)
-from .week2_roas_modeling import (
-    ModelArtifacts,
-    prepare_daily_features,
-    build_feature_matrix,
-    run_week2_pipeline,
-)
-from .week3_ab_testing import (
-    ABTestOutputs,
-    run_week3_pipeline,
-    simulate_dataset,
-)
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+_EXPORTS = {
+    "Week1Outputs": ".week1_data_prep",
+    "clean_google_ads": ".week1_data_prep",
+    "clean_meta_ads": ".week1_data_prep",
+    "clean_tiktok_ads": ".week1_data_prep",
+    "integrate_platforms": ".week1_data_prep",
+    "run_week1_pipeline": ".week1_data_prep",
+    "ModelArtifacts": ".week2_roas_modeling",
+    "prepare_daily_features": ".week2_roas_modeling",
+    "build_feature_matrix": ".week2_roas_modeling",
+    "run_week2_pipeline": ".week2_roas_modeling",
+    "ABTestOutputs": ".week3_ab_testing",
+    "run_week3_pipeline": ".week3_ab_testing",
+    "simulate_dataset": ".week3_ab_testing",
+}
+
+if TYPE_CHECKING:
+    from .week1_data_prep import (
+        Week1Outputs,
+        clean_google_ads,
+        clean_meta_ads,
+        clean_tiktok_ads,
+        integrate_platforms,
+        run_week1_pipeline,
+    )
+    from .week2_roas_modeling import (
+        ModelArtifacts,
+        prepare_daily_features,
+        build_feature_matrix,
+        run_week2_pipeline,
+    )
+    from .week3_ab_testing import (
+        ABTestOutputs,
+        run_week3_pipeline,
+        simulate_dataset,
+    )
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "Week1Outputs",
@@ -37,4 +77,3 @@ __all__ = [
     "run_week3_pipeline",
     "simulate_dataset",
 ]
-
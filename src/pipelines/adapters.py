@@ -0,0 +1,357 @@
+"""
+Declarative platform adapters and the shared cleaning kernel.
+
+Each ad platform is described by a ``PlatformAdapter`` — pure data: how to read
+the export, which raw headers map to which canonical column, which tokens mean
+"missing", which columns are percent strings or carry privacy-threshold tokens
+such as ``"< 10"``, and which metrics are derived.  ``clean_platform`` applies
+any adapter with the same vectorised steps, so a new platform only needs a new
+adapter definition, e.g. in a JSON file loaded with ``load_adapters``::
+
+    [{
+      "key": "snapchat",
+      "platform": "Snapchat",
+      "filename": "snapchat_ads_raw.csv",
+      "columns": {"Day": "date", "Campaign": "campaign_name", "Spend": "spend",
+                  "Paid Impressions": "impressions", "Swipe Ups": "clicks",
+                  "Purchases": "conversions", "Purchase Value": "revenue"},
+      "numeric": ["spend", "impressions", "clicks", "conversions", "revenue"],
+      "derived": [["ctr", "divide", ["clicks", "impressions"]],
+                  ["cvr", "divide", ["conversions", "clicks"]],
+                  ["cpa", "divide", ["spend", "conversions"]],
+                  ["roas", "divide", ["revenue", "spend"]]]
+    }]
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .parsing import read_export
+from .raw_cache import cached_read_export
+
+
+FINAL_COLUMNS = [
+    "date",
+    "platform",
+    "campaign_name",
+    "spend",
+    "impressions",
+    "clicks",
+    "conversions",
+    "revenue",
+    "ctr",
+    "cvr",
+    "cpa",
+    "roas",
+]
+
+DERIVED_OPS = ("divide", "multiply", "notna", "contains")
+
+Operand = Union[str, float]
+
+
+@dataclass(frozen=True)
+class Derived:
+    """
+    One derived column, evaluated in declaration order.
+
+    - ``divide``: ``args[0] / args[1]``; ±inf (division by zero) becomes NaN.
+    - ``multiply``: product of ``args`` (column names or numeric constants).
+    - ``notna``: ``args[0]`` is present.
+    - ``contains``: ``args[0]`` contains the substring ``args[1]``.
+    """
+
+    target: str
+    op: str
+    args: Tuple[Operand, ...]
+
+    def __post_init__(self) -> None:
+        if self.op not in DERIVED_OPS:
+            raise ValueError(f"Unknown derived op {self.op!r}; expected one of {DERIVED_OPS}")
+
+
+@dataclass(frozen=True)
+class PlatformAdapter:
+    """Everything the cleaning kernel needs to know about one platform export."""
+
+    key: str
+    platform: str
+    filename: str
+    columns: Mapping[str, str]
+    skiprows: int = 0
+    na_values: Tuple[str, ...] = ("--",)
+    numeric: Tuple[str, ...] = ()
+    percent: Tuple[str, ...] = ()
+    threshold_tokens: Mapping[str, Mapping[str, float]] = field(default_factory=dict)
+    rounding: Mapping[str, int] = field(default_factory=dict)
+    derived: Tuple[Derived, ...] = ()
+    sort_by: Tuple[str, ...] = ()
+    extra_columns: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, spec: Mapping[str, Any]) -> "PlatformAdapter":
+        """Build an adapter from JSON-style data (lists instead of tuples)."""
+        spec = dict(spec)
+        for name in ("na_values", "numeric", "percent", "sort_by", "extra_columns"):
+            if name in spec:
+                spec[name] = tuple(spec[name])
+        spec["derived"] = tuple(
+            item if isinstance(item, Derived) else Derived(item[0], item[1], tuple(item[2]))
+            for item in spec.get("derived", ())
+        )
+        return cls(**spec)
+
+
+BUILTIN_ADAPTERS: Tuple[PlatformAdapter, ...] = (
+    PlatformAdapter(
+        key="meta",
+        platform="Meta",
+        filename="meta_ads_raw.csv",
+        columns={
+            "Reporting starts": "date",
+            "Reporting ends": "date_end",
+            "Campaign name": "campaign_name",
+            "Amount spent (USD)": "spend",
+            "Impressions": "impressions",
+            "Link clicks": "clicks",
+            "Purchases": "conversions",
+            "Cost per purchase (USD)": "cpa",
+            "Purchase conversion value (USD)": "revenue",
+            "Reach": "reach",
+        },
+        numeric=("spend", "cpa", "revenue"),
+        rounding={"spend": 2, "cpa": 2, "revenue": 2},
+        derived=(
+            Derived("ctr", "divide", ("clicks", "impressions")),
+            Derived("cvr", "divide", ("conversions", "clicks")),
+            Derived("cpa", "divide", ("spend", "conversions")),
+            Derived("roas", "divide", ("revenue", "spend")),
+            # Brand_Awareness campaigns run without purchase tracking.
+            Derived("has_conversion_tracking", "notna", ("conversions",)),
+        ),
+        sort_by=("date",),
+        extra_columns=("has_conversion_tracking", "reach"),
+    ),
+    PlatformAdapter(
+        key="google",
+        platform="Google",
+        filename="google_ads_raw.csv",
+        # Three lines of report metadata precede the header row.
+        skiprows=3,
+        columns={
+            "Day": "date",
+            "Campaign": "campaign_name",
+            "Campaign ID": "campaign_id",
+            "Impr.": "impressions",
+            "Clicks": "clicks",
+            "Cost": "spend",
+            "Conversions": "conversions",
+            "Conv. rate": "cvr",
+            "Cost / conv.": "cpa",
+            "Conv. value": "revenue",
+        },
+        numeric=("impressions", "clicks", "spend", "conversions", "cpa", "revenue"),
+        percent=("cvr",),
+        # Google hides small conversion counts behind a privacy threshold.
+        threshold_tokens={"conversions": {"< 10": 5.0}},
+        derived=(
+            Derived("ctr", "divide", ("clicks", "impressions")),
+            Derived("roas", "divide", ("revenue", "spend")),
+        ),
+        extra_columns=("conversions_masked",),
+    ),
+    PlatformAdapter(
+        key="tiktok",
+        platform="TikTok",
+        filename="tiktok_ads_raw.csv",
+        columns={
+            "Date": "date",
+            "Campaign Name": "campaign_name",
+            "Ad Group Name": "ad_group_name",
+            "Cost": "spend",
+            "Impressions": "impressions",
+            "Clicks": "clicks",
+            "Conversions": "conversions",
+            "CPA": "cpa",
+            "CTR": "ctr",
+            "CVR": "cvr",
+            "Video Views": "video_views",
+            "Video Play Actions": "video_actions",
+            "Learning Status": "learning_status",
+        },
+        numeric=("spend", "conversions", "video_views", "video_actions"),
+        percent=("ctr", "cvr"),
+        derived=(
+            # TikTok exports no revenue; use the fixed $80 order value.
+            Derived("revenue", "multiply", ("conversions", 80)),
+            Derived("roas", "divide", ("revenue", "spend")),
+            # Recompute CPA rather than trusting the exported value.
+            Derived("cpa", "divide", ("spend", "conversions")),
+            Derived("is_learning", "contains", ("learning_status", "Learning")),
+        ),
+        extra_columns=("is_learning",),
+    ),
+)
+
+_REGISTRY: Dict[str, PlatformAdapter] = {adapter.key: adapter for adapter in BUILTIN_ADAPTERS}
+
+
+def register_adapter(adapter: PlatformAdapter, replace: bool = False) -> PlatformAdapter:
+    """Add ``adapter`` to the registry."""
+    if adapter.key in _REGISTRY and not replace:
+        raise ValueError(f"Adapter {adapter.key!r} is already registered")
+    _REGISTRY[adapter.key] = adapter
+    return adapter
+
+
+def get_adapter(key: str) -> PlatformAdapter:
+    try:
+        return _REGISTRY[key]
+    except KeyError:
+        raise KeyError(f"No adapter registered for {key!r}; known: {sorted(_REGISTRY)}") from None
+
+
+def registered_adapters() -> List[PlatformAdapter]:
+    return list(_REGISTRY.values())
+
+
+def load_adapters(path: Path, replace: bool = False) -> List[PlatformAdapter]:
+    """Register every adapter defined in a JSON file (a list of adapter specs)."""
+    specs = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(specs, dict):
+        specs = [specs]
+    return [register_adapter(PlatformAdapter.from_dict(spec), replace=replace) for spec in specs]
+
+
+def _operand(df: pd.DataFrame, value: Operand) -> Any:
+    return df[value] if isinstance(value, str) else value
+
+
+def _apply_derived(df: pd.DataFrame, derived: Derived) -> None:
+    if derived.op == "divide":
+        numerator, denominator = (_operand(df, arg) for arg in derived.args)
+        result = numerator / denominator
+        df[derived.target] = result.replace([np.inf, -np.inf], np.nan)
+    elif derived.op == "multiply":
+        result = _operand(df, derived.args[0])
+        for arg in derived.args[1:]:
+            result = _operand(df, arg) * result
+        df[derived.target] = result
+    elif derived.op == "notna":
+        df[derived.target] = df[derived.args[0]].notna()
+    elif derived.op == "contains":
+        column, needle = derived.args
+        df[derived.target] = df[column].fillna("").astype(str).str.contains(str(needle), regex=False)
+
+
+def _parse_dates(series: pd.Series) -> pd.Series:
+    """``pd.to_datetime``, parsing only the categories of a categorical column."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = pd.to_datetime(series.cat.categories)
+        codes = series.cat.codes.to_numpy()
+        return pd.Series(categories.take(codes, allow_fill=True, fill_value=pd.NaT), index=series.index)
+    return pd.to_datetime(series)
+
+
+def clean_platform(
+    raw_path: Path,
+    adapter: PlatformAdapter,
+    include_extra: bool = False,
+    engine: str = "auto",
+    cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Clean one raw export according to ``adapter``.
+
+    Steps: read with the adapter's NA tokens while converting percent and
+    threshold columns (see ``parsing.read_export``), rename, parse dates,
+    coerce numerics, round, add the platform label, compute derived columns,
+    sort.  Returns ``FINAL_COLUMNS`` plus the adapter's ``extra_columns`` when
+    ``include_extra`` is set.
+
+    Each threshold column gets a ``<column>_masked`` flag for rows whose value
+    was imputed from a token; the counts are in ``df.attrs["masked_counts"]``.
+
+    With ``cache_dir`` the parsed export is read from (or stored in) the
+    memory-mapped raw cache, so unchanged exports skip CSV parsing.
+    """
+    raw_names = {canonical: raw for raw, canonical in adapter.columns.items()}
+    read_options = dict(
+        skiprows=adapter.skiprows,
+        na_values=adapter.na_values,
+        percent=[raw_names.get(column, column) for column in adapter.percent],
+        thresholds={
+            raw_names.get(column, column): tokens
+            for column, tokens in adapter.threshold_tokens.items()
+        },
+        string_columns=[raw_names.get("date", "date")],
+        numeric=[raw_names.get(column, column) for column in adapter.numeric],
+        engine=engine,
+    )
+    if cache_dir is not None:
+        parsed = cached_read_export(
+            raw_path, cache_dir, category_columns=read_options["string_columns"], **read_options
+        )
+    else:
+        parsed = read_export(raw_path, **read_options)
+    df = parsed.frame.rename(columns=dict(adapter.columns))
+    for raw, mask in parsed.masked.items():
+        df[f"{adapter.columns.get(raw, raw)}_masked"] = mask
+    df["date"] = _parse_dates(df["date"])
+
+    for column in adapter.numeric:
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    for column, decimals in adapter.rounding.items():
+        df[column] = df[column].round(decimals)
+
+    df["platform"] = adapter.platform
+    for derived in adapter.derived:
+        _apply_derived(df, derived)
+
+    if adapter.sort_by:
+        df = df.sort_values(list(adapter.sort_by)).reset_index(drop=True)
+
+    columns = FINAL_COLUMNS + (list(adapter.extra_columns) if include_extra else [])
+    cleaned = df[columns].copy()
+    cleaned.attrs["masked_counts"] = {
+        adapter.columns.get(raw, raw): count for raw, count in parsed.masked_counts().items()
+    }
+    return cleaned
+
+
+def clean_registered(
+    raw_dir: Path,
+    keys: Sequence[str],
+    include_extra: bool = False,
+    engine: str = "auto",
+    cache_dir: Optional[Path] = None,
+) -> Dict[str, pd.DataFrame]:
+    """Clean several registered platforms from ``raw_dir``, keyed by platform label."""
+    frames = {}
+    for key in keys:
+        adapter = get_adapter(key)
+        frames[adapter.platform] = clean_platform(
+            raw_dir / adapter.filename, adapter, include_extra, engine, cache_dir
+        )
+    return frames
+
+
+__all__ = [
+    "FINAL_COLUMNS",
+    "Derived",
+    "PlatformAdapter",
+    "BUILTIN_ADAPTERS",
+    "register_adapter",
+    "get_adapter",
+    "registered_adapters",
+    "load_adapters",
+    "clean_platform",
+    "clean_registered",
+]
@@ -0,0 +1,400 @@
+"""
+Multi-touch attribution of the integrated revenue over user paths.
+
+``integrated_data.csv`` credits each conversion to the platform that reported
+it — every platform only sees its own last touch, and TikTok revenue is even
+``80 * conversions`` — so journeys that cross platforms are ignored.  This
+module re-attributes the revenue over user paths:
+
+- ``Paths`` holds millions of journeys as flat arrays (channel codes of all
+  touches plus path offsets), simulated from the integrated aggregates
+  (``simulate_paths``) or built from an exposure log (``Paths.from_events``).
+  A channel is one (platform, campaign).
+- ``transition_counts`` builds the first-order Markov transition matrix
+  (start → channels → conversion / null) with a single ``bincount`` over the
+  (from, to) state pairs of every touch.
+- The conversion probability with any set of channels removed is one
+  absorbing-chain linear solve, and many sets are solved as one stacked
+  ``np.linalg.solve``.  ``markov_attribution`` splits revenue by removal
+  effect; ``shapley_attribution`` estimates the Shapley value of each channel
+  in the same chain by Monte Carlo over channel orderings, in batches spread
+  over a process pool.
+
+Attribution keeps the converted value of the paths; only its split changes.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .hashing import frame_digest
+from .instrumentation import instrumented
+from .rendering import FigureTemplate, RenderConfig, render_figure
+
+
+CHANNEL_KEYS = ["platform", "campaign_name"]
+
+ATTRIBUTION_TEMPLATE = FigureTemplate(name="attribution_by_platform", figsize=(10, 6), style="whitegrid")
+
+
+@dataclass
+class AttributionOutputs:
+    """Paths generated by run_attribution."""
+
+    campaign_csv: Path
+    platform_csv: Path
+    figure: Path
+
+
+@dataclass
+class Paths:
+    """
+    User journeys in flat form: path ``i`` touches channels
+    ``touches[offsets[i]:offsets[i + 1]]`` in order (at least one touch).
+    """
+
+    channels: pd.DataFrame
+    touches: np.ndarray
+    offsets: np.ndarray
+    converted: np.ndarray
+    value: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.converted)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @classmethod
+    def from_events(
+        cls,
+        events: pd.DataFrame,
+        user_column: str = "user_id",
+        time_column: str = "timestamp",
+        converted_column: str = "converted",
+        value_column: str = "value",
+        channel_columns: Sequence[str] = CHANNEL_KEYS,
+    ) -> "Paths":
+        """
+        One path per user from an exposure log, touches in time order.
+
+        A user converts if any of their rows is flagged ``converted``; the
+        path value is the sum of ``value_column``.
+        """
+        ordered = events.sort_values([user_column, time_column], kind="stable")
+        codes, channels = pd.MultiIndex.from_frame(ordered[list(channel_columns)]).factorize()
+        users = ordered[user_column].to_numpy()
+        starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+        return cls(
+            channels=pd.DataFrame(list(channels), columns=list(channel_columns)),
+            touches=codes.astype(np.int32),
+            offsets=np.r_[starts, len(users)].astype(np.int64),
+            converted=np.logical_or.reduceat(ordered[converted_column].to_numpy(dtype=bool), starts),
+            value=np.add.reduceat(ordered[value_column].fillna(0).to_numpy(dtype=np.float64), starts),
+        )
+
+
+def channel_summary(integrated: pd.DataFrame) -> pd.DataFrame:
+    """Clicks, conversions and reported revenue per (platform, campaign)."""
+    metrics = integrated[CHANNEL_KEYS + ["clicks", "conversions", "revenue"]]
+    return metrics.groupby(CHANNEL_KEYS, sort=True, observed=True).sum(min_count=0).reset_index()
+
+
+def _draw(weights: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    cdf = np.cumsum(weights / weights.sum())
+    return np.minimum(np.searchsorted(cdf, rng.random(size), side="right"), len(weights) - 1).astype(np.int32)
+
+
+@instrumented()
+def simulate_paths(
+    summary: pd.DataFrame,
+    n_paths: int = 1_000_000,
+    mean_touches: float = 3.0,
+    seed: int = 42,
+) -> Paths:
+    """
+    Journeys consistent with the platform aggregates of ``channel_summary``.
+
+    Path lengths are geometric with mean ``mean_touches`` and touches are
+    drawn in proportion to clicks.  A path converts with probability
+    ``conversions / (clicks / mean_touches)`` and then ends on a channel drawn
+    in proportion to its reported conversions, worth that channel's revenue
+    per conversion.  Values are scaled so the converted total equals the
+    reported revenue, i.e. the simulated last-touch split matches
+    ``integrated_data.csv``.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed))
+    clicks = summary["clicks"].fillna(0).to_numpy(dtype=np.float64)
+    conversions = summary["conversions"].fillna(0).to_numpy(dtype=np.float64)
+    revenue = summary["revenue"].fillna(0).to_numpy(dtype=np.float64)
+
+    lengths = rng.geometric(1.0 / mean_touches, n_paths)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    touches = _draw(clicks, int(offsets[-1]), rng)
+
+    conversion_rate = min(1.0, conversions.sum() * mean_touches / clicks.sum())
+    converted = rng.random(n_paths) < conversion_rate
+    last = offsets[1:] - 1
+    touches[last[converted]] = _draw(conversions, int(converted.sum()), rng)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        order_value = np.where(conversions > 0, revenue / conversions, 0.0)
+    value = np.where(converted, order_value[touches[last]], 0.0)
+    value *= revenue.sum() / value.sum()
+    return Paths(
+        channels=summary[CHANNEL_KEYS].reset_index(drop=True),
+        touches=touches,
+        offsets=offsets,
+        converted=converted,
+        value=value,
+    )
+
+
+def transition_counts(paths: Paths) -> np.ndarray:
+    """
+    Transition counts between the states ``start`` (0), channels (1..K),
+    ``conversion`` (K + 1) and ``null`` (K + 2), from one ``bincount``.
+    """
+    size = len(paths.channels) + 3
+    state = paths.touches.astype(np.int64) + 1
+    previous = np.empty_like(state)
+    previous[1:] = state[:-1]
+    previous[paths.offsets[:-1]] = 0
+    absorbed = np.where(paths.converted, size - 2, size - 1)
+    pairs = np.concatenate([previous * size + state, state[paths.offsets[1:] - 1] * size + absorbed])
+    return np.bincount(pairs, minlength=size * size).reshape(size, size)
+
+
+def absorbing_chain(counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Transient-to-transient probabilities ``Q`` and one-step conversion probabilities ``r``."""
+    totals = counts.sum(axis=1, keepdims=True)
+    probabilities = counts / np.where(totals > 0, totals, 1)
+    transient = counts.shape[0] - 2
+    return probabilities[:transient, :transient], probabilities[:transient, transient]
+
+
+def conversion_probability(Q: np.ndarray, r: np.ndarray, active: np.ndarray) -> np.ndarray:
+    """
+    Probability of reaching ``conversion`` from ``start`` for each row of
+    ``active`` (``sets × channels`` booleans).  Transitions into inactive
+    channels go to ``null`` instead; all sets are one stacked solve.
+    """
+    active = np.atleast_2d(active)
+    keep = np.concatenate([np.ones((len(active), 1), dtype=bool), active], axis=1)
+    system = np.eye(len(r)) - Q[None] * keep[:, None, :]
+    rhs = np.broadcast_to(r, keep.shape)[..., None]
+    return np.linalg.solve(system, rhs)[:, 0, 0]
+
+
+@instrumented()
+def markov_attribution(paths: Paths) -> np.ndarray:
+    """Revenue shares by removal effect: the relative drop in conversion probability without each channel."""
+    Q, r = absorbing_chain(transition_counts(paths))
+    k = len(paths.channels)
+    probability = conversion_probability(Q, r, np.vstack([np.ones(k, dtype=bool), ~np.eye(k, dtype=bool)]))
+    effect = 1 - probability[1:] / probability[0]
+    return effect / effect.sum()
+
+
+# Per-process state for Shapley workers, set once by the initializer.
+_WORKER: dict = {}
+
+
+def _init_shapley_worker(Q: np.ndarray, r: np.ndarray, seed: int) -> None:
+    _WORKER.update(Q=Q, r=r, seed=seed)
+
+
+def _shapley_batch(task: Tuple[int, int]) -> np.ndarray:
+    """Marginal contribution of every channel in ``size`` random orderings."""
+    batch, size = task
+    Q, r = _WORKER["Q"], _WORKER["r"]
+    k = len(r) - 1
+    rng = np.random.default_rng(np.random.SeedSequence(_WORKER["seed"], spawn_key=(batch,)))
+    order = rng.permuted(np.tile(np.arange(k), (size, 1)), axis=1)
+    rank = np.argsort(order, axis=1)
+    # Coalition j of an ordering holds its first j + 1 channels.
+    coalitions = rank[:, None, :] <= np.arange(k)[None, :, None]
+    value = conversion_probability(Q, r, coalitions.reshape(size * k, k)).reshape(size, k)
+    marginal = np.diff(value, axis=1, prepend=0.0)
+    return np.take_along_axis(marginal, rank, axis=1)
+
+
+@instrumented()
+def shapley_attribution(
+    paths: Paths,
+    n_permutations: int = 2000,
+    batch_size: int = 100,
+    max_workers: Optional[int] = None,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Monte Carlo Shapley shares of the channels, and their standard errors.
+
+    A coalition's worth is the chain's conversion probability with only its
+    channels active.  Each ordering's marginals sum to the full probability,
+    so the shares always sum to one.  Results depend only on ``seed`` and
+    ``batch_size``, not on ``max_workers``; ``max_workers=1`` stays in the
+    current process.
+    """
+    Q, r = absorbing_chain(transition_counts(paths))
+    sizes = [min(batch_size, n_permutations - start) for start in range(0, n_permutations, batch_size)]
+    tasks = list(enumerate(sizes))
+    initargs = (Q, r, seed)
+
+    if max_workers == 1:
+        _init_shapley_worker(*initargs)
+        try:
+            batches = [_shapley_batch(task) for task in tasks]
+        finally:
+            _WORKER.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_shapley_worker, initargs=initargs) as pool:
+            batches = list(pool.map(_shapley_batch, tasks))
+
+    marginals = np.vstack(batches)
+    total = marginals.sum(axis=1).mean()
+    shares = marginals.mean(axis=0) / total
+    stderr = marginals.std(axis=0, ddof=1) / np.sqrt(len(marginals)) / total
+    return shares, stderr
+
+
+def platform_claims(paths: Paths) -> pd.Series:
+    """Converted value each platform would claim: every converting path it touched at least once."""
+    platforms, codes = np.unique(paths.channels["platform"].to_numpy(dtype=str), return_inverse=True)
+    path_ids = np.repeat(np.arange(len(paths)), paths.lengths)
+    touched = paths.converted[path_ids]
+    pairs = np.unique(path_ids[touched] * len(platforms) + codes[paths.touches[touched]])
+    claimed = np.bincount(pairs % len(platforms), weights=paths.value[pairs // len(platforms)], minlength=len(platforms))
+    return pd.Series(claimed, index=pd.Index(platforms, name="platform"), name="claimed_revenue")
+
+
+@instrumented()
+def attribute_revenue(
+    paths: Paths,
+    n_permutations: int = 2000,
+    max_workers: Optional[int] = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Converted value of ``paths`` per channel under last touch, the Markov
+    removal effect and Monte Carlo Shapley values.
+    """
+    total = float(paths.value[paths.converted].sum())
+    last_touch = np.bincount(
+        paths.touches[paths.offsets[1:] - 1], weights=paths.value * paths.converted, minlength=len(paths.channels)
+    )
+    markov = markov_attribution(paths)
+    shapley, stderr = shapley_attribution(paths, n_permutations=n_permutations, max_workers=max_workers, seed=seed)
+
+    table = paths.channels.copy()
+    table["touches"] = np.bincount(paths.touches, minlength=len(table))
+    table["last_touch_revenue"] = last_touch
+    table["markov_share"] = markov
+    table["markov_revenue"] = markov * total
+    table["shapley_share"] = shapley
+    table["shapley_stderr"] = stderr
+    table["shapley_revenue"] = shapley * total
+    return table
+
+
+def platform_rollup(table: pd.DataFrame, paths: Paths) -> pd.DataFrame:
+    """Campaign attribution summed per platform, with each platform's own (overlapping) claim."""
+    columns = ["touches", "last_touch_revenue", "markov_share", "markov_revenue", "shapley_share", "shapley_revenue"]
+    rollup = table.groupby("platform", sort=True)[columns].sum()
+    return rollup.join(platform_claims(paths)).reset_index()
+
+
+@instrumented()
+def plot_attribution(
+    rollup: pd.DataFrame,
+    output_dir: Path,
+    render_config: Optional[RenderConfig] = None,
+) -> Path:
+    """Revenue per platform under last touch, Markov and Shapley attribution."""
+    models = {
+        "last_touch_revenue": "Last touch (reported)",
+        "markov_revenue": "Markov removal effect",
+        "shapley_revenue": "Shapley (Monte Carlo)",
+        "claimed_revenue": "Platform claim (any touch)",
+    }
+
+    def draw(fig, axes) -> None:
+        ax = axes[0, 0]
+        x = np.arange(len(rollup))
+        width = 0.8 / len(models)
+        for i, (column, label) in enumerate(models.items()):
+            ax.bar(x + (i - (len(models) - 1) / 2) * width, rollup[column], width, label=label)
+        ax.set_xticks(x)
+        ax.set_xticklabels(rollup["platform"])
+        ax.set_ylabel("Revenue (USD)")
+        ax.set_title("Revenue by platform under multi-touch attribution")
+        ax.legend()
+
+    data_hash = frame_digest(rollup[["platform", *models]])
+    return render_figure(ATTRIBUTION_TEMPLATE, draw, output_dir / "attribution_by_platform", data_hash, render_config)
+
+
+def run_attribution(
+    integrated_path: Path,
+    reports_dir: Path,
+    figures_dir: Path,
+    events_path: Optional[Path] = None,
+    n_paths: int = 1_000_000,
+    mean_touches: float = 3.0,
+    n_permutations: int = 2000,
+    max_workers: Optional[int] = None,
+    seed: int = 42,
+    render_config: Optional[RenderConfig] = None,
+) -> AttributionOutputs:
+    """
+    Re-attribute revenue per campaign and platform.
+
+    Paths come from ``events_path`` (an exposure log for ``Paths.from_events``)
+    when given, otherwise ``n_paths`` journeys are simulated from the
+    integrated data.  Writes ``attribution_by_campaign.csv``,
+    ``attribution_by_platform.csv`` and a comparison figure.
+    """
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    summary = channel_summary(pd.read_csv(integrated_path))
+    if events_path is not None:
+        paths = Paths.from_events(pd.read_csv(events_path))
+    else:
+        paths = simulate_paths(summary, n_paths=n_paths, mean_touches=mean_touches, seed=seed)
+
+    table = attribute_revenue(paths, n_permutations=n_permutations, max_workers=max_workers, seed=seed)
+    table = table.merge(summary[CHANNEL_KEYS + ["revenue"]], on=CHANNEL_KEYS, how="left")
+    table = table.rename(columns={"revenue": "reported_revenue"})
+    rollup = platform_rollup(table, paths)
+    rollup = rollup.merge(table.groupby("platform")["reported_revenue"].sum().reset_index(), on="platform")
+
+    campaign_path = reports_dir / "attribution_by_campaign.csv"
+    platform_path = reports_dir / "attribution_by_platform.csv"
+    table.sort_values("shapley_revenue", ascending=False).to_csv(campaign_path, index=False)
+    rollup.to_csv(platform_path, index=False)
+    figure_path = plot_attribution(rollup, figures_dir, render_config=render_config)
+    return AttributionOutputs(campaign_csv=campaign_path, platform_csv=platform_path, figure=figure_path)
+
+
+__all__ = [
+    "AttributionOutputs",
+    "Paths",
+    "channel_summary",
+    "simulate_paths",
+    "transition_counts",
+    "absorbing_chain",
+    "conversion_probability",
+    "markov_attribution",
+    "shapley_attribution",
+    "platform_claims",
+    "attribute_revenue",
+    "platform_rollup",
+    "plot_attribution",
+    "run_attribution",
+]
@@ -0,0 +1,359 @@
+"""
+Benchmark suite for the Week 1–3 pipeline stages.
+
+Scaled fixtures are built by tiling the regular raw exports: campaigns (Meta,
+Google) and ad groups (TikTok) are replicated under new names and the whole
+year is repeated in later years, so every export quirk ("--", "< 10", percent
+strings, Google's metadata header) survives at 10×, 100× or 1000× the rows.
+Each stage is timed through ``instrumentation.stage``, which yields wall time,
+CPU time and peak RSS; throughput is reported as input rows per second.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import instrumentation
+from .week1_data_prep import (
+    clean_google_ads,
+    clean_meta_ads,
+    clean_tiktok_ads,
+    integrate_platforms,
+)
+from .week2_roas_modeling import (
+    build_feature_matrix,
+    prepare_daily_features,
+    time_series_split_masks,
+    train_residual_random_forest,
+)
+from .week3_ab_testing import CREATIVE_A, CREATIVE_B, run_ttests, simulate_creative
+
+
+RAW_FILES = {
+    "meta": "meta_ads_raw.csv",
+    "google": "google_ads_raw.csv",
+    "tiktok": "tiktok_ads_raw.csv",
+}
+
+GOOGLE_HEADER_LINES = 3
+
+
+@dataclass(frozen=True)
+class ScaleSpec:
+    """How a scale factor is split between extra campaigns and extra years."""
+
+    scale: int
+    entity_copies: int
+    year_copies: int
+
+    @classmethod
+    def from_scale(cls, scale: int) -> "ScaleSpec":
+        if scale < 1:
+            raise ValueError("scale must be >= 1")
+        year_copies = 4 if scale % 4 == 0 else 2 if scale % 2 == 0 else 1
+        return cls(scale=scale, entity_copies=scale // year_copies, year_copies=year_copies)
+
+
+@dataclass
+class BenchmarkResult:
+    scale: int
+    stage: str
+    rows: int
+    wall_seconds: float
+    cpu_seconds: float
+    peak_rss_mb: Optional[float]
+    rows_per_second: Optional[float]
+
+
+def _read_raw(path: Path, skiprows: int = 0) -> pd.DataFrame:
+    return pd.read_csv(path, dtype=str, keep_default_na=False, skiprows=skiprows)
+
+
+def _shift_years(dates: pd.Series, years: int) -> pd.Series:
+    if years == 0:
+        return dates
+    shifted = pd.to_datetime(dates) + pd.DateOffset(years=years)
+    return shifted.dt.strftime("%Y-%m-%d")
+
+
+def _write_tiled(
+    base: pd.DataFrame,
+    output_path: Path,
+    spec: ScaleSpec,
+    date_cols: List[str],
+    rename: Callable[[pd.DataFrame, int], None],
+    header_lines: str = "",
+) -> int:
+    """Stream ``entity_copies × year_copies`` variants of ``base`` to disk."""
+    rows = 0
+    with output_path.open("w", newline="", encoding="utf-8") as handle:
+        handle.write(header_lines)
+        first = True
+        for year in range(spec.year_copies):
+            shifted = base.copy()
+            for col in date_cols:
+                shifted[col] = _shift_years(shifted[col], year)
+            for copy in range(spec.entity_copies):
+                chunk = shifted.copy()
+                rename(chunk, copy)
+                chunk.to_csv(handle, index=False, header=first)
+                first = False
+                rows += len(chunk)
+    return rows
+
+
+def build_scaled_exports(raw_dir: Path, output_dir: Path, scale: int) -> Dict[str, int]:
+    """
+    Write scaled copies of the three raw exports into ``output_dir``.
+
+    Returns the number of data rows written per platform.
+    """
+    spec = ScaleSpec.from_scale(scale)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def suffix(copy: int) -> str:
+        return "" if copy == 0 else f"_r{copy:04d}"
+
+    def rename_meta(chunk: pd.DataFrame, copy: int) -> None:
+        chunk["Campaign name"] = chunk["Campaign name"] + suffix(copy)
+
+    def rename_google(chunk: pd.DataFrame, copy: int) -> None:
+        chunk["Campaign"] = chunk["Campaign"] + suffix(copy)
+        ids = chunk["Campaign ID"].astype(np.int64) + copy * 1000
+        chunk["Campaign ID"] = ids.astype(str)
+
+    def rename_tiktok(chunk: pd.DataFrame, copy: int) -> None:
+        chunk["Ad Group Name"] = chunk["Ad Group Name"] + suffix(copy)
+
+    google_path = raw_dir / RAW_FILES["google"]
+    with google_path.open(encoding="utf-8") as handle:
+        google_header = "".join(handle.readline() for _ in range(GOOGLE_HEADER_LINES))
+
+    return {
+        "meta": _write_tiled(
+            _read_raw(raw_dir / RAW_FILES["meta"]),
+            output_dir / RAW_FILES["meta"],
+            spec,
+            ["Reporting starts", "Reporting ends"],
+            rename_meta,
+        ),
+        "google": _write_tiled(
+            _read_raw(google_path, skiprows=GOOGLE_HEADER_LINES),
+            output_dir / RAW_FILES["google"],
+            spec,
+            ["Day"],
+            rename_google,
+            header_lines=google_header,
+        ),
+        "tiktok": _write_tiled(
+            _read_raw(raw_dir / RAW_FILES["tiktok"]),
+            output_dir / RAW_FILES["tiktok"],
+            spec,
+            ["Date"],
+            rename_tiktok,
+        ),
+    }
+
+
+def ensure_fixture(raw_dir: Path, fixtures_root: Path, scale: int, regenerate: bool = False) -> Path:
+    """Return the fixture directory for ``scale``, building it if needed."""
+    fixture_dir = fixtures_root / f"scale_{scale}"
+    complete = all((fixture_dir / name).exists() for name in RAW_FILES.values())
+    if regenerate or not complete:
+        build_scaled_exports(raw_dir, fixture_dir, scale)
+    return fixture_dir
+
+
+def _timed(
+    log: instrumentation.RunLog,
+    scale: int,
+    name: str,
+    rows: int,
+    func: Callable[[], object],
+    repeats: int,
+) -> Tuple[object, BenchmarkResult]:
+    """Run ``func`` ``repeats`` times, keeping the fastest wall time and max peak RSS."""
+    best: Optional[instrumentation.StageRecord] = None
+    peak: Optional[float] = None
+    result: object = None
+    for _ in range(repeats):
+        with instrumentation.stage(name, rows_in=rows):
+            result = func()
+        record = log.records[-1]
+        if best is None or record.wall_seconds < best.wall_seconds:
+            best = record
+        if record.peak_rss_mb is not None:
+            peak = max(peak or 0.0, record.peak_rss_mb)
+    assert best is not None
+    throughput = rows / best.wall_seconds if best.wall_seconds > 0 else None
+    return result, BenchmarkResult(
+        scale=scale,
+        stage=name,
+        rows=rows,
+        wall_seconds=best.wall_seconds,
+        cpu_seconds=best.cpu_seconds,
+        peak_rss_mb=peak,
+        rows_per_second=round(throughput, 1) if throughput else None,
+    )
+
+
+def run_scale(
+    fixture_dir: Path,
+    scale: int,
+    work_dir: Path,
+    repeats: int = 1,
+    search_iterations: int = 2,
+) -> List[BenchmarkResult]:
+    """Benchmark every stage on one scaled fixture."""
+    work_dir.mkdir(parents=True, exist_ok=True)
+    results: List[BenchmarkResult] = []
+    log = instrumentation.start_run()
+    try:
+        raw_rows = {}
+        for key, name in RAW_FILES.items():
+            with (fixture_dir / name).open(encoding="utf-8") as handle:
+                raw_rows[key] = sum(1 for _ in handle) - 1 - (GOOGLE_HEADER_LINES if key == "google" else 0)
+
+        frames = {}
+        for key, cleaner in (
+            ("meta", clean_meta_ads),
+            ("google", clean_google_ads),
+            ("tiktok", clean_tiktok_ads),
+        ):
+            frame, bench = _timed(
+                log, scale, cleaner.__name__, raw_rows[key],
+                lambda cleaner=cleaner, key=key: cleaner(fixture_dir / RAW_FILES[key]),
+                repeats,
+            )
+            frames[key] = frame
+            results.append(bench)
+
+        platform_frames = {"Meta": frames["meta"], "Google": frames["google"], "TikTok": frames["tiktok"]}
+        total_rows = sum(len(frame) for frame in frames.values())
+        integrated, bench = _timed(
+            log, scale, "integrate_platforms", total_rows,
+            lambda: integrate_platforms(platform_frames), repeats,
+        )
+        results.append(bench)
+
+        integrated_path = work_dir / "integrated_data.csv"
+        integrated.to_csv(integrated_path, index=False)
+
+        feature_df, bench = _timed(
+            log, scale, "prepare_daily_features", len(integrated),
+            lambda: prepare_daily_features(integrated_path), repeats,
+        )
+        results.append(bench)
+
+        (X, y_residual, _), bench = _timed(
+            log, scale, "build_feature_matrix", len(feature_df),
+            lambda: build_feature_matrix(feature_df), repeats,
+        )
+        results.append(bench)
+
+        train_mask, test_mask = time_series_split_masks(feature_df["date"])
+        X_train, y_train = X.iloc[train_mask], y_residual.iloc[train_mask]
+        X_test = X.iloc[test_mask]
+        model, bench = _timed(
+            log, scale, "train_residual_random_forest", len(X_train),
+            lambda: train_residual_random_forest(X_train, y_train, search_iterations=search_iterations),
+            repeats,
+        )
+        results.append(bench)
+
+        _, bench = _timed(
+            log, scale, "predict", len(X_test), lambda: model.predict(X_test), repeats,
+        )
+        results.append(bench)
+
+        stream_a, stream_b = np.random.SeedSequence(scale).spawn(2)
+        num_days = 35 * scale
+        creative_a = simulate_creative(
+            "A", num_days, learning_period=7, rng=np.random.default_rng(stream_a), **CREATIVE_A
+        )
+        creative_b = simulate_creative(
+            "B", num_days, learning_period=7, rng=np.random.default_rng(stream_b), **CREATIVE_B
+        )
+        _, bench = _timed(
+            log, scale, "run_ttests", len(creative_a) + len(creative_b),
+            lambda: run_ttests(creative_a, creative_b), repeats,
+        )
+        results.append(bench)
+    finally:
+        instrumentation.stop_run()
+    return results
+
+
+def environment_info() -> Dict[str, object]:
+    import os
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(results: List[BenchmarkResult], output_path: Path) -> Path:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "environment": environment_info(),
+        "results": [asdict(result) for result in results],
+    }
+    output_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return output_path
+
+
+def compare_results(
+    current: List[BenchmarkResult],
+    baseline_path: Path,
+    threshold: float = 0.2,
+    min_seconds: float = 0.05,
+) -> pd.DataFrame:
+    """
+    Compare ``current`` against a stored run.
+
+    Returns one row per (scale, stage) present in both runs with the wall-time
+    and peak-memory ratios; ``regression`` flags wall-time slowdowns above
+    ``threshold`` (0.2 = 20 % slower).  Stages faster than ``min_seconds`` in
+    the baseline are too noisy to flag.
+    """
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    base = pd.DataFrame(baseline).set_index(["scale", "stage"])
+    cur = pd.DataFrame([asdict(result) for result in current]).set_index(["scale", "stage"])
+    joined = cur.join(base, how="inner", lsuffix="", rsuffix="_baseline")
+    comparison = pd.DataFrame(
+        {
+            "wall_seconds": joined["wall_seconds"],
+            "wall_seconds_baseline": joined["wall_seconds_baseline"],
+            "wall_ratio": joined["wall_seconds"] / joined["wall_seconds_baseline"],
+            "peak_rss_ratio": joined["peak_rss_mb"] / joined["peak_rss_mb_baseline"],
+        }
+    )
+    comparison["regression"] = (comparison["wall_ratio"] > 1 + threshold) & (
+        comparison["wall_seconds_baseline"] >= min_seconds
+    )
+    return comparison.reset_index()
+
+
+__all__ = [
+    "ScaleSpec",
+    "BenchmarkResult",
+    "build_scaled_exports",
+    "ensure_fixture",
+    "run_scale",
+    "write_results",
+    "compare_results",
+]
@@ -0,0 +1,294 @@
+"""
+Feature drift monitoring for the Week 2 model.
+
+At training time every model input is summarised by a ``FeatureSketch``: cut
+points at the training quantiles plus the training count per bin (ten bins,
+a few hundred bytes per feature).  Live feature rows are binned against the same
+cut points as they arrive and kept as one small histogram per day for the last
+``window_days`` days, so the monitor never needs the raw training data and its
+size does not grow with traffic.
+
+Drift is measured per feature between the reference and the live window:
+
+- PSI (population stability index): ``sum((live - ref) * ln(live / ref))``
+  over bin shares;
+- KS: the largest gap between the two binned CDFs (a lower bound of the exact
+  two-sample statistic).
+
+A few weeks of data never look like a whole year: rolling means are
+autocorrelated and spend follows the monthly multipliers.  Each sketch
+therefore also stores a ``baseline``, the largest PSI any ``window_days``
+window *inside* the training period reached against the full reference.  A
+feature counts as drifted only when the live PSI exceeds both its baseline
+and ``PSI_SIGNIFICANT``.  Columns derived only from the date (month dummies,
+holiday distances) change with every window by construction; they can be
+sketched as report-only so that seasonality is judged by the metrics it moves.
+``DriftMonitor.should_retrain`` turns the drifted features into a retrain
+decision so the model is refit when its inputs move beyond what it was trained
+on rather than on a fixed schedule.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+MONITOR_VERSION = 1
+
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Share floor for empty bins so PSI stays finite.
+_EPSILON = 1e-4
+
+
+def psi(reference: np.ndarray, live: np.ndarray) -> float:
+    """Population stability index between two histograms over the same bins."""
+    ref = np.maximum(reference / max(reference.sum(), 1), _EPSILON)
+    cur = np.maximum(live / max(live.sum(), 1), _EPSILON)
+    return float(np.sum((cur - ref) * np.log(cur / ref)))
+
+
+def binned_ks(reference: np.ndarray, live: np.ndarray) -> float:
+    """Largest gap between the CDFs of two histograms over the same bins."""
+    ref = np.cumsum(reference) / max(reference.sum(), 1)
+    cur = np.cumsum(live) / max(live.sum(), 1)
+    return float(np.max(np.abs(ref - cur)))
+
+
+@dataclass
+class FeatureSketch:
+    """Quantile-bin histogram of one training feature."""
+
+    name: str
+    cuts: np.ndarray
+    reference: np.ndarray
+    baseline: float = 0.0
+    monitored: bool = True
+
+    @classmethod
+    def from_values(cls, name: str, values: np.ndarray, n_bins: int = 10) -> "FeatureSketch":
+        finite = values[~np.isnan(values)]
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        cuts = np.unique(np.quantile(finite, quantiles)) if len(finite) else np.array([])
+        sketch = cls(name=name, cuts=cuts, reference=np.zeros(len(cuts) + 1, dtype=np.int64))
+        sketch.reference = sketch.bin_counts(values)
+        return sketch
+
+    @property
+    def n_bins(self) -> int:
+        return len(self.cuts) + 1
+
+    def bins(self, values: np.ndarray) -> np.ndarray:
+        """Bin index per value, ``-1`` for NaN."""
+        index = np.searchsorted(self.cuts, values, side="right")
+        return np.where(np.isnan(values), -1, index)
+
+    def bin_counts(self, values: np.ndarray) -> np.ndarray:
+        index = self.bins(values)
+        return np.bincount(index[index >= 0], minlength=self.n_bins).astype(np.int64)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "cuts": self.cuts.tolist(),
+            "reference": self.reference.tolist(),
+            "baseline": self.baseline,
+            "monitored": self.monitored,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FeatureSketch":
+        return cls(
+            name=data["name"],
+            cuts=np.asarray(data["cuts"], dtype=np.float64),
+            reference=np.asarray(data["reference"], dtype=np.int64),
+            baseline=float(data["baseline"]),
+            monitored=bool(data["monitored"]),
+        )
+
+
+class DriftMonitor:
+    """
+    Reference sketches for every model input plus a sliding window of live days.
+
+    Live counts are stored per day as one flat vector over all features' bins
+    (``offsets`` marks where each feature starts).
+    """
+
+    def __init__(
+        self,
+        sketches: Sequence[FeatureSketch],
+        window_days: int = 28,
+        trained_at: Optional[str] = None,
+    ):
+        self.sketches = {sketch.name: sketch for sketch in sketches}
+        self.window_days = window_days
+        self.trained_at = trained_at
+        sizes = [sketch.n_bins for sketch in self.sketches.values()]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.days: Dict[str, np.ndarray] = {}
+
+    def _flat_bins(self, X: pd.DataFrame) -> np.ndarray:
+        """Row × feature matrix of flat bin positions (``-1`` for NaN)."""
+        missing = [name for name in self.sketches if name not in X.columns]
+        if missing:
+            raise ValueError(f"Rows lack monitored features: {missing}")
+        values = X[list(self.sketches)].to_numpy(dtype=np.float64)
+        columns = []
+        for index, sketch in enumerate(self.sketches.values()):
+            bins = sketch.bins(values[:, index])
+            columns.append(np.where(bins >= 0, bins + self.offsets[index], -1))
+        return np.column_stack(columns)
+
+    def _counts(self, flat: np.ndarray) -> np.ndarray:
+        return np.bincount(flat[flat >= 0], minlength=int(self.offsets[-1])).astype(np.int64)
+
+    def _segments(self, counts: np.ndarray) -> List[np.ndarray]:
+        return [counts[start:end] for start, end in zip(self.offsets[:-1], self.offsets[1:])]
+
+    @classmethod
+    def from_training(
+        cls,
+        X: pd.DataFrame,
+        dates: Sequence[Any],
+        n_bins: int = 10,
+        window_days: int = 28,
+        trained_at: Optional[str] = None,
+        report_only: Sequence[str] = (),
+    ) -> "DriftMonitor":
+        """
+        Sketch ``X`` and calibrate each feature's baseline PSI over every
+        ``window_days`` window of the training period.
+
+        Features in ``report_only`` appear in ``report`` but never trigger a
+        retrain.
+        """
+        values = X.to_numpy(dtype=np.float64)
+        sketches = [
+            FeatureSketch.from_values(name, values[:, index], n_bins)
+            for index, name in enumerate(X.columns)
+        ]
+        for sketch in sketches:
+            sketch.monitored = sketch.name not in report_only
+        monitor = cls(sketches, window_days=window_days, trained_at=trained_at)
+
+        days = pd.to_datetime(pd.Series(dates)).dt.normalize().to_numpy()
+        flat = monitor._flat_bins(X)
+        window = np.timedelta64(window_days, "D")
+        last_start = max(days.max() - window + np.timedelta64(1, "D"), days.min())
+        for start in np.arange(days.min(), last_start + np.timedelta64(1, "D"), np.timedelta64(1, "D")):
+            in_window = (days >= start) & (days < start + window)
+            segments = monitor._segments(monitor._counts(flat[in_window]))
+            for sketch, segment in zip(monitor.sketches.values(), segments):
+                sketch.baseline = max(sketch.baseline, psi(sketch.reference, segment))
+        return monitor
+
+    def update(self, X: pd.DataFrame, dates: Sequence[Any]) -> None:
+        """Add live feature rows (columns as at training time) and slide the window."""
+        labels = pd.to_datetime(pd.Series(dates)).dt.strftime("%Y-%m-%d").to_numpy()
+        flat = self._flat_bins(X)
+        for day in np.unique(labels):
+            counts = self._counts(flat[labels == day])
+            self.days[day] = self.days[day] + counts if day in self.days else counts
+        for day in sorted(self.days)[: -self.window_days]:
+            del self.days[day]
+
+    def reset(self) -> None:
+        """Forget live rows, e.g. after the model has been retrained elsewhere."""
+        self.days = {}
+
+    @property
+    def live_dates(self) -> List[str]:
+        return sorted(self.days)
+
+    @property
+    def live_rows(self) -> int:
+        first_bins = slice(self.offsets[0], self.offsets[1])
+        return int(sum(counts[first_bins].sum() for counts in self.days.values()))
+
+    def report(self) -> pd.DataFrame:
+        """PSI, KS and baseline per feature over the live window, most drifted first."""
+        live = sum(self.days.values()) if self.days else np.zeros(int(self.offsets[-1]), dtype=np.int64)
+        rows = []
+        for sketch, segment in zip(self.sketches.values(), self._segments(live)):
+            value = psi(sketch.reference, segment) if self.days else 0.0
+            ks = binned_ks(sketch.reference, segment) if self.days else 0.0
+            drifted = value > max(PSI_SIGNIFICANT, sketch.baseline)
+            # Above PSI_MODERATE but within the training windows' range.
+            status = "drifted" if drifted else "seasonal" if value > PSI_MODERATE else "stable"
+            rows.append(
+                {
+                    "feature": sketch.name,
+                    "psi": value,
+                    "ks": ks,
+                    "baseline_psi": sketch.baseline,
+                    "status": status if sketch.monitored else f"{status} (report only)",
+                }
+            )
+        return pd.DataFrame(rows).sort_values("psi", ascending=False).reset_index(drop=True)
+
+    def should_retrain(self, min_drifted: int = 1, min_days: Optional[int] = None) -> Tuple[bool, List[str]]:
+        """
+        Recommend a retrain once ``min_drifted`` monitored features have drifted over a
+        live window of at least ``min_days`` days (default: half the window).
+
+        Returns ``(decision, drifted feature names)``.
+        """
+        if min_days is None:
+            min_days = self.window_days // 2
+        if len(self.days) < min_days:
+            return False, []
+        report = self.report()
+        drifted = report.loc[report["status"] == "drifted", "feature"].tolist()
+        return len(drifted) >= min_drifted, drifted
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": MONITOR_VERSION,
+            "trained_at": self.trained_at,
+            "window_days": self.window_days,
+            "sketches": [sketch.to_dict() for sketch in self.sketches.values()],
+            "days": {day: counts.tolist() for day, counts in sorted(self.days.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DriftMonitor":
+        if data.get("version") != MONITOR_VERSION:
+            raise ValueError(f"Unsupported drift monitor version {data.get('version')!r}")
+        monitor = cls(
+            [FeatureSketch.from_dict(sketch) for sketch in data["sketches"]],
+            window_days=data["window_days"],
+            trained_at=data["trained_at"],
+        )
+        monitor.days = {day: np.asarray(counts, dtype=np.int64) for day, counts in data["days"].items()}
+        return monitor
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "DriftMonitor":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+__all__ = [
+    "PSI_MODERATE",
+    "PSI_SIGNIFICANT",
+    "psi",
+    "binned_ks",
+    "FeatureSketch",
+    "DriftMonitor",
+]
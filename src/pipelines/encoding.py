@@ -0,0 +1,196 @@
+"""
+Categorical encodings for the Week 2 feature matrix.
+
+``prepare_daily_features`` keeps categorical columns (``month``, ``platform``)
+as plain columns; ``build_feature_matrix`` turns them into model inputs with a
+``CategoricalEncoder``:
+
+- ``onehot``: dense boolean indicator columns (the original ``get_dummies``
+  layout);
+- ``sparse``: the same indicators as a ``scipy.sparse`` CSR block, so the
+  matrix stays small with thousands of campaigns;
+- ``ordinal``: one integer code per column;
+- ``target``: one smoothed mean-target column per categorical column, computed
+  out of fold on the training frame.
+
+Categories are learned by ``fit`` and reused by ``transform``, so scoring new
+rows yields the training layout; unseen categories become an all-zero
+indicator row, code ``-1`` or the global target mean.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+
+ENCODINGS = ("onehot", "sparse", "ordinal", "target")
+CATEGORICAL_COLUMNS = ("month", "platform")
+
+
+class CategoricalEncoder:
+    """
+    Encode categorical columns as indicators, codes or out-of-fold target means.
+
+    Parameters
+    ----------
+    kind : one of ``ENCODINGS``.
+    columns : categorical columns to encode.
+    n_folds : row folds used for out-of-fold target statistics.  Rows are
+        dealt to folds by a seeded permutation, so a date-sorted frame does not
+        put whole months into a single fold.
+    smoothing : pseudo-count pulling rare categories towards the global mean.
+    random_state : seed of the fold permutation.
+    """
+
+    def __init__(
+        self,
+        kind: str = "onehot",
+        columns: Sequence[str] = CATEGORICAL_COLUMNS,
+        n_folds: int = 5,
+        smoothing: float = 10.0,
+        random_state: int = 42,
+    ):
+        if kind not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {kind!r}; expected one of {ENCODINGS}")
+        self.kind = kind
+        self.columns = list(columns)
+        self.n_folds = n_folds
+        self.smoothing = smoothing
+        self.random_state = random_state
+        self.categories_: Dict[str, pd.Index] = {}
+        self.target_means_: Dict[str, np.ndarray] = {}
+        self.prior_: float = 0.0
+
+    @property
+    def fitted(self) -> bool:
+        return bool(self.categories_)
+
+    @property
+    def feature_names_(self) -> List[str]:
+        if self.kind in ("onehot", "sparse"):
+            return [name for column in self.columns for name, _ in self._indicator_layout(column)]
+        suffix = "code" if self.kind == "ordinal" else "target"
+        return [f"{column}_{suffix}" for column in self.columns]
+
+    def _indicator_layout(self, column: str) -> List[tuple]:
+        # Indicator names in string order, matching the ``get_dummies`` +
+        # ``sorted()`` layout the model has always been trained on.
+        names = [(f"{column}_{value}", code) for code, value in enumerate(self.categories_[column])]
+        return sorted(names)
+
+    def _codes(self, frame: pd.DataFrame, column: str) -> np.ndarray:
+        return self.categories_[column].get_indexer(frame[column])
+
+    def fit(self, frame: pd.DataFrame, y: Optional[pd.Series] = None) -> "CategoricalEncoder":
+        self.categories_ = {
+            column: pd.Index(np.sort(frame[column].dropna().unique())) for column in self.columns
+        }
+        if self.kind == "target":
+            if y is None:
+                raise ValueError("target encoding needs y")
+            target = np.asarray(y, dtype=float)
+            self.prior_ = float(target.mean())
+            for column in self.columns:
+                codes = self._codes(frame, column)
+                sums, counts = self._totals(codes, target, len(self.categories_[column]))
+                self.target_means_[column] = self._smoothed(sums, counts)
+        return self
+
+    def _totals(self, codes: np.ndarray, target: np.ndarray, size: int):
+        known = codes >= 0
+        sums = np.bincount(codes[known], weights=target[known], minlength=size)
+        counts = np.bincount(codes[known], minlength=size).astype(float)
+        return sums, counts
+
+    def _smoothed(self, sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        return (sums + self.smoothing * self.prior_) / (counts + self.smoothing)
+
+    def _out_of_fold(self, frame: pd.DataFrame, column: str, target: np.ndarray) -> np.ndarray:
+        """Encode each row with statistics from the other folds only."""
+        codes = self._codes(frame, column)
+        size = len(self.categories_[column])
+        # Contiguous folds over a date-sorted frame hold out whole months, which
+        # then fall back to the prior for every training row.
+        rng = np.random.default_rng(self.random_state)
+        folds = rng.permutation(len(frame)) % self.n_folds
+        known = codes >= 0
+        keys = folds[known] * size + codes[known]
+        fold_sums = np.bincount(keys, weights=target[known], minlength=self.n_folds * size)
+        fold_counts = np.bincount(keys, minlength=self.n_folds * size).astype(float)
+        fold_sums = fold_sums.reshape(self.n_folds, size)
+        fold_counts = fold_counts.reshape(self.n_folds, size)
+        other_sums = fold_sums.sum(axis=0) - fold_sums
+        other_counts = fold_counts.sum(axis=0) - fold_counts
+        table = self._smoothed(other_sums, other_counts)
+        return np.where(known, table[folds, np.maximum(codes, 0)], self.prior_)
+
+    def fit_transform(
+        self, frame: pd.DataFrame, y: Optional[pd.Series] = None
+    ) -> Union[pd.DataFrame, "sparse.csr_matrix"]:
+        self.fit(frame, y)
+        if self.kind != "target":
+            return self.transform(frame)
+        target = np.asarray(y, dtype=float)
+        return pd.DataFrame(
+            {f"{column}_target": self._out_of_fold(frame, column, target) for column in self.columns},
+            index=frame.index,
+        )
+
+    def transform(self, frame: pd.DataFrame) -> Union[pd.DataFrame, "sparse.csr_matrix"]:
+        if not self.fitted:
+            raise ValueError("CategoricalEncoder is not fitted")
+        if self.kind == "sparse":
+            return self._sparse_indicators(frame)
+        if self.kind == "onehot":
+            blocks = {}
+            for column in self.columns:
+                codes = self._codes(frame, column)
+                for name, code in self._indicator_layout(column):
+                    blocks[name] = codes == code
+            return pd.DataFrame(blocks, index=frame.index)
+        if self.kind == "ordinal":
+            return pd.DataFrame(
+                {f"{column}_code": self._codes(frame, column) for column in self.columns},
+                index=frame.index,
+            )
+        return pd.DataFrame(
+            {
+                f"{column}_target": self._target_values(self._codes(frame, column), column)
+                for column in self.columns
+            },
+            index=frame.index,
+        )
+
+    def _target_values(self, codes: np.ndarray, column: str) -> np.ndarray:
+        return np.where(codes >= 0, self.target_means_[column][np.maximum(codes, 0)], self.prior_)
+
+    def _sparse_indicators(self, frame: pd.DataFrame) -> "sparse.csr_matrix":
+        from scipy import sparse
+
+        rows, cols = [], []
+        offset = 0
+        for column in self.columns:
+            position = np.empty(len(self.categories_[column]), dtype=np.int64)
+            for index, (_, code) in enumerate(self._indicator_layout(column)):
+                position[code] = offset + index
+            codes = self._codes(frame, column)
+            known = np.flatnonzero(codes >= 0)
+            rows.append(known)
+            cols.append(position[codes[known]])
+            offset += len(position)
+        rows_all = np.concatenate(rows)
+        data = np.ones(len(rows_all), dtype=np.float64)
+        return sparse.csr_matrix((data, (rows_all, np.concatenate(cols))), shape=(len(frame), offset))
+
+
+__all__ = [
+    "ENCODINGS",
+    "CATEGORICAL_COLUMNS",
+    "CategoricalEncoder",
+]
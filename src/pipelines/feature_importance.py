@@ -0,0 +1,265 @@
+"""
+Feature attribution for the Week 2 residual Random Forest.
+
+Two views of what drives the model on the test window:
+
+- permutation importance: the increase in residual MAE when one feature is
+  shuffled.  All repeats of a feature are stacked into a single ``predict``
+  call (forest prediction cost is dominated by per-call overhead, not rows),
+  and features are spread over a process pool whose workers receive the model
+  and test matrix once;
+- tree-path contributions (Saabas-style, a cheap SHAP approximation): every
+  split on a row's path credits ``value[child] - value[parent]`` to the split
+  feature.  ``decision_path`` gives the row × node indicator of the whole
+  flattened forest, so all contributions are one sparse matrix product.
+
+``run_feature_importance`` writes a ranked CSV table and a bar chart.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .hashing import frame_digest
+from .instrumentation import instrumented
+from .rendering import FigureTemplate, RenderConfig, render_figure
+from .week2_roas_modeling import (
+    build_feature_matrix,
+    feature_matrix_columns,
+    prepare_daily_features,
+    time_series_split_masks,
+)
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestRegressor
+
+
+IMPORTANCE_TEMPLATE = FigureTemplate(
+    name="feature_importance",
+    figsize=(9, 8),
+    style="whitegrid",
+)
+
+
+@dataclass
+class ImportanceOutputs:
+    """Paths generated by run_feature_importance."""
+
+    table_csv: Path
+    figure: Path
+
+
+# Per-process state for permutation workers, set once by the initializer.
+_WORKER: dict = {}
+
+
+def _model_input(model, values: np.ndarray, names: List[str]):
+    """``values`` in the form ``model`` was fit on: named frame or plain array."""
+    # A forest fit on the sparse encoding has no ``feature_names_in_`` and
+    # warns when given column names; one fit on a frame warns without them.
+    if hasattr(model, "feature_names_in_"):
+        return pd.DataFrame(values, columns=names)
+    return values
+
+
+def _init_permutation_worker(
+    model, X: np.ndarray, y: np.ndarray, names: List[str], n_repeats: int, seed: int
+) -> None:
+    # One forest job per process; the pool provides the parallelism.
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1
+    _WORKER.update(model=model, X=X, y=y, names=names, n_repeats=n_repeats, seed=seed)
+
+
+def _permuted_losses(column: int) -> np.ndarray:
+    """MAE of every repeat with ``column`` shuffled, from one stacked predict."""
+    model, X, y = _WORKER["model"], _WORKER["X"], _WORKER["y"]
+    n_repeats = _WORKER["n_repeats"]
+    rng = np.random.default_rng(np.random.SeedSequence(_WORKER["seed"], spawn_key=(column,)))
+    stacked = np.tile(X, (n_repeats, 1))
+    stacked[:, column] = np.concatenate([X[rng.permutation(len(X)), column] for _ in range(n_repeats)])
+    predictions = model.predict(_model_input(model, stacked, _WORKER["names"]))
+    predictions = predictions.reshape(n_repeats, len(X))
+    return np.abs(predictions - y).mean(axis=1)
+
+
+@instrumented()
+def permutation_importance(
+    model: RandomForestRegressor,
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_repeats: int = 10,
+    random_state: int = 42,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Increase in MAE when each column of ``X`` is permuted.
+
+    Results depend only on ``random_state``, not on ``max_workers``; pass
+    ``max_workers=1`` to stay in the current process.
+    """
+    names = list(X.columns)
+    values = np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+    target = np.asarray(y, dtype=np.float64)
+    baseline = float(np.abs(model.predict(_model_input(model, values, names)) - target).mean())
+    initargs = (model, values, target, names, n_repeats, random_state)
+
+    columns = range(len(names))
+    if max_workers == 1:
+        saved_jobs = getattr(model, "n_jobs", None)
+        _init_permutation_worker(*initargs)
+        try:
+            losses = [_permuted_losses(column) for column in columns]
+        finally:
+            model.n_jobs = saved_jobs
+            _WORKER.clear()
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_permutation_worker,
+            initargs=initargs,
+        ) as pool:
+            losses = list(pool.map(_permuted_losses, columns))
+
+    increases = np.vstack(losses) - baseline
+    return pd.DataFrame(
+        {
+            "feature": names,
+            "importance_mean": increases.mean(axis=1),
+            "importance_std": increases.std(axis=1),
+        }
+    )
+
+
+@instrumented()
+def tree_contributions(
+    forest: RandomForestRegressor,
+    X: pd.DataFrame,
+) -> Tuple[float, pd.DataFrame]:
+    """
+    Per-row, per-feature path contributions of a fitted forest.
+
+    Returns ``(bias, contributions)`` with
+    ``forest.predict(X) == bias + contributions.sum(axis=1)``.
+    """
+    from scipy import sparse
+
+    values = np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+    indicator, node_ptr = forest.decision_path(_model_input(forest, values, list(X.columns)))
+    rows, cols, deltas = [], [], []
+    for tree, offset in zip(forest.estimators_, node_ptr[:-1]):
+        structure = tree.tree_
+        value = structure.value[:, 0, 0]
+        for children in (structure.children_left, structure.children_right):
+            parents = np.flatnonzero(children >= 0)
+            rows.append(children[parents] + offset)
+            cols.append(structure.feature[parents])
+            deltas.append(value[children[parents]] - value[parents])
+    n_trees = len(forest.estimators_)
+    steps = sparse.csr_matrix(
+        (np.concatenate(deltas) / n_trees, (np.concatenate(rows), np.concatenate(cols))),
+        shape=(indicator.shape[1], X.shape[1]),
+    )
+    contributions = np.asarray((indicator @ steps).todense())
+    bias = float(np.mean([tree.tree_.value[0, 0, 0] for tree in forest.estimators_]))
+    return bias, pd.DataFrame(contributions, columns=list(X.columns), index=X.index)
+
+
+def rank_features(
+    importance: pd.DataFrame,
+    contributions: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """Merge both views into one table ranked by permutation importance."""
+    table = importance.copy()
+    if contributions is not None:
+        table["mean_abs_contribution"] = table["feature"].map(contributions.abs().mean())
+        table["mean_contribution"] = table["feature"].map(contributions.mean())
+    table = table.sort_values("importance_mean", ascending=False).reset_index(drop=True)
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return table
+
+
+@instrumented()
+def plot_importance(
+    table: pd.DataFrame,
+    output_dir: Path,
+    top_n: int = 20,
+    render_config: Optional[RenderConfig] = None,
+) -> Path:
+    """Horizontal bars of the ``top_n`` permutation importances (± 1 std)."""
+    top = table.head(top_n).iloc[::-1]
+
+    def draw(fig, axes) -> None:
+        ax = axes[0, 0]
+        ax.barh(top["feature"], top["importance_mean"], xerr=top["importance_std"], color="#4C72B0")
+        ax.set_xlabel("Increase in residual MAE when permuted")
+        ax.set_title(f"Week 2 ROAS model: top {len(top)} features (test window)")
+
+    data_hash = frame_digest(top[["feature", "importance_mean", "importance_std"]])
+    return render_figure(
+        IMPORTANCE_TEMPLATE,
+        draw,
+        output_dir / "feature_importance",
+        data_hash,
+        render_config,
+    )
+
+
+def run_feature_importance(
+    integrated_path: Path,
+    models_dir: Path,
+    reports_dir: Path,
+    figures_dir: Path,
+    test_size: float = 0.2,
+    lag_days: int = 7,
+    region: str = "US",
+    n_repeats: int = 10,
+    max_workers: Optional[int] = None,
+    contributions: bool = True,
+    render_config: Optional[RenderConfig] = None,
+) -> ImportanceOutputs:
+    """
+    Explain the saved Week 2 model on its test window.
+
+    Features are rebuilt with the saved encoder; ``test_size``, ``lag_days``
+    and ``region`` must match the training run.
+    """
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    model = pd.read_pickle(models_dir / "random_forest_roas.pkl")
+    encoder = pd.read_pickle(models_dir / "feature_encoder.pkl")
+
+    feature_df = prepare_daily_features(integrated_path, lag_days=lag_days, region=region)
+    _, test_mask = time_series_split_masks(feature_df["date"], test_size)
+    test_df = feature_df.loc[test_mask]
+    X_test, y_test, _ = build_feature_matrix(test_df, lag_days=lag_days, encoder=encoder)
+    if not isinstance(X_test, pd.DataFrame):
+        X_test = pd.DataFrame(
+            X_test.toarray(), columns=feature_matrix_columns(test_df, encoder), index=test_df.index
+        )
+
+    importance = permutation_importance(
+        model, X_test, y_test, n_repeats=n_repeats, max_workers=max_workers
+    )
+    path_contributions = tree_contributions(model, X_test)[1] if contributions else None
+    table = rank_features(importance, path_contributions)
+
+    table_path = reports_dir / "feature_importance.csv"
+    table.to_csv(table_path, index=False)
+    figure_path = plot_importance(table, figures_dir, render_config=render_config)
+    return ImportanceOutputs(table_csv=table_path, figure=figure_path)
+
+
+__all__ = [
+    "ImportanceOutputs",
+    "permutation_importance",
+    "tree_contributions",
+    "rank_features",
+    "plot_importance",
+    "run_feature_importance",
+]
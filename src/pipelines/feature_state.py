@@ -0,0 +1,213 @@
+"""
+Incremental Week 2 features for next-day ROAS scoring.
+
+``prepare_daily_features`` recomputes every rolling mean and growth rate over
+the whole history.  To score a new day only the last ``lag_days`` values per
+platform and the previous day's spend/conversions are needed, so
+``FeatureState`` keeps exactly that:
+
+- one ring buffer (``deque(maxlen=lag_days)``) with a running sum per lagged
+  metric, so the trailing mean costs O(1) per update;
+- the previous day's spend and conversions for the growth features;
+- the frozen CPA fill value.
+
+``FeatureState.update`` takes the integrated rows of one new day and returns
+the same feature rows ``prepare_daily_features`` would produce for that day.
+Categorical columns are left to the encoder saved with the model.  The state
+is saved as JSON between runs.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .week2_roas_modeling import LAG_FEATURES, add_calendar_columns, aggregate_daily
+
+
+STATE_VERSION = 1
+
+
+class RollingMean:
+    """Mean of the last ``window`` values, updated in O(1)."""
+
+    def __init__(self, window: int, values: Iterable[float] = ()):
+        self.window = window
+        self.values: Deque[float] = deque(maxlen=window)
+        self.total = 0.0
+        self._pushes = 0
+        for value in values:
+            self.push(value)
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        self._pushes += 1
+        # Re-sum once per window so add/subtract rounding cannot drift.
+        if self._pushes % self.window == 0:
+            self.total = math.fsum(self.values)
+
+    def mean(self) -> float:
+        return self.total / self.window if len(self.values) == self.window else math.nan
+
+
+def _growth(current: float, previous: Optional[float]) -> float:
+    """``pct_change`` with the pipeline's conventions: inf and NaN become 0."""
+    if previous is None or previous == 0 or math.isnan(previous) or math.isnan(current):
+        return 0.0
+    return current / previous - 1.0
+
+
+class PlatformState:
+    def __init__(self, lag_days: int):
+        self.last_date: Optional[pd.Timestamp] = None
+        self.prev_spend: Optional[float] = None
+        self.prev_conversions: Optional[float] = None
+        self.windows = {column: RollingMean(lag_days) for column in LAG_FEATURES}
+
+    def update(self, row: Dict[str, Any], lag_days: int) -> Dict[str, Any]:
+        if self.last_date is not None and row["date"] <= self.last_date:
+            raise ValueError(f"{row['platform']}: {row['date'].date()} is not after {self.last_date.date()}")
+        features = dict(row)
+        for column, window in self.windows.items():
+            window.push(float(row[column]))
+            features[f"{column}_last_{lag_days}"] = window.mean()
+        features["residual"] = row["roas"] - features[f"roas_last_{lag_days}"]
+        features["spend_growth"] = _growth(row["spend"], self.prev_spend)
+        features["conv_growth"] = _growth(row["conversions"], self.prev_conversions)
+        self.last_date = row["date"]
+        self.prev_spend = float(row["spend"])
+        self.prev_conversions = float(row["conversions"])
+        return features
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "last_date": self.last_date.strftime("%Y-%m-%d") if self.last_date is not None else None,
+            "prev_spend": self.prev_spend,
+            "prev_conversions": self.prev_conversions,
+            "windows": {column: list(window.values) for column, window in self.windows.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], lag_days: int) -> "PlatformState":
+        state = cls(lag_days)
+        state.last_date = pd.Timestamp(data["last_date"]) if data["last_date"] else None
+        state.prev_spend = data["prev_spend"]
+        state.prev_conversions = data["prev_conversions"]
+        state.windows = {
+            column: RollingMean(lag_days, data["windows"].get(column, ())) for column in LAG_FEATURES
+        }
+        return state
+
+
+class FeatureState:
+    """Per-platform rolling state that emits Week 2 feature rows one day at a time."""
+
+    def __init__(
+        self,
+        lag_days: int = 7,
+        region: str = "US",
+        cpa_fill: float = math.nan,
+    ):
+        self.lag_days = lag_days
+        self.region = region
+        self.cpa_fill = cpa_fill
+        self.platforms: Dict[str, PlatformState] = {}
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, lag_days: int = 7, region: str = "US") -> "FeatureState":
+        """
+        Build the state from integrated rows (the training data).
+
+        The CPA fill value is the median over the full history, as in
+        ``prepare_daily_features``; only the last ``lag_days`` days per
+        platform are replayed into the buffers.
+        """
+        daily = aggregate_daily(df)
+        raw_cpa = (daily["spend"] / daily["conversions"]).replace([np.inf, -np.inf], np.nan)
+        state = cls(lag_days=lag_days, region=region, cpa_fill=float(raw_cpa.median()))
+        for platform, group in daily.groupby("platform", sort=True):
+            platform_state = state.platforms.setdefault(platform, PlatformState(lag_days))
+            for row in group.tail(lag_days + 1).to_dict("records"):
+                platform_state.update(row, lag_days)
+        return state
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        dates = [state.last_date for state in self.platforms.values() if state.last_date is not None]
+        return max(dates) if dates else None
+
+    def update(self, day: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply one day of integrated rows and return that day's feature rows.
+
+        Columns match ``prepare_daily_features``.  Platforms with fewer than
+        ``lag_days`` days of history are updated but not returned, as the
+        batch pipeline drops them too.
+        """
+        if day.empty:
+            raise ValueError("update() needs at least one row")
+        day = day.copy()
+        day["date"] = pd.to_datetime(day["date"])
+        if day["date"].nunique() != 1:
+            raise ValueError("update() takes the rows of a single date")
+
+        rows: List[Dict[str, Any]] = []
+        for row in aggregate_daily(day, cpa_fill=self.cpa_fill).to_dict("records"):
+            platform_state = self.platforms.setdefault(row["platform"], PlatformState(self.lag_days))
+            rows.append(platform_state.update(row, self.lag_days))
+
+        features = add_calendar_columns(pd.DataFrame(rows), region=self.region)
+        features = features.dropna(subset=[f"roas_last_{self.lag_days}"])
+        return features.reset_index(drop=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "lag_days": self.lag_days,
+            "region": self.region,
+            "cpa_fill": None if math.isnan(self.cpa_fill) else self.cpa_fill,
+            "platforms": {name: state.to_dict() for name, state in self.platforms.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FeatureState":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported feature state version {data.get('version')!r}")
+        state = cls(
+            lag_days=data["lag_days"],
+            region=data["region"],
+            cpa_fill=math.nan if data["cpa_fill"] is None else data["cpa_fill"],
+        )
+        state.platforms = {
+            name: PlatformState.from_dict(values, state.lag_days) for name, values in data["platforms"].items()
+        }
+        return state
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "FeatureState":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+__all__ = [
+    "RollingMean",
+    "PlatformState",
+    "FeatureState",
+]
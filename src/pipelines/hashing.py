@@ -0,0 +1,72 @@
+"""
+Content hashing helpers.
+
+Caching layers across the pipelines decide whether work can be skipped by
+comparing digests of their inputs.  The helpers here keep those digests stable
+across runs and platforms.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, MutableMapping, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+CHUNK_SIZE = 1 << 20
+
+
+def frame_digest(*frames: pd.DataFrame, extra: Optional[Any] = None) -> str:
+    """
+    Return a SHA-256 digest covering the content of one or more DataFrames.
+
+    Column names and values are hashed (the index is ignored) so two frames with
+    the same data always produce the same digest.  ``extra`` can carry any
+    JSON-serialisable parameters that also influence the derived output.
+    """
+    import pandas as pd
+
+    hasher = hashlib.sha256()
+    for frame in frames:
+        hasher.update("\x1f".join(map(str, frame.columns)).encode("utf-8"))
+        row_hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+        hasher.update(row_hashes.tobytes())
+    if extra is not None:
+        hasher.update(json.dumps(extra, sort_keys=True, default=str).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def file_digest(
+    path: Path,
+    memo: Optional[MutableMapping[str, Dict[str, Any]]] = None,
+) -> str:
+    """
+    Return the SHA-256 digest of a file's content.
+
+    When ``memo`` is given it maps paths to ``{"size", "mtime_ns", "sha256"}``
+    records; a file whose size and modification time match its record is not
+    re-read (the make-style shortcut), and fresh digests are written back.
+    """
+    stat = path.stat()
+    key = str(path)
+    if memo is not None:
+        record = memo.get(key)
+        if record and record.get("size") == stat.st_size and record.get("mtime_ns") == stat.st_mtime_ns:
+            return record["sha256"]
+
+    hasher = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+
+    if memo is not None:
+        memo[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    return digest
+
+
+__all__ = ["frame_digest", "file_digest"]
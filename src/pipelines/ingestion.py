@@ -0,0 +1,419 @@
+"""
+Concurrent ingestion of platform reports into ``data/raw``.
+
+The morning job used to download one platform at a time, one page at a time.
+``ingest`` runs every platform concurrently on one asyncio event loop:
+
+- a keep-alive HTTP/1.1 connection pool (standard library only) caps the number
+  of sockets and reuses them across requests;
+- the first page of each report gives ``total_pages``; the remaining pages are
+  requested concurrently, a bounded number ahead of the writer;
+- ``429`` and ``5xx`` responses are retried after ``Retry-After`` (or
+  exponential backoff with jitter); a ``429`` also pauses and spaces out every
+  request to that host (the spacing relaxes again as requests succeed), so the
+  client settles at the API's rate instead of retrying in bursts;
+- rows are streamed to ``<filename>.part`` in page order as soon as the pages
+  before them have arrived, then the file is renamed into place, so
+  ``clean_*_ads`` always sees a complete export in the usual format (including
+  the Google report preamble).
+
+The HTTP contract is the one served by ``mock_ads_api.MockAdsAPI``; pointing
+``base_url`` at a gateway that exposes the real platform APIs the same way
+needs no code changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import os
+import random
+import ssl
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from .adapters import PlatformAdapter, get_adapter
+
+
+DEFAULT_PLATFORMS = ("meta", "google", "tiktok")
+REPORT_PATH = "/v1/reports/{key}"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Title line written above the header for exports with a preamble (``skiprows``).
+PREAMBLE_TITLES = {"google": "Campaign performance report"}
+
+
+class IngestionError(RuntimeError):
+    """A report could not be fetched (non-retryable status or retries exhausted)."""
+
+
+@dataclass
+class FetchConfig:
+    page_size: int = 500
+    max_connections: int = 8
+    max_retries: int = 6
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    timeout: float = 30.0
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Response:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+@dataclass
+class ClientStats:
+    requests: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    connections_opened: int = 0
+
+
+@dataclass
+class IngestionResult:
+    key: str
+    path: Path
+    rows: int
+    pages: int
+    seconds: float
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, at most ``size`` at a time."""
+
+    def __init__(self, base_url: str, size: int, timeout: float, headers: Mapping[str, str] = None):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme in {base_url!r}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.opened = 0
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def _open(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        connection = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout
+        )
+        self.opened += 1
+        return connection
+
+    async def _exchange(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, target: str
+    ) -> Tuple[Response, bool]:
+        lines = [f"GET {target} HTTP/1.1", f"Host: {self.host}", "Accept: application/json", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in self.headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before response")
+        version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return Response(int(status), headers, body), keep_alive
+
+    async def get(self, path: str) -> Response:
+        target = self.prefix + path
+        async with self._slots:
+            for attempt in range(2):
+                reused = bool(self._idle)
+                reader, writer = self._idle.pop() if reused else await self._open()
+                try:
+                    response, keep_alive = await asyncio.wait_for(
+                        self._exchange(reader, writer, target), self.timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    # The server may drop an idle keep-alive socket; retry once on a fresh one.
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return response
+        raise AssertionError("unreachable")
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdsAPIClient:
+    """JSON GETs over a ``ConnectionPool`` with rate-limit-aware retries."""
+
+    def __init__(self, base_url: str, config: FetchConfig = None, seed: Optional[int] = None):
+        self.config = config or FetchConfig()
+        self.pool = ConnectionPool(base_url, self.config.max_connections, self.config.timeout, self.config.headers)
+        self.stats = ClientStats()
+        # Pacing: request starts are spaced ``_interval`` apart.  A 429 pushes the
+        # next slot past Retry-After and widens the spacing; successes narrow it.
+        self._next_slot = 0.0
+        self._interval = 0.0
+        self._widened_at = float("-inf")
+        self._random = random.Random(seed)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.config.backoff_max, self.config.backoff_base * 2**attempt)
+        return delay * self._random.uniform(0.5, 1.0)
+
+    async def _wait_for_slot(self) -> float:
+        """Reserve the next request slot, sleep until it, and return the reservation time."""
+        loop = asyncio.get_running_loop()
+        reserved = loop.time()
+        slot = max(reserved, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > reserved:
+            await asyncio.sleep(slot - reserved)
+        return reserved
+
+    def _throttled(self, reserved: float, delay: float) -> None:
+        now = asyncio.get_running_loop().time()
+        # Requests scheduled before the spacing last widened report the same
+        # congestion; widen once per event, not once per response.
+        if reserved >= self._widened_at:
+            self._interval = min(self.config.backoff_max, max(2 * self._interval, delay, 0.01))
+            self._widened_at = now
+        self._next_slot = max(self._next_slot, now + delay)
+
+    def _succeeded(self) -> None:
+        self._interval = self._interval * 0.98 if self._interval > 1e-3 else 0.0
+
+    async def get_json(self, path: str, params: Mapping[str, Any]) -> Dict[str, Any]:
+        url = f"{path}?{urlencode(params)}"
+        error: Optional[BaseException] = None
+        for attempt in range(self.config.max_retries + 1):
+            reserved = await self._wait_for_slot()
+            self.stats.requests += 1
+            try:
+                response = await self.pool.get(url)
+            except (OSError, asyncio.IncompleteReadError) as exc:
+                error, delay = exc, self._backoff(attempt)
+            else:
+                if response.status == 200:
+                    self._succeeded()
+                    return json.loads(response.body)
+                if response.status not in RETRY_STATUSES:
+                    raise IngestionError(
+                        f"GET {url} returned HTTP {response.status}: {response.body[:200].decode('utf-8', 'replace')}"
+                    )
+                error = IngestionError(f"GET {url} returned HTTP {response.status}")
+                delay = _retry_after(response.headers)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if response.status == 429:
+                    self.stats.rate_limited += 1
+                    self._throttled(reserved, delay)
+                    # The pacer already schedules this retry; don't sleep twice.
+                    delay = 0.0
+            if attempt == self.config.max_retries:
+                break
+            self.stats.retries += 1
+            await asyncio.sleep(delay)
+        raise IngestionError(f"GET {url} failed after {self.config.max_retries + 1} attempts") from error
+
+    async def close(self) -> None:
+        self.stats.connections_opened = self.pool.opened
+        await self.pool.close()
+
+
+def date_windows(start: Optional[date], end: Optional[date], window_days: Optional[int]) -> List[Tuple[str, str]]:
+    """Split ``[start, end]`` into consecutive windows of ``window_days`` (ISO strings)."""
+    if window_days is None or start is None or end is None:
+        return [(start.isoformat() if start else "", end.isoformat() if end else "")]
+    windows = []
+    current = start
+    while current <= end:
+        last = min(end, current + timedelta(days=window_days - 1))
+        windows.append((current.isoformat(), last.isoformat()))
+        current = last + timedelta(days=1)
+    return windows
+
+
+def _preamble(adapter: PlatformAdapter, downloaded: datetime) -> List[str]:
+    if not adapter.skiprows:
+        return []
+    lines = [
+        PREAMBLE_TITLES.get(adapter.key, f"{adapter.platform} report"),
+        f"Downloaded: {downloaded:%Y-%m-%d %H:%M:%S} UTC",
+    ]
+    return (lines + [""] * adapter.skiprows)[: adapter.skiprows]
+
+
+async def fetch_report(
+    client: AdsAPIClient,
+    adapter: PlatformAdapter,
+    raw_dir: Path,
+    windows: Sequence[Tuple[str, str]],
+    max_ahead: Optional[int] = None,
+) -> IngestionResult:
+    """Fetch every page of one platform's report and stream it to ``raw_dir``."""
+    started = time.perf_counter()
+    path = REPORT_PATH.format(key=adapter.key)
+    page_size = client.config.page_size
+    max_ahead = max_ahead or 2 * client.config.max_connections
+
+    def request(window: Tuple[str, str], page: int) -> "asyncio.Task[Dict[str, Any]]":
+        params = {"page": page, "page_size": page_size}
+        if window[0]:
+            params["start"] = window[0]
+        if window[1]:
+            params["end"] = window[1]
+        return asyncio.ensure_future(client.get_json(path, params))
+
+    target = raw_dir / adapter.filename
+    partial = target.with_name(target.name + ".part")
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    first_pages = [request(window, 1) for window in windows]
+    pending: Deque["asyncio.Task[Dict[str, Any]]"] = deque()
+    rows = pages = 0
+    try:
+        with partial.open("w", newline="", encoding="utf-8") as handle:
+            for line in _preamble(adapter, datetime.now(timezone.utc)):
+                handle.write(line + "\n")
+            writer = csv.writer(handle, lineterminator="\n")
+            header: Optional[List[str]] = None
+            for window, first_task in zip(windows, first_pages):
+                first = await first_task
+                if header is None:
+                    header = first["columns"]
+                    writer.writerow(header)
+                elif first["columns"] != header:
+                    raise IngestionError(f"{adapter.key}: columns changed between date windows")
+                writer.writerows(first["rows"])
+                rows, pages = rows + len(first["rows"]), pages + 1
+
+                # Keep up to ``max_ahead`` pages in flight; write them strictly in order.
+                next_page = 2
+                while next_page <= first["total_pages"] or pending:
+                    while next_page <= first["total_pages"] and len(pending) < max_ahead:
+                        pending.append(request(window, next_page))
+                        next_page += 1
+                    page = await pending.popleft()
+                    writer.writerows(page["rows"])
+                    rows, pages = rows + len(page["rows"]), pages + 1
+        os.replace(partial, target)
+    except BaseException:
+        for task in list(pending) + first_pages:
+            task.cancel()
+        await asyncio.gather(*pending, *first_pages, return_exceptions=True)
+        partial.unlink(missing_ok=True)
+        raise
+    return IngestionResult(adapter.key, target, rows, pages, time.perf_counter() - started)
+
+
+async def ingest_async(
+    base_url: str,
+    raw_dir: Path,
+    platforms: Iterable[str] = DEFAULT_PLATFORMS,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    window_days: Optional[int] = None,
+    config: FetchConfig = None,
+) -> Tuple[List[IngestionResult], ClientStats]:
+    client = AdsAPIClient(base_url, config)
+    windows = date_windows(start, end, window_days)
+    try:
+        results = await asyncio.gather(
+            *(fetch_report(client, get_adapter(key), Path(raw_dir), windows) for key in platforms)
+        )
+    finally:
+        await client.close()
+    return list(results), client.stats
+
+
+def ingest(
+    base_url: str,
+    raw_dir: Path,
+    platforms: Iterable[str] = DEFAULT_PLATFORMS,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    window_days: Optional[int] = None,
+    config: FetchConfig = None,
+) -> Tuple[List[IngestionResult], ClientStats]:
+    """
+    Download ``platforms`` concurrently into ``raw_dir`` (one export file each).
+
+    ``start``/``end`` bound the report dates (inclusive; ``None`` = everything
+    the API has).  ``window_days`` splits the range into windows fetched as
+    separate paginated queries; rows are then grouped by window.
+    """
+    return asyncio.run(ingest_async(base_url, raw_dir, platforms, start, end, window_days, config))
+
+
+__all__ = [
+    "DEFAULT_PLATFORMS",
+    "IngestionError",
+    "FetchConfig",
+    "ClientStats",
+    "IngestionResult",
+    "ConnectionPool",
+    "AdsAPIClient",
+    "date_windows",
+    "fetch_report",
+    "ingest_async",
+    "ingest",
+]
@@ -0,0 +1,298 @@
+"""
+Per-stage timing and memory instrumentation.
+
+Pipeline functions are wrapped with ``instrumented`` (or a ``stage`` block).
+While a ``RunLog`` is active each call records wall time, CPU time, peak RSS and
+input/output row counts; with no active run the wrappers cost one attribute
+lookup.  Run logs are written as JSON and CSV, and a cProfile dump can be kept
+for every top-level stage.
+
+Peak RSS is exact per stage on Linux, where the kernel high-water mark is reset
+at the start of each stage.  Elsewhere it falls back to the process-lifetime
+peak reported by ``resource`` and is ``None`` on platforms without it.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import csv
+import functools
+import json
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+try:  # Not available on Windows.
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_PROC_STATUS = Path("/proc/self/status")
+_PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+@dataclass
+class StageRecord:
+    """Measurements for one instrumented call."""
+
+    stage: str
+    started_at: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_rss_mb: Optional[float]
+    rows_in: Optional[int]
+    rows_out: Optional[int]
+    depth: int
+    pid: int
+    profile_path: Optional[str] = None
+
+
+@dataclass
+class RunLog:
+    """Collects ``StageRecord`` entries for one pipeline run."""
+
+    run_id: str = field(default_factory=lambda: time.strftime("%Y%m%d-%H%M%S"))
+    profile_dir: Optional[Path] = None
+    records: List[StageRecord] = field(default_factory=list)
+
+    def extend(self, records: List[Dict[str, Any]]) -> None:
+        """Merge records produced elsewhere (e.g. returned by a worker process)."""
+        self.records.extend(StageRecord(**record) for record in records)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [asdict(record) for record in self.records]
+
+    def write(self, directory: Path) -> Tuple[Path, Path]:
+        """Write ``run_<run_id>.json`` and ``.csv`` into ``directory``."""
+        directory.mkdir(parents=True, exist_ok=True)
+        json_path = directory / f"run_{self.run_id}.json"
+        csv_path = directory / f"run_{self.run_id}.csv"
+        json_path.write_text(
+            json.dumps({"run_id": self.run_id, "stages": self.to_dicts()}, indent=2),
+            encoding="utf-8",
+        )
+        with csv_path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=[f.name for f in fields(StageRecord)])
+            writer.writeheader()
+            writer.writerows(self.to_dicts())
+        return json_path, csv_path
+
+
+@dataclass
+class _Frame:
+    name: str
+    rows_out: Optional[int] = None
+    peak_bytes: int = 0
+
+
+_ACTIVE: Optional[RunLog] = None
+_STACK: List[_Frame] = []
+
+
+def start_run(profile_dir: Optional[Path] = None, run_id: Optional[str] = None) -> RunLog:
+    """Activate a new run log for the current process and return it."""
+    global _ACTIVE
+    _ACTIVE = RunLog(profile_dir=profile_dir) if run_id is None else RunLog(run_id, profile_dir)
+    return _ACTIVE
+
+
+def stop_run() -> Optional[RunLog]:
+    """Deactivate and return the current run log."""
+    global _ACTIVE
+    log, _ACTIVE = _ACTIVE, None
+    return log
+
+
+def active_run() -> Optional[RunLog]:
+    return _ACTIVE
+
+
+def _read_hwm_bytes() -> Optional[int]:
+    """Current peak RSS of this process in bytes."""
+    try:
+        for line in _PROC_STATUS.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _reset_hwm() -> None:
+    """Reset the kernel's peak RSS counter where supported (Linux)."""
+    try:
+        _PROC_CLEAR_REFS.write_text("5")
+    except OSError:
+        pass
+
+
+def _profile_path(log: RunLog, name: str) -> Path:
+    assert log.profile_dir is not None
+    directory = log.profile_dir / log.run_id
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    index = sum(1 for record in log.records if record.stage == name)
+    return directory / f"{slug}-{os.getpid()}-{index}.prof"
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None) -> Iterator[_Frame]:
+    """
+    Record the enclosed block as a stage of the active run.
+
+    The yielded frame's ``rows_out`` can be set inside the block.  Without an
+    active run the block executes unmeasured.
+    """
+    log = _ACTIVE
+    frame = _Frame(name)
+    if log is None:
+        yield frame
+        return
+
+    depth = len(_STACK)
+    profiler = cProfile.Profile() if log.profile_dir is not None and depth == 0 else None
+    # Resetting the high-water mark discards the enclosing stages' peak so
+    # far, so fold it into their frames first.
+    if _STACK:
+        current = _read_hwm_bytes() or 0
+        for parent in _STACK:
+            parent.peak_bytes = max(parent.peak_bytes, current)
+    _STACK.append(frame)
+    _reset_hwm()
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield frame
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        _STACK.pop()
+
+        peak = max(_read_hwm_bytes() or 0, frame.peak_bytes)
+        for parent in _STACK:
+            parent.peak_bytes = max(parent.peak_bytes, peak)
+
+        profile_path = None
+        if profiler is not None:
+            path = _profile_path(log, name)
+            profiler.dump_stats(path)
+            profile_path = str(path)
+
+        log.records.append(
+            StageRecord(
+                stage=name,
+                started_at=started_at,
+                wall_seconds=round(wall, 6),
+                cpu_seconds=round(cpu, 6),
+                peak_rss_mb=round(peak / 2**20, 2) if peak else None,
+                rows_in=rows_in,
+                rows_out=frame.rows_out,
+                depth=depth,
+                pid=os.getpid(),
+                profile_path=profile_path,
+            )
+        )
+
+
+def count_rows(value: Any) -> Optional[int]:
+    """Row count of a frame-like value, a mapping of them, or a tuple of them."""
+    if value is None:
+        return None
+    if hasattr(value, "shape") and getattr(value, "ndim", 0) >= 1:
+        return int(value.shape[0])
+    if isinstance(value, dict):
+        counts = [count_rows(item) for item in value.values()]
+    elif isinstance(value, (list, tuple)):
+        counts = [count_rows(item) for item in value]
+    else:
+        return None
+    counts = [count for count in counts if count is not None]
+    return sum(counts) if counts else None
+
+
+def instrumented(
+    name: Optional[str] = None,
+    rows_in: Optional[Callable[..., Optional[int]]] = None,
+    rows_out: Optional[Callable[[Any], Optional[int]]] = None,
+) -> Callable[[F], F]:
+    """
+    Decorate a function so each call is recorded as a stage.
+
+    ``rows_in`` receives the call arguments and ``rows_out`` the return value;
+    by default both count rows of any DataFrame-like arguments/results.
+    """
+
+    def decorator(func: F) -> F:
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _ACTIVE is None:
+                return func(*args, **kwargs)
+            n_in = (
+                rows_in(*args, **kwargs)
+                if rows_in is not None
+                else count_rows(list(args) + list(kwargs.values()))
+            )
+            with stage(stage_name, rows_in=n_in) as frame:
+                result = func(*args, **kwargs)
+                frame.rows_out = rows_out(result) if rows_out is not None else count_rows(result)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def collect_stage(
+    name: str,
+    func: Callable[[], Any],
+    profile_dir: Optional[Path] = None,
+    run_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run ``func`` as stage ``name`` under a fresh run log and return its records.
+
+    Meant for orchestrated runs where the stage executes in a worker process:
+    the records travel back as plain dicts and are merged by the parent.
+    """
+    global _ACTIVE
+    previous = _ACTIVE
+    log = RunLog(profile_dir=profile_dir) if run_id is None else RunLog(run_id, profile_dir)
+    _ACTIVE = log
+    try:
+        with stage(name):
+            func()
+    finally:
+        _ACTIVE = previous
+    return log.to_dicts()
+
+
+__all__ = [
+    "StageRecord",
+    "RunLog",
+    "start_run",
+    "stop_run",
+    "active_run",
+    "stage",
+    "instrumented",
+    "count_rows",
+    "collect_stage",
+]
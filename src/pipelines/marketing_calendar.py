@@ -0,0 +1,318 @@
+"""
+Multi-year, multi-region marketing calendar.
+
+Holidays and promo windows are declared as rules rather than dates, so any year
+resolves without maintenance:
+
+- ``Holiday`` — a fixed date (``fixed``), the n-th weekday of a month
+  (``nth_weekday``; ``n=-1`` is the last one), an offset from Easter Sunday
+  (``easter``) or an offset from another holiday of the same region
+  (``relative``).  A holiday name may resolve differently per region (Mother's
+  Day is the 2nd Sunday of May in the US and three weeks before Easter in the
+  UK).
+- ``PromoEvent`` — a window around an anchor holiday or a fixed ``MM-DD`` date,
+  with the spend/CTR/CVR multipliers used by ``scripts/generate_raw_data.py``
+  (``PEAK_EVENTS``); for 2024 the US windows reproduce it exactly.
+
+``day_index`` expands the rules into one row per day for a region and a span
+of years (cached), with exact-match flags, distances to the nearest holiday and
+promo window, and promo multipliers.  ``calendar_features`` joins any date
+column against it by integer day offset — a single array gather rather than a
+per-row lookup.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+REGIONS = ("US", "UK", "CA")
+RULE_KINDS = ("fixed", "nth_weekday", "easter", "relative")
+# Distances are clipped so far-away events all look alike to the model.
+DISTANCE_CAP = 30
+
+MON, TUE, WED, THU, FRI, SAT, SUN = range(7)
+
+
+@dataclass(frozen=True)
+class Holiday:
+    name: str
+    kind: str
+    regions: Tuple[str, ...]
+    month: int = 0
+    day: int = 0
+    weekday: int = 0
+    n: int = 0
+    offset: int = 0
+    anchor: str = ""
+
+    def resolve(self, year: int, resolved: Dict[str, date]) -> date:
+        if self.kind == "fixed":
+            base = date(year, self.month, self.day)
+        elif self.kind == "nth_weekday":
+            base = _nth_weekday(year, self.month, self.weekday, self.n)
+        elif self.kind == "easter":
+            base = easter_sunday(year)
+        elif self.kind == "relative":
+            base = resolved[self.anchor]
+        else:
+            raise ValueError(f"Unknown holiday rule {self.kind!r}; expected one of {RULE_KINDS}")
+        return base + timedelta(days=self.offset)
+
+
+@dataclass(frozen=True)
+class PromoEvent:
+    """A promo window ``[anchor + start_offset, anchor + end_offset]``."""
+
+    name: str
+    anchor: str
+    start_offset: int
+    end_offset: int
+    regions: Tuple[str, ...]
+    spend: float = 1.0
+    ctr: float = 1.0
+    cvr: float = 1.0
+
+    def window(self, year: int, holidays: Dict[str, date]) -> Tuple[date, date]:
+        if self.anchor in holidays:
+            base = holidays[self.anchor]
+        else:
+            month, day = (int(part) for part in self.anchor.split("-"))
+            base = date(year, month, day)
+        return base + timedelta(days=self.start_offset), base + timedelta(days=self.end_offset)
+
+
+ALL = REGIONS
+
+# Order matters for ``relative`` rules: anchors come first.
+HOLIDAYS: Tuple[Holiday, ...] = (
+    Holiday("New Year's Day", "fixed", ALL, month=1, day=1),
+    Holiday("Valentine's Day", "fixed", ALL, month=2, day=14),
+    Holiday("St. Patrick's Day", "fixed", ("US", "UK"), month=3, day=17),
+    Holiday("Easter Sunday", "easter", ALL),
+    Holiday("Good Friday", "easter", ("UK", "CA"), offset=-2),
+    Holiday("Mother's Day", "nth_weekday", ("US", "CA"), month=5, weekday=SUN, n=2),
+    Holiday("Mother's Day", "easter", ("UK",), offset=-21),
+    Holiday("Memorial Day", "nth_weekday", ("US",), month=5, weekday=MON, n=-1),
+    Holiday("Victoria Day", "nth_weekday", ("CA",), month=5, weekday=MON, n=-1, offset=-7),
+    Holiday("Spring Bank Holiday", "nth_weekday", ("UK",), month=5, weekday=MON, n=-1),
+    Holiday("Canada Day", "fixed", ("CA",), month=7, day=1),
+    Holiday("Independence Day", "fixed", ("US",), month=7, day=4),
+    Holiday("Labor Day", "nth_weekday", ("US", "CA"), month=9, weekday=MON, n=1),
+    Holiday("Thanksgiving", "nth_weekday", ("CA",), month=10, weekday=MON, n=2),
+    Holiday("Halloween", "fixed", ALL, month=10, day=31),
+    Holiday("Thanksgiving", "nth_weekday", ("US",), month=11, weekday=THU, n=4),
+    # Black Friday follows US Thanksgiving everywhere it is marketed.
+    Holiday("Black Friday", "nth_weekday", ALL, month=11, weekday=THU, n=4, offset=1),
+    Holiday("Cyber Monday", "relative", ALL, anchor="Black Friday", offset=3),
+    Holiday("Christmas Day", "fixed", ALL, month=12, day=25),
+    Holiday("Boxing Day", "fixed", ("UK", "CA"), month=12, day=26),
+)
+
+PROMO_EVENTS: Tuple[PromoEvent, ...] = (
+    PromoEvent("Valentine's", "Valentine's Day", -4, 4, ALL, spend=1.10, ctr=1.12, cvr=1.25),
+    PromoEvent("Mother's Day", "Mother's Day", -11, 0, ALL, spend=1.05, ctr=1.05, cvr=1.10),
+    PromoEvent("Back to School", "08-01", 0, 24, ALL, spend=1.08, ctr=1.06, cvr=1.08),
+    PromoEvent("Black Friday / Cyber Monday", "Black Friday", -9, 1, ALL, spend=1.30, ctr=1.20, cvr=1.40),
+    PromoEvent("Holiday Season", "12-10", 0, 21, ALL, spend=1.25, ctr=1.18, cvr=1.32),
+)
+
+FEATURE_COLUMNS = [
+    "is_holiday",
+    "days_to_holiday",
+    "days_since_holiday",
+    "in_promo",
+    "days_to_promo",
+    "days_since_promo",
+]
+
+
+def easter_sunday(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    leap = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * leap) // 451
+    month, day = divmod(h + leap - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year + month // 12, month % 12 + 1, 1)) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-n - 1))
+
+
+def _check_region(region: str) -> None:
+    if region not in REGIONS:
+        raise ValueError(f"Unknown region {region!r}; expected one of {REGIONS}")
+
+
+def _resolve_holidays(region: str, year: int) -> Dict[str, date]:
+    resolved: Dict[str, date] = {}
+    for holiday in HOLIDAYS:
+        if region in holiday.regions:
+            resolved[holiday.name] = holiday.resolve(year, resolved)
+    return resolved
+
+
+def holidays_for(region: str, years: Iterable[int]) -> pd.DataFrame:
+    """Holiday table: one row per (date, name) for ``region``."""
+    _check_region(region)
+    rows = []
+    for year in years:
+        rows.extend((day, name) for name, day in _resolve_holidays(region, year).items())
+    frame = pd.DataFrame(rows, columns=["date", "name"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    return frame.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def promo_events_for(region: str, years: Iterable[int]) -> pd.DataFrame:
+    """Promo window table: one row per event and year for ``region``."""
+    _check_region(region)
+    rows = []
+    for year in years:
+        resolved = _resolve_holidays(region, year)
+        for event in PROMO_EVENTS:
+            if region in event.regions:
+                start, end = event.window(year, resolved)
+                rows.append((event.name, start, end, event.spend, event.ctr, event.cvr))
+    frame = pd.DataFrame(rows, columns=["name", "start", "end", "spend", "ctr", "cvr"])
+    frame[["start", "end"]] = frame[["start", "end"]].apply(pd.to_datetime)
+    return frame.sort_values("start", kind="stable").reset_index(drop=True)
+
+
+def _day_numbers(values) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[D]").astype(np.int64)
+
+
+def _distance_to_next(days: np.ndarray, events: np.ndarray) -> np.ndarray:
+    """Days until the next event on or after each day (``events`` sorted)."""
+    position = np.searchsorted(events, days, side="left")
+    padded = np.append(events, np.iinfo(np.int64).max // 2)
+    return padded[position] - days
+
+
+def _distance_since_last(days: np.ndarray, events: np.ndarray) -> np.ndarray:
+    """Days since the last event on or before each day (``events`` sorted)."""
+    position = np.searchsorted(events, days, side="right") - 1
+    padded = np.insert(events, 0, np.iinfo(np.int64).min // 2)
+    return days - padded[position + 1]
+
+
+@lru_cache(maxsize=16)
+def day_index(region: str, first_year: int, last_year: int) -> pd.DataFrame:
+    """
+    One row per day of ``first_year``..``last_year`` with calendar features.
+
+    Neighbouring years are resolved too, so distances near the edges see the
+    events on the other side of the boundary.  The result is cached; treat it
+    as read-only.
+    """
+    years = range(first_year - 1, last_year + 2)
+    holidays = holidays_for(region, years)
+    promos = promo_events_for(region, years)
+
+    start = np.datetime64(f"{first_year}-01-01", "D").astype(np.int64)
+    end = np.datetime64(f"{last_year}-12-31", "D").astype(np.int64)
+    days = np.arange(start, end + 1)
+
+    holiday_days = np.unique(_day_numbers(holidays["date"]))
+    promo_start = _day_numbers(promos["start"])
+    promo_end = _day_numbers(promos["end"])
+
+    # Coverage of (possibly overlapping) promo windows and their combined
+    # multipliers via difference arrays over the extended span.
+    span_start = min(start, promo_start.min(initial=start))
+    span = max(end, promo_end.max(initial=end)) - span_start + 2
+    cover = np.zeros(span)
+    lifts = {name: np.zeros(span) for name in ("spend", "ctr", "cvr")}
+    np.add.at(cover, promo_start - span_start, 1)
+    np.add.at(cover, promo_end + 1 - span_start, -1)
+    for name, lift in lifts.items():
+        log_lift = np.log(promos[name].to_numpy(dtype=float))
+        np.add.at(lift, promo_start - span_start, log_lift)
+        np.add.at(lift, promo_end + 1 - span_start, -log_lift)
+    offset = days - span_start
+    in_promo = np.cumsum(cover)[offset] > 0
+
+    # Promo windows may overlap, so distances use window starts/ends separately.
+    to_promo = np.where(in_promo, 0, _distance_to_next(days, np.sort(promo_start)))
+    since_promo = np.where(in_promo, 0, _distance_since_last(days, np.sort(promo_end)))
+
+    names = holidays.groupby("date")["name"].agg(" / ".join)
+    frame = pd.DataFrame(
+        {
+            "date": days.astype("datetime64[D]").astype("datetime64[ns]"),
+            "is_holiday": np.isin(days, holiday_days).astype(int),
+            "days_to_holiday": np.minimum(_distance_to_next(days, holiday_days), DISTANCE_CAP),
+            "days_since_holiday": np.minimum(_distance_since_last(days, holiday_days), DISTANCE_CAP),
+            "in_promo": in_promo.astype(int),
+            "days_to_promo": np.minimum(to_promo, DISTANCE_CAP),
+            "days_since_promo": np.minimum(since_promo, DISTANCE_CAP),
+            "promo_spend_lift": np.exp(np.cumsum(lifts["spend"])[offset]),
+            "promo_ctr_lift": np.exp(np.cumsum(lifts["ctr"])[offset]),
+            "promo_cvr_lift": np.exp(np.cumsum(lifts["cvr"])[offset]),
+        }
+    )
+    frame["holiday_name"] = frame["date"].map(names).fillna("")
+    return frame
+
+
+def calendar_features(
+    dates: pd.Series,
+    region: str = "US",
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Calendar features for each value of ``dates``, aligned to its index.
+
+    The day index for the years spanned by ``dates`` is built once (cached) and
+    rows are fetched by integer day offset.
+    """
+    columns = list(columns) if columns is not None else FEATURE_COLUMNS
+    values = pd.to_datetime(dates)
+    if values.isna().any():
+        raise ValueError("calendar_features requires non-missing dates")
+    if len(values) == 0:
+        return pd.DataFrame(columns=columns, index=dates.index)
+    first_year, last_year = int(values.dt.year.min()), int(values.dt.year.max())
+    index = day_index(region, first_year, last_year)
+    offsets = _day_numbers(values) - np.datetime64(f"{first_year}-01-01", "D").astype(np.int64)
+    result = index[columns].iloc[offsets]
+    result.index = dates.index
+    return result
+
+
+def holiday_dates(region: str, years: Iterable[int]) -> pd.DatetimeIndex:
+    """Distinct holiday dates for ``region`` in ``years``."""
+    return pd.DatetimeIndex(holidays_for(region, years)["date"].unique())
+
+
+__all__ = [
+    "REGIONS",
+    "Holiday",
+    "PromoEvent",
+    "HOLIDAYS",
+    "PROMO_EVENTS",
+    "FEATURE_COLUMNS",
+    "easter_sunday",
+    "holidays_for",
+    "promo_events_for",
+    "day_index",
+    "calendar_features",
+    "holiday_dates",
+]
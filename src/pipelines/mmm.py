@@ -0,0 +1,571 @@
+"""
+Marketing mix model over the daily platform aggregates.
+
+Week 2 predicts next-day ROAS residuals, which says nothing about how revenue
+responds to *more* spend.  This stage fits, per platform::
+
+    revenue[t] = controls[t] · γ + β · hill(adstock(spend)[t])
+
+- ``geometric_adstock`` carries spend over with decay ``θ``: the kernel
+  ``θ^l`` (normalised to sum to one, truncated at ``MAX_LAG`` days) is applied
+  for every candidate decay at once as one product of the sliding spend
+  windows with a ``lags × decays`` kernel matrix.
+- ``hill`` saturates the adstocked spend with half-saturation ``κ`` and
+  shape ``s``.
+- ``fit_platform`` evaluates the whole ``θ × κ × s`` grid in one shot:
+  controls (intercept, weekday, promo window, Q4) are projected out once, so
+  each candidate's best ``β ≥ 0`` and its squared error are closed-form
+  column reductions.
+- ``blocked_split_masks`` deals two-week blocks of days round-robin to the
+  training, validation and test windows, so every season (Q4 included) is in
+  all three and the seasonal controls are estimated from the training days.
+- ``select_fit`` keeps the response concave (``s ≤ 1``) unless an identified
+  S-curve (shape below the top of the grid) fits the validation window
+  better; the chosen family is refitted on training + validation and scored
+  on the test window only.  A fit whose best point sits on a grid edge that
+  limits it, whose test R² is not positive, or whose media term explains more
+  than all of the revenue (negative non-media baseline), is marked unreliable.
+
+Because the kernel sums to one, spending ``x`` every day has steady-state
+contribution ``β · hill(x)``.  ``ResponseCurves`` caches that curve on a spend
+grid per platform (``output/models/mmm_response_curves.npz``), so budget
+scenarios are scored by interpolation without refitting, and
+``optimize_allocation`` scores every split of a budget on a grid in one pass,
+moving only the reliable platforms.  ``run_mmm`` writes the fit table, the
+cache, the response-curve figure and ``budget_optimization_report.md``.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .hashing import frame_digest
+from .instrumentation import instrumented
+from .marketing_calendar import calendar_features
+from .rendering import FigureTemplate, RenderConfig, render_figure
+from .week2_roas_modeling import aggregate_daily
+
+
+MAX_LAG = 28
+DECAY_GRID = np.round(np.linspace(0.0, 0.9, 10), 2)
+# Half-saturation as a multiple of the platform's mean adstocked spend.  The
+# top is far enough above observed spend for a shape-1 curve to be a line.
+HALF_SATURATION_GRID = np.geomspace(0.25, 256.0, 21)
+SHAPE_GRID = np.array([0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0])
+# Largest shape of the default (concave) response; above it is an S-curve.
+CONCAVE_MAX_SHAPE = 1.0
+CURVE_POINTS = 1001
+# Saturation at the largest observed adstock below which the curve is its
+# power-law limit over the data, so a larger half-saturation changes nothing.
+UNSATURATED_TOLERANCE = 0.01
+# Recent window whose mean daily spend is the "current" budget.
+BUDGET_WINDOW_DAYS = 28
+# Consecutive days kept together when dealing days to train/validation/test.
+HOLDOUT_BLOCK_DAYS = 14
+
+CURVES_TEMPLATE = FigureTemplate(name="mmm_response_curves", figsize=(10, 6), style="whitegrid")
+
+
+@dataclass
+class MMMOutputs:
+    """Paths generated by run_mmm."""
+
+    fit_csv: Path
+    params_json: Path
+    curves: Path
+    report_md: Path
+    figure: Path
+
+
+@dataclass
+class MediaFit:
+    """Fitted adstock/saturation parameters and accuracy of one platform."""
+
+    platform: str
+    decay: float
+    half_saturation: float
+    shape: float
+    beta: float
+    controls: Dict[str, float]
+    train_mae: float
+    test_mae: float
+    test_r2: float
+    # Mean non-media (controls) revenue per training day; negative when the
+    # media term explains more than all of the revenue.
+    baseline: float = 0.0
+    # Grid parameters whose best value is the edge of the searched range.
+    on_edge: List[str] = field(default_factory=list)
+    reliable: bool = True
+
+    def contribution(self, spend: np.ndarray) -> np.ndarray:
+        """Steady-state daily revenue from spending ``spend`` every day."""
+        return self.beta * hill(np.asarray(spend, dtype=np.float64), self.half_saturation, self.shape)
+
+
+def geometric_adstock(spend: np.ndarray, decays: np.ndarray, max_lag: int = MAX_LAG) -> np.ndarray:
+    """
+    Adstocked spend for every decay: a ``days × decays`` array.
+
+    Days before the first one are assumed to repeat its spend.
+    """
+    decays = np.atleast_1d(np.asarray(decays, dtype=np.float64))
+    kernel = decays[None, :] ** np.arange(max_lag)[:, None]
+    kernel /= kernel.sum(axis=0)
+    padded = np.pad(np.asarray(spend, dtype=np.float64), (max_lag - 1, 0), mode="edge")
+    # windows[t, l] is the spend l days before t.
+    windows = np.lib.stride_tricks.sliding_window_view(padded, max_lag)[:, ::-1]
+    return windows @ kernel
+
+
+def hill(x: np.ndarray, half_saturation, shape) -> np.ndarray:
+    """Hill saturation ``x^s / (x^s + κ^s)``, broadcasting over its arguments."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.power(np.maximum(x, 0.0) / half_saturation, shape)
+    return ratio / (1.0 + ratio)
+
+
+def platform_series(integrated: pd.DataFrame, region: str = "US") -> Dict[str, pd.DataFrame]:
+    """Gap-free daily spend/revenue per platform with the control columns."""
+    daily = aggregate_daily(integrated)
+    dates = pd.date_range(daily["date"].min(), daily["date"].max(), freq="D")
+    calendar = calendar_features(pd.Series(dates), region=region, columns=["in_promo"])
+    series = {}
+    for platform, group in daily.groupby("platform", sort=True):
+        frame = group.set_index("date")[["spend", "revenue"]].reindex(dates, fill_value=0.0)
+        frame.index.name = "date"
+        frame["in_promo"] = calendar["in_promo"].to_numpy(dtype=np.float64)
+        frame["is_q4"] = (frame.index.month >= 10).astype(np.float64)
+        series[platform] = frame.reset_index()
+    return series
+
+
+def control_matrix(frame: pd.DataFrame) -> pd.DataFrame:
+    """Intercept, weekday dummies (Monday is the base), promo window and Q4 flags."""
+    weekday = pd.get_dummies(frame["date"].dt.dayofweek, prefix="dow", drop_first=True, dtype=np.float64)
+    weekday = weekday.reindex(columns=[f"dow_{day}" for day in range(1, 7)], fill_value=0.0)
+    controls = pd.concat([pd.Series(1.0, index=frame.index, name="intercept"), weekday], axis=1)
+    return controls.join(frame[["in_promo", "is_q4"]])
+
+
+def blocked_split_masks(
+    dates: pd.Series,
+    test_size: float = 0.2,
+    block_days: int = HOLDOUT_BLOCK_DAYS,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Train, validation and test masks over interleaved blocks of days.
+
+    Blocks of ``block_days`` consecutive days are dealt round-robin to
+    ``round(1 / test_size)`` folds; the last fold is the test window and the
+    one before it the validation window (each about ``test_size`` of the days).
+    """
+    n_folds = int(round(1 / test_size))
+    if n_folds < 3:
+        raise ValueError(f"test_size must be at most 1/3 to leave training days, got {test_size}")
+    day = (pd.to_datetime(dates) - pd.to_datetime(dates).min()).dt.days.to_numpy()
+    fold = (day // block_days) % n_folds
+    test_mask = fold == n_folds - 1
+    valid_mask = fold == n_folds - 2
+    return ~(test_mask | valid_mask), valid_mask, test_mask
+
+
+@instrumented()
+def fit_platform(
+    frame: pd.DataFrame,
+    train_mask: np.ndarray,
+    platform: str = "",
+    decays: Sequence[float] = DECAY_GRID,
+    half_saturations: Sequence[float] = HALF_SATURATION_GRID,
+    shapes: Sequence[float] = SHAPE_GRID,
+    test_mask: Optional[np.ndarray] = None,
+) -> MediaFit:
+    """
+    Best grid point (least squares on the training days) and its accuracy on
+    the ``test_mask`` days (default: every day outside training).
+
+    The fit is ``reliable`` when its test R² and non-media baseline are
+    positive and no parameter sits on a grid edge that limits it.  No decay of
+    zero, a concave shape cap of ``CONCAVE_MAX_SHAPE`` and a top
+    half-saturation at which the curve has reached its power-law limit over the
+    observed spend (``UNSATURATED_TOLERANCE``) are not limits.
+    """
+    decays, multiples, shapes = (np.asarray(grid, dtype=np.float64) for grid in (decays, half_saturations, shapes))
+    controls = control_matrix(frame)
+    Z = controls.to_numpy()
+    y = frame["revenue"].to_numpy(dtype=np.float64)
+
+    adstock = geometric_adstock(frame["spend"].to_numpy(), decays)  # days × decays
+    scale = adstock[train_mask].mean(axis=0)  # per decay
+    kappa = multiples[None, :] * scale[:, None]  # decays × multiples
+    features = hill(adstock[:, :, None, None], kappa[None, :, :, None], shapes[None, None, None, :])
+    features = features.reshape(len(y), -1)  # days × candidates
+
+    # Project the controls out once; then every candidate is a one-regressor fit.
+    Z_train, y_train, F_train = Z[train_mask], y[train_mask], features[train_mask]
+    projection = np.linalg.pinv(Z_train)
+    y_resid = y_train - Z_train @ (projection @ y_train)
+    F_resid = F_train - Z_train @ (projection @ F_train)
+    norms = (F_resid * F_resid).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = np.clip((F_resid * y_resid[:, None]).sum(axis=0) / norms, 0.0, None)
+    beta = np.nan_to_num(beta)
+    sse = ((y_resid[:, None] - F_resid * beta) ** 2).sum(axis=0)
+    best = int(np.argmin(sse))
+
+    i, j, k = np.unravel_index(best, (len(decays), len(multiples), len(shapes)))
+    gamma = projection @ (y_train - beta[best] * F_train[:, best])
+    baseline = float((Z_train @ gamma).mean())
+    predicted = Z @ gamma + beta[best] * features[:, best]
+    test_mask = ~train_mask if test_mask is None else test_mask
+    errors = np.abs(predicted - y)
+    test_y = y[test_mask]
+    total = ((test_y - test_y.mean()) ** 2).sum()
+    test_r2 = float(1 - ((predicted[test_mask] - test_y) ** 2).sum() / total) if total > 0 else float("nan")
+
+    on_edge = []
+    if len(decays) > 1 and i == len(decays) - 1:
+        on_edge.append("decay")
+    saturation = float(hill(adstock[:, i].max(), kappa[i, j], shapes[k]))
+    if len(multiples) > 1 and (j == 0 or (j == len(multiples) - 1 and saturation > UNSATURATED_TOLERANCE)):
+        on_edge.append("half_saturation")
+    if len(shapes) > 1 and (k == 0 or (k == len(shapes) - 1 and shapes[k] > CONCAVE_MAX_SHAPE)):
+        on_edge.append("shape")
+    return MediaFit(
+        platform=platform,
+        decay=float(decays[i]),
+        half_saturation=float(kappa[i, j]),
+        shape=float(shapes[k]),
+        beta=float(beta[best]),
+        controls=dict(zip(controls.columns, map(float, gamma))),
+        train_mae=float(errors[train_mask].mean()),
+        test_mae=float(errors[test_mask].mean()) if test_mask.any() else float("nan"),
+        test_r2=test_r2,
+        baseline=baseline,
+        on_edge=on_edge,
+        reliable=bool(test_r2 > 0) and baseline > 0 and not on_edge,
+    )
+
+
+def select_fit(
+    frame: pd.DataFrame,
+    train_mask: np.ndarray,
+    valid_mask: np.ndarray,
+    test_mask: np.ndarray,
+    platform: str = "",
+) -> MediaFit:
+    """
+    Concave fit, or the full-grid (S-curve) fit if it is off the shape edge and
+    improves the validation R²; refitted on training + validation and scored
+    on ``test_mask``, which plays no part in the choice.
+    """
+    shapes = SHAPE_GRID[SHAPE_GRID <= CONCAVE_MAX_SHAPE]
+    if SHAPE_GRID.max() > CONCAVE_MAX_SHAPE:
+        concave = fit_platform(frame, train_mask, platform, shapes=shapes, test_mask=valid_mask)
+        s_curve = fit_platform(frame, train_mask, platform, test_mask=valid_mask)
+        if s_curve.test_r2 > concave.test_r2 and "shape" not in s_curve.on_edge:
+            shapes = SHAPE_GRID
+    return fit_platform(frame, train_mask | valid_mask, platform, shapes=shapes, test_mask=test_mask)
+
+
+@dataclass
+class ResponseCurves:
+    """Steady-state daily revenue contribution per platform on a shared-size spend grid."""
+
+    platforms: List[str]
+    spend: np.ndarray  # platforms × points
+    revenue: np.ndarray  # platforms × points
+    baseline: np.ndarray  # non-media daily revenue per platform (recent window)
+    reliable: np.ndarray  # per platform, see ``fit_platform``
+
+    @classmethod
+    def from_fits(cls, fits: Sequence[MediaFit], max_spend: Mapping[str, float], baseline: Mapping[str, float]) -> "ResponseCurves":
+        platforms = [fit.platform for fit in fits]
+        spend = np.vstack([np.linspace(0.0, max_spend[p], CURVE_POINTS) for p in platforms])
+        revenue = np.vstack([fit.contribution(grid) for fit, grid in zip(fits, spend)])
+        reliable = np.array([fit.reliable for fit in fits])
+        return cls(platforms, spend, revenue, np.array([baseline[p] for p in platforms]), reliable)
+
+    def score(self, budgets: np.ndarray) -> np.ndarray:
+        """Media revenue for ``scenarios × platforms`` daily budgets (interpolated, no refit)."""
+        budgets = np.atleast_2d(np.asarray(budgets, dtype=np.float64))
+        return np.column_stack(
+            [np.interp(budgets[:, p], self.spend[p], self.revenue[p]) for p in range(len(self.platforms))]
+        )
+
+    def marginal_roas(self, budgets: np.ndarray) -> np.ndarray:
+        """Extra revenue per extra dollar at ``budgets``."""
+        slopes = np.gradient(self.revenue, axis=1) / np.gradient(self.spend, axis=1)
+        budgets = np.atleast_2d(np.asarray(budgets, dtype=np.float64))
+        return np.column_stack([np.interp(budgets[:, p], self.spend[p], slopes[p]) for p in range(len(self.platforms))])
+
+    def save(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(
+            tmp,
+            platforms=np.array(self.platforms),
+            spend=self.spend,
+            revenue=self.revenue,
+            baseline=self.baseline,
+            reliable=self.reliable,
+        )
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "ResponseCurves":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(list(data["platforms"]), data["spend"], data["revenue"], data["baseline"], data["reliable"])
+
+
+def optimize_allocation(
+    curves: ResponseCurves,
+    current: np.ndarray,
+    total: Optional[float] = None,
+    bounds: Tuple[float, float] = (0.5, 1.5),
+    step: float = 0.01,
+    movable: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Daily budgets maximising media revenue for ``total`` (default: the
+    current total), each platform within ``bounds`` × its current budget.
+
+    Only ``movable`` platforms (default: all) are reallocated; the others keep
+    their current budget.  Every split on a ``step`` grid of the movable total
+    is scored in one call.
+    """
+    current = np.asarray(current, dtype=np.float64)
+    movable = np.ones(len(current), dtype=bool) if movable is None else np.asarray(movable, dtype=bool)
+    total = float(current.sum()) if total is None else float(total)
+    if not movable.any():
+        return current.copy()
+    free = total - current[~movable].sum()
+    units = int(round(1 / step))
+    # Shares of all but the last movable platform; the last gets the remainder.
+    rest = int(movable.sum()) - 1
+    combos = list(itertools.product(range(units + 1), repeat=rest))
+    grid = np.array(combos, dtype=np.int64).reshape(len(combos), rest)
+    grid = grid[grid.sum(axis=1) <= units]
+    shares = np.column_stack([grid, units - grid.sum(axis=1)]) / units
+    budgets = np.tile(current, (len(shares), 1))
+    budgets[:, movable] = shares * free
+    feasible = ((budgets >= bounds[0] * current) & (budgets <= bounds[1] * current)).all(axis=1)
+    if not feasible.any():
+        raise ValueError("No allocation satisfies the bounds; widen them or change the total")
+    candidates = budgets[feasible]
+    return candidates[np.argmax(curves.score(candidates).sum(axis=1))]
+
+
+@instrumented()
+def plot_response_curves(
+    curves: ResponseCurves,
+    current: np.ndarray,
+    optimized: np.ndarray,
+    output_dir: Path,
+    render_config: Optional[RenderConfig] = None,
+) -> Path:
+    """Response curves with current and optimized daily budgets marked."""
+
+    def draw(fig, axes) -> None:
+        ax = axes[0, 0]
+        for p, platform in enumerate(curves.platforms):
+            line = ax.plot(curves.spend[p], curves.revenue[p], label=platform)[0]
+            now, best = curves.score(current)[0, p], curves.score(optimized)[0, p]
+            ax.scatter([current[p]], [now], color=line.get_color(), marker="o", zorder=3)
+            ax.scatter([optimized[p]], [best], color=line.get_color(), marker="*", s=120, zorder=3)
+        ax.set_xlabel("Daily spend (USD)")
+        ax.set_ylabel("Daily media revenue (USD)")
+        ax.set_title("Response curves (● current, ★ optimized)")
+        ax.legend()
+
+    frame = pd.DataFrame(curves.revenue.T, columns=curves.platforms)
+    data_hash = frame_digest(frame, extra={"current": list(current), "optimized": list(optimized)})
+    return render_figure(CURVES_TEMPLATE, draw, output_dir / "mmm_response_curves", data_hash, render_config)
+
+
+def budget_report(
+    curves: ResponseCurves,
+    fits: Sequence[MediaFit],
+    current: np.ndarray,
+    optimized: np.ndarray,
+    period: str,
+    bounds: Tuple[float, float],
+) -> str:
+    """Markdown budget optimization report; only reliable platforms are reallocated."""
+    media_now, media_best = curves.score(current)[0], curves.score(optimized)[0]
+    # An unreliable curve's slope is not a marginal ROAS anyone should act on.
+    marginal = [
+        f"{value:.2f}" if reliable else "—"
+        for value, reliable in zip(curves.marginal_roas(current)[0], curves.reliable)
+    ]
+    revenue_now = (curves.baseline + media_now).sum()
+    revenue_best = (curves.baseline + media_best).sum()
+    lines = [
+        f"# 预算优化方案（{period}）",
+        "",
+        f"基于营销组合模型（几何 adstock + Hill 饱和曲线，`src/pipelines/mmm.py`）的日预算再分配；"
+        f"原预算为最近 {BUDGET_WINDOW_DAYS} 天的日均花费，总预算不变，各平台限制在原预算的 "
+        f"{bounds[0]:.0%}–{bounds[1]:.0%}。",
+        "",
+    ]
+    unreliable = [fit.platform for fit in fits if not fit.reliable]
+    if len(fits) - len(unreliable) < 2:
+        lines += [
+            "**不给出再分配建议**：可靠的平台模型不足两个（见下方「模型参数与校验」），"
+            "各平台维持原预算；下表的媒体收入仅供参考，不可靠平台不给出边际 ROAS。",
+            "",
+            "| 平台 | 原日预算 | 当前边际 ROAS | 媒体收入 |",
+            "|------|---------:|-------------:|---------:|",
+        ]
+        for p, platform in enumerate(curves.platforms):
+            lines.append(f"| {platform} | ${current[p]:,.0f} | {marginal[p]} | ${media_now[p]:,.0f} |")
+        lines += [
+            "",
+            f"- 日总预算：${current.sum():,.0f}",
+            f"- 预测日收入：${revenue_now:,.0f}，ROAS {revenue_now / current.sum():.2f}",
+            "",
+        ]
+    else:
+        if unreliable:
+            lines += [f"以下平台模型不可靠，维持原预算，只在其余平台之间再分配：{'、'.join(unreliable)}。", ""]
+        lines += [
+            "| 平台 | 原日预算 | 优化日预算 | 差异 | 当前边际 ROAS | 媒体收入（原） | 媒体收入（优化） |",
+            "|------|---------:|-----------:|-----:|-------------:|---------------:|-----------------:|",
+        ]
+        for p, platform in enumerate(curves.platforms):
+            lines.append(
+                f"| {platform} | ${current[p]:,.0f} | ${optimized[p]:,.0f} | {optimized[p] - current[p]:+,.0f} | "
+                f"{marginal[p]} | ${media_now[p]:,.0f} | ${media_best[p]:,.0f} |"
+            )
+        lines += [
+            "",
+            f"- 日总预算：${current.sum():,.0f}",
+            f"- 预测日收入：${revenue_now:,.0f} → ${revenue_best:,.0f}（{revenue_best / revenue_now - 1:+.1%}），"
+            f"ROAS {revenue_now / current.sum():.2f} → {revenue_best / optimized.sum():.2f}",
+            "",
+        ]
+    lines += [
+        "## 模型参数与校验",
+        "",
+        "| 平台 | adstock 衰减 | 半饱和点（日花费） | 形状 | β | 非媒体基线（日） | 训练 MAE | 测试 MAE | 测试 R² | 可靠 |",
+        "|------|------------:|------------------:|-----:|--:|----------------:|--------:|--------:|-------:|------|",
+    ]
+    for fit in fits:
+        problems = [f"网格边界：{', '.join(fit.on_edge)}"] if fit.on_edge else []
+        if not fit.test_r2 > 0:
+            problems.append("测试 R² ≤ 0")
+        if not fit.baseline > 0:
+            problems.append("非媒体基线 ≤ 0")
+        verdict = "是" if fit.reliable else "否（" + "；".join(problems) + "）"
+        lines.append(
+            f"| {fit.platform} | {fit.decay:.2f} | ${fit.half_saturation:,.0f} | {fit.shape:.2f} | "
+            f"{fit.beta:,.0f} | {'-' if fit.baseline < 0 else ''}${abs(fit.baseline):,.0f} | "
+            f"{fit.train_mae:,.0f} | {fit.test_mae:,.0f} | {fit.test_r2:.3f} | {verdict} |"
+        )
+    lines += [
+        "",
+        "## 说明",
+        "- 边际 ROAS 低于平均 ROAS 说明该平台已进入收益递减区间，额外预算优先流向边际 ROAS 更高的平台。",
+        "- 响应曲线缓存在 `output/models/mmm_response_curves.npz`，可用 "
+        "`python scripts/run_mmm.py --scenario Google=... Meta=... TikTok=...` 即时评估其他预算方案。",
+        "- 收入为各平台自报口径（末次触点）；跨平台重叠见 `attribution_by_platform.csv`。",
+        f"- 按 {HOLDOUT_BLOCK_DAYS} 天一段把全年轮流分配到训练、验证、测试窗口（各季节含 Q4 都出现在三者中）；"
+        f"响应曲线默认为凹形（形状 ≤ {CONCAVE_MAX_SHAPE:g}），仅当未触及形状上限的 S 形曲线提升验证 R² 时才采用，"
+        "选定后在训练 + 验证窗口上重新拟合，测试窗口只用于报告指标与可靠性判断。",
+        "- 半饱和点远高于观测花费时，曲线在观测范围内近似直线，即未观测到收益递减。",
+        "- 最优点落在限制拟合的网格边界、测试 R² ≤ 0 或非媒体基线 ≤ 0（媒体项解释了超过全部的收入）的平台视为不可靠，"
+        "不参与再分配。",
+        "- 花费计划与转化效率同步变化（大促与 Q4 的点击率、转化率更高），计划之外的逐日花费波动与转化无关，"
+        "因此收入随花费加速增长的部分其实是季节与大促效应，无法从观测数据中分离；"
+        "大幅调整前建议先做分地区或分时段的增量实验验证。",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+@instrumented()
+def fit_mmm(
+    integrated: pd.DataFrame,
+    test_size: float = 0.2,
+    region: str = "US",
+) -> Tuple[List[MediaFit], ResponseCurves, np.ndarray]:
+    """Fit every platform; returns the fits, their response curves and the current daily budgets."""
+    series = platform_series(integrated, region=region)
+    fits, max_spend, baseline, current = [], {}, {}, []
+    for platform, frame in series.items():
+        train_mask, valid_mask, test_mask = blocked_split_masks(frame["date"], test_size)
+        fit = select_fit(frame, train_mask, valid_mask, test_mask, platform)
+        fits.append(fit)
+        recent = frame.tail(BUDGET_WINDOW_DAYS)
+        controls = control_matrix(recent).to_numpy() @ np.array(list(fit.controls.values()))
+        baseline[platform] = float(controls.mean())
+        max_spend[platform] = 3.0 * float(frame["spend"].max())
+        current.append(float(recent["spend"].mean()))
+    return fits, ResponseCurves.from_fits(fits, max_spend, baseline), np.array(current)
+
+
+def run_mmm(
+    integrated_path: Path,
+    models_dir: Path,
+    reports_dir: Path,
+    figures_dir: Path,
+    test_size: float = 0.2,
+    region: str = "US",
+    bounds: Tuple[float, float] = (0.5, 1.5),
+    render_config: Optional[RenderConfig] = None,
+) -> MMMOutputs:
+    """Fit the model, cache the response curves and write the budget report."""
+    models_dir.mkdir(parents=True, exist_ok=True)
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    integrated = pd.read_csv(integrated_path)
+    integrated["date"] = pd.to_datetime(integrated["date"])
+    fits, curves, current = fit_mmm(integrated, test_size=test_size, region=region)
+    # Unreliable platforms keep their budget; with fewer than two reliable
+    # ones there is nothing to reallocate.
+    optimized = current.copy()
+    if curves.reliable.sum() >= 2:
+        optimized = optimize_allocation(curves, current, bounds=bounds, movable=curves.reliable)
+
+    fit_path = reports_dir / "mmm_fit.csv"
+    table = pd.DataFrame([{k: v for k, v in asdict(fit).items() if k != "controls"} for fit in fits])
+    table["on_edge"] = table["on_edge"].str.join(";")
+    table.to_csv(fit_path, index=False)
+    params_path = models_dir / "mmm_params.json"
+    tmp = params_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps([asdict(fit) for fit in fits], indent=2), encoding="utf-8")
+    tmp.replace(params_path)
+    curves_path = curves.save(models_dir / "mmm_response_curves.npz")
+
+    period = f"{integrated['date'].max():%Y-%m}"
+    report_path = reports_dir / "budget_optimization_report.md"
+    report_path.write_text(budget_report(curves, fits, current, optimized, period, bounds), encoding="utf-8")
+    figure_path = plot_response_curves(curves, current, optimized, figures_dir, render_config=render_config)
+    return MMMOutputs(
+        fit_csv=fit_path, params_json=params_path, curves=curves_path, report_md=report_path, figure=figure_path
+    )
+
+
+__all__ = [
+    "MMMOutputs",
+    "MediaFit",
+    "ResponseCurves",
+    "geometric_adstock",
+    "hill",
+    "platform_series",
+    "control_matrix",
+    "blocked_split_masks",
+    "fit_platform",
+    "select_fit",
+    "fit_mmm",
+    "optimize_allocation",
+    "plot_response_curves",
+    "budget_report",
+    "run_mmm",
+]
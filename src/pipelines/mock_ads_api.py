@@ -0,0 +1,204 @@
+"""
+Local stand-in for the ad platforms' reporting APIs.
+
+``MockAdsAPI`` serves the exports written by ``scripts/generate_raw_data.py``
+(or any directory of raw exports matching the registered adapters) over HTTP,
+using the contract ``ingestion`` expects::
+
+    GET /v1/reports/<adapter key>?start=YYYY-MM-DD&end=YYYY-MM-DD&page=1&page_size=500
+
+    {"platform": "Meta", "columns": [...raw header...], "rows": [[...], ...],
+     "page": 1, "page_size": 500, "total_pages": 9, "total_rows": 4372}
+
+Values are served exactly as they appear in the export (``"--"``, ``"< 10"``,
+``"1.56%"``), rows in file order.  ``latency`` adds a per-request delay and
+``rate_limit`` enforces a token bucket that answers ``429`` with a
+``Retry-After`` header, so client concurrency and backoff can be exercised
+locally.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .adapters import PlatformAdapter, registered_adapters
+
+
+REPORT_PREFIX = "/v1/reports/"
+
+
+class _Dataset:
+    def __init__(self, adapter: PlatformAdapter, path: Path):
+        with path.open(newline="", encoding="utf-8") as handle:
+            for _ in range(adapter.skiprows):
+                handle.readline()
+            reader = csv.reader(handle)
+            self.columns = next(reader)
+            self.rows = [row for row in reader if row]
+        date_column = next(raw for raw, name in adapter.columns.items() if name == "date")
+        position = self.columns.index(date_column)
+        self.dates = [row[position] for row in self.rows]
+        self.platform = adapter.platform
+        self._selections: Dict[Tuple[str, str], List[int]] = {}
+        self._lock = threading.Lock()
+
+    def select(self, start: str, end: str) -> List[int]:
+        """Row indices with ``start <= date <= end`` (ISO strings), memoised per range."""
+        key = (start, end)
+        with self._lock:
+            if key not in self._selections:
+                self._selections[key] = [
+                    index for index, day in enumerate(self.dates) if (not start or day >= start) and (not end or day <= end)
+                ]
+            return self._selections[key]
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """Consume a token; return 0 on success or the seconds until one is available."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class MockAdsAPI:
+    """Threaded HTTP/1.1 (keep-alive) server over a directory of raw exports."""
+
+    def __init__(
+        self,
+        raw_dir: Path,
+        adapters: Optional[Iterable[PlatformAdapter]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        rate_limit: Optional[float] = None,
+        burst: int = 10,
+        max_page_size: int = 1000,
+    ):
+        self.datasets = {
+            adapter.key: _Dataset(adapter, Path(raw_dir) / adapter.filename)
+            for adapter in (adapters if adapters is not None else registered_adapters())
+            if (Path(raw_dir) / adapter.filename).exists()
+        }
+        self.latency = latency
+        self.max_page_size = max_page_size
+        self.bucket = _TokenBucket(rate_limit, burst) if rate_limit else None
+        self.requests = 0
+        self.rate_limited = 0
+        self._counter_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockAdsAPI":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-ads-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockAdsAPI":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, limited: bool) -> None:
+        with self._counter_lock:
+            self.requests += 1
+            self.rate_limited += int(limited)
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:  # keep test output quiet
+                pass
+
+            def _send(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+                body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                if api.bucket is not None:
+                    wait = api.bucket.take()
+                    if wait:
+                        api._count(limited=True)
+                        self._send(429, {"error": "rate limit exceeded"}, {"Retry-After": f"{wait:.3f}"})
+                        return
+                api._count(limited=False)
+                if api.latency:
+                    time.sleep(api.latency)
+
+                url = urlsplit(self.path)
+                key = url.path[len(REPORT_PREFIX):] if url.path.startswith(REPORT_PREFIX) else None
+                dataset = api.datasets.get(key) if key else None
+                if dataset is None:
+                    self._send(404, {"error": f"unknown report {url.path}"})
+                    return
+                params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                try:
+                    page = int(params.get("page", 1))
+                    page_size = int(params.get("page_size", 500))
+                except ValueError:
+                    self._send(400, {"error": "page and page_size must be integers"})
+                    return
+                if page < 1 or not 1 <= page_size <= api.max_page_size:
+                    self._send(400, {"error": f"page >= 1 and 1 <= page_size <= {api.max_page_size}"})
+                    return
+
+                selected = dataset.select(params.get("start", ""), params.get("end", ""))
+                chunk = selected[(page - 1) * page_size : page * page_size]
+                self._send(
+                    200,
+                    {
+                        "platform": dataset.platform,
+                        "columns": dataset.columns,
+                        "rows": [dataset.rows[index] for index in chunk],
+                        "page": page,
+                        "page_size": page_size,
+                        "total_pages": max(1, -(-len(selected) // page_size)),
+                        "total_rows": len(selected),
+                    },
+                )
+
+        return Handler
+
+
+__all__ = ["MockAdsAPI"]
@@ -0,0 +1,272 @@
+"""
+Minimal DAG orchestrator with make-style stage caching.
+
+Each ``Stage`` declares the files it reads and writes plus the modules that
+implement it.  A stage is skipped when the digests of its inputs and code match
+the last successful run and its outputs are still intact; otherwise it runs as
+soon as the stages it depends on have finished, so independent branches of the
+graph (e.g. Week 3 next to Week 1 → Week 2) execute at the same time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .hashing import file_digest
+
+
+STATE_VERSION = 1
+
+EXECUTORS = ("process", "thread", "serial")
+
+
+@dataclass
+class Stage:
+    """
+    One node of the pipeline graph.
+
+    ``func`` is called without arguments and must be a module-level callable
+    when the process executor is used.  Dependencies are inferred from
+    ``inputs`` that another stage lists in its ``outputs``; ``depends_on`` adds
+    explicit edges on top of that.  ``code`` lists importable module names whose
+    source files version the stage.  Whatever ``func`` returns is kept on
+    ``StageResult.value``.
+    """
+
+    name: str
+    func: Callable[[], Any]
+    inputs: Sequence[Path] = ()
+    outputs: Sequence[Path] = ()
+    depends_on: Sequence[str] = ()
+    code: Sequence[str] = ()
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str
+    seconds: float
+    fingerprint: str = ""
+    value: Any = None
+
+
+@dataclass
+class StageCache:
+    """Persistent record of stage fingerprints and file digests."""
+
+    path: Path
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "StageCache":
+        if not path.exists():
+            return cls(path=path)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path=path)
+        if payload.get("version") != STATE_VERSION:
+            return cls(path=path)
+        return cls(path=path, stages=payload.get("stages", {}), files=payload.get("files", {}))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": STATE_VERSION, "stages": self.stages, "files": self.files}
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+def _module_source(module_name: str) -> Path:
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.origin is None:
+        raise ValueError(f"Cannot locate source for module {module_name!r}")
+    return Path(spec.origin)
+
+
+def _resolve_dependencies(stages: Sequence[Stage]) -> Dict[str, List[str]]:
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Stage names must be unique")
+
+    producers: Dict[Path, str] = {}
+    for stage in stages:
+        for output in stage.outputs:
+            producers[Path(output)] = stage.name
+
+    deps: Dict[str, List[str]] = {}
+    for stage in stages:
+        edges = set(stage.depends_on)
+        for path in stage.inputs:
+            producer = producers.get(Path(path))
+            if producer is not None and producer != stage.name:
+                edges.add(producer)
+        unknown = edges - set(names)
+        if unknown:
+            raise ValueError(f"Stage {stage.name!r} depends on unknown stages {sorted(unknown)}")
+        deps[stage.name] = sorted(edges)
+
+    # Kahn's algorithm purely to reject cycles early.
+    remaining = {name: set(edges) for name, edges in deps.items()}
+    while remaining:
+        ready = [name for name, edges in remaining.items() if not edges]
+        if not ready:
+            raise ValueError(f"Stage graph contains a cycle among {sorted(remaining)}")
+        for name in ready:
+            remaining.pop(name)
+        for edges in remaining.values():
+            edges.difference_update(ready)
+    return deps
+
+
+def _fingerprint(stage: Stage, cache: StageCache) -> str:
+    missing = [str(path) for path in stage.inputs if not Path(path).exists()]
+    if missing:
+        raise FileNotFoundError(f"Stage {stage.name!r} is missing inputs: {missing}")
+    payload = {
+        "stage": stage.name,
+        "inputs": {str(path): file_digest(Path(path), cache.files) for path in stage.inputs},
+        "code": {
+            module: file_digest(_module_source(module), cache.files) for module in stage.code
+        },
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _outputs_intact(stage: Stage, record: Dict[str, Any], cache: StageCache) -> bool:
+    recorded = record.get("outputs", {})
+    for path in stage.outputs:
+        path = Path(path)
+        if not path.exists() or recorded.get(str(path)) != file_digest(path, cache.files):
+            return False
+    return True
+
+
+def _make_executor(kind: str, max_workers: Optional[int]) -> Optional[Executor]:
+    if kind == "serial":
+        return None
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
+def run_stages(
+    stages: Sequence[Stage],
+    cache_path: Path,
+    force: bool = False,
+    executor: str = "process",
+    max_workers: Optional[int] = None,
+) -> List[StageResult]:
+    """
+    Run the stage graph, skipping stages whose fingerprint is unchanged.
+
+    Parameters
+    ----------
+    stages
+        Stages to run; order does not matter.
+    cache_path
+        JSON file holding fingerprints from previous runs.
+    force
+        Run every stage regardless of the cache.
+    executor
+        ``"process"`` (default), ``"thread"`` or ``"serial"``.  The worker pool
+        is only created once a stage actually needs to run.
+    max_workers
+        Upper bound on concurrently running stages; defaults to the number of
+        stages so a short branch never queues behind a long one.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor must be one of {EXECUTORS}")
+
+    deps = _resolve_dependencies(stages)
+    by_name = {stage.name: stage for stage in stages}
+    cache = StageCache.load(cache_path)
+
+    results: Dict[str, StageResult] = {}
+    pending = [stage.name for stage in stages]
+    running: Dict[Future, tuple] = {}
+    pool: Optional[Executor] = None
+
+    def finish(name: str, fingerprint: str, started: float, value: Any) -> None:
+        stage = by_name[name]
+        missing = [str(path) for path in stage.outputs if not Path(path).exists()]
+        if missing:
+            raise FileNotFoundError(f"Stage {name!r} did not produce {missing}")
+        cache.stages[name] = {
+            "fingerprint": fingerprint,
+            "outputs": {str(path): file_digest(Path(path), cache.files) for path in stage.outputs},
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        cache.save()
+        results[name] = StageResult(name, "ran", time.perf_counter() - started, fingerprint, value)
+
+    try:
+        while pending or running:
+            progressed = False
+            for name in list(pending):
+                if any(dep not in results for dep in deps[name]):
+                    continue
+                pending.remove(name)
+                progressed = True
+                stage = by_name[name]
+                started = time.perf_counter()
+                fingerprint = _fingerprint(stage, cache)
+                record = cache.stages.get(name)
+                if (
+                    not force
+                    and record is not None
+                    and record.get("fingerprint") == fingerprint
+                    and _outputs_intact(stage, record, cache)
+                ):
+                    results[name] = StageResult(name, "skipped", time.perf_counter() - started, fingerprint)
+                    continue
+
+                if executor == "serial":
+                    finish(name, fingerprint, started, stage.func())
+                    continue
+                if pool is None:
+                    pool = _make_executor(executor, max_workers or len(stages))
+                running[pool.submit(stage.func)] = (name, fingerprint, started)
+
+            if progressed and not running:
+                continue
+            if not running:
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name, fingerprint, started = running.pop(future)
+                finish(name, fingerprint, started, future.result())
+    except BaseException:
+        for future in running:
+            future.cancel()
+        cache.save()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    return [results[stage.name] for stage in stages if stage.name in results]
+
+
+__all__ = [
+    "Stage",
+    "StageResult",
+    "StageCache",
+    "run_stages",
+]
@@ -0,0 +1,203 @@
+"""
+Vectorised parsing of quirky ad-platform export values.
+
+Exports encode numbers as percent strings (``"1.56%"``) or hide small counts
+behind privacy thresholds (``"< 10"``).  Converting those with
+``astype(str).str.replace(...)`` builds a Python string per cell.  This module
+converts them while reading instead:
+
+- With pyarrow installed the CSV is read by Arrow and the quirky columns are
+  parsed with Arrow compute kernels before the table reaches pandas.
+- Otherwise (or for values Arrow cannot cast) a column is factorised and only
+  its distinct strings are parsed — a few hundred values even for
+  multi-million-row exports — then broadcast back through the codes.
+
+Every threshold replacement is recorded in a boolean mask so downstream code can
+tell imputed values from reported ones.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:  # Optional: faster CSV reading and string kernels.
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover
+    pa = pc = pa_csv = None
+
+
+ENGINES = ("auto", "pyarrow", "c")
+
+# pandas' default NA tokens.  Arrow's ``null_values`` replaces its own defaults
+# rather than extending them, so both engines get these plus the export's own.
+DEFAULT_NA_VALUES = (
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+)
+
+
+@dataclass
+class ParsedExport:
+    """A raw export with quirky columns converted to float64."""
+
+    frame: pd.DataFrame
+    masked: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def masked_counts(self) -> Dict[str, int]:
+        return {column: int(mask.sum()) for column, mask in self.masked.items()}
+
+
+def _resolve_engine(engine: str) -> str:
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if engine == "auto":
+        return "pyarrow" if pa is not None else "c"
+    if engine == "pyarrow" and pa is None:
+        raise ImportError("engine='pyarrow' requires the pyarrow package")
+    return engine
+
+
+def _parse_distinct(series: pd.Series, tokens: Mapping[str, float], percent: bool) -> np.ndarray:
+    """Parse ``series`` by converting each distinct value once."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    labels = pd.Series(uniques, dtype=object)
+    parsed = pd.to_numeric(
+        labels.str.rstrip("%") if percent else labels.replace(dict(tokens)),
+        errors="coerce",
+    ).to_numpy(dtype=float)
+    if percent:
+        parsed = parsed / 100.0
+    values = np.full(len(series), np.nan)
+    present = codes >= 0
+    values[present] = parsed[codes[present]]
+    return values
+
+
+def parse_percent(series: pd.Series) -> np.ndarray:
+    """``"1.56%"`` → ``0.0156``; unparseable values become NaN."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float) / 100.0
+    return _parse_distinct(series, {}, percent=True)
+
+
+def parse_threshold(series: pd.Series, tokens: Mapping[str, float]) -> tuple[np.ndarray, np.ndarray]:
+    """Replace threshold tokens (``{"< 10": 5}``) and return ``(values, masked)``."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float), np.zeros(len(series), dtype=bool)
+    masked = series.isin(list(tokens)).to_numpy()
+    return _parse_distinct(series, tokens, percent=False), masked
+
+
+def _arrow_percent(column: "pa.ChunkedArray") -> "pa.ChunkedArray":
+    stripped = pc.utf8_rtrim(column, characters="%")
+    return pc.divide(pc.cast(stripped, pa.float64()), 100.0)
+
+
+def _arrow_threshold(
+    column: "pa.ChunkedArray", tokens: Mapping[str, float]
+) -> tuple["pa.ChunkedArray", np.ndarray]:
+    is_token = pc.fill_null(pc.is_in(column, value_set=pa.array(list(tokens), pa.string())), False)
+    values = pc.cast(pc.if_else(is_token, pa.scalar(None, pa.string()), column), pa.float64())
+    for token, replacement in tokens.items():
+        values = pc.if_else(pc.fill_null(pc.equal(column, token), False), replacement, values)
+    return values, is_token.to_numpy(zero_copy_only=False)
+
+
+def _coerce_numeric(frame: pd.DataFrame, numeric: Sequence[str]) -> None:
+    """Cast declared numeric columns that were inferred as text (stray values become NaN)."""
+    for name in numeric:
+        if name in frame.columns and not pd.api.types.is_numeric_dtype(frame[name]):
+            frame[name] = pd.to_numeric(frame[name], errors="coerce")
+
+
+def _read_arrow(
+    path: Path,
+    skiprows: int,
+    na_values: Sequence[str],
+    percent: Sequence[str],
+    thresholds: Mapping[str, Mapping[str, float]],
+    string_columns: Sequence[str],
+    numeric: Sequence[str],
+) -> ParsedExport:
+    as_string = set(percent) | set(thresholds) | set(string_columns)
+    table = pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(skip_rows=skiprows),
+        convert_options=pa_csv.ConvertOptions(
+            null_values=list(dict.fromkeys([*DEFAULT_NA_VALUES, *na_values])),
+            strings_can_be_null=True,
+            column_types={name: pa.string() for name in as_string},
+        ),
+    )
+    masked: Dict[str, np.ndarray] = {}
+    fallback: Dict[str, Optional[Mapping[str, float]]] = {}
+    for name in percent:
+        try:
+            table = table.set_column(table.schema.get_field_index(name), name, _arrow_percent(table[name]))
+        except pa.ArrowInvalid:
+            fallback[name] = None
+    for name, tokens in thresholds.items():
+        try:
+            values, masked[name] = _arrow_threshold(table[name], tokens)
+            table = table.set_column(table.schema.get_field_index(name), name, values)
+        except pa.ArrowInvalid:
+            fallback[name] = tokens
+
+    frame = table.to_pandas()
+    # Columns with values Arrow cannot cast (stray text) get the coercing path.
+    for name, tokens in fallback.items():
+        if tokens is None:
+            frame[name] = parse_percent(frame[name])
+        else:
+            frame[name], masked[name] = parse_threshold(frame[name], tokens)
+    _coerce_numeric(frame, numeric)
+    return ParsedExport(frame, masked)
+
+
+def read_export(
+    path: Path,
+    skiprows: int = 0,
+    na_values: Sequence[str] = ("--",),
+    percent: Sequence[str] = (),
+    thresholds: Optional[Mapping[str, Mapping[str, float]]] = None,
+    string_columns: Sequence[str] = (),
+    numeric: Sequence[str] = (),
+    engine: str = "auto",
+) -> ParsedExport:
+    """
+    Read a raw export, converting quirky columns during the read.
+
+    Column names refer to the raw header.  ``string_columns`` are kept as text
+    (e.g. date columns parsed later by ``pd.to_datetime``); ``numeric`` columns
+    are cast to numbers with unparseable values as NaN.  Empty cells and
+    pandas' other default NA tokens are missing values in addition to
+    ``na_values``.  ``engine`` is ``"pyarrow"``, ``"c"`` (pandas' parser) or
+    ``"auto"`` (pyarrow if installed).
+    """
+    thresholds = thresholds or {}
+    if _resolve_engine(engine) == "pyarrow":
+        return _read_arrow(path, skiprows, na_values, percent, thresholds, string_columns, numeric)
+
+    frame = pd.read_csv(path, skiprows=skiprows, na_values=list(na_values))
+    masked: Dict[str, np.ndarray] = {}
+    for name in percent:
+        frame[name] = parse_percent(frame[name])
+    for name, tokens in thresholds.items():
+        frame[name], masked[name] = parse_threshold(frame[name], tokens)
+    _coerce_numeric(frame, numeric)
+    return ParsedExport(frame, masked)
+
+
+__all__ = [
+    "ParsedExport",
+    "parse_percent",
+    "parse_threshold",
+    "read_export",
+]
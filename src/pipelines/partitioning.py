@@ -0,0 +1,315 @@
+"""
+Hive-style partitioned storage for the integrated dataset.
+
+Week 1 can write the integrated frame as one file per platform and month::
+
+    partitioned/
+        _manifest.json
+        platform=Meta/month=2024-11/part-0.parquet
+        platform=Google/month=2024-11/part-0.parquet
+        ...
+
+Partition columns live in the directory names, not the files.  The manifest
+records rows, a content digest and per-column min/max for every partition, so
+``read_partitioned`` can skip partitions from the paths and statistics alone
+(partition pruning) before applying the remaining filters to the rows it reads
+(predicate pushdown; for Parquet the filters go to pyarrow).  Unchanged
+partitions are not rewritten, which keeps incremental refreshes cheap.
+
+Parquet is used when pyarrow is installed, CSV otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .hashing import frame_digest
+
+
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_VERSION = 1
+PARTITION_COLUMNS = ("platform", "month")
+FILTER_OPS = ("==", "!=", "<", "<=", ">", ">=", "in")
+
+Filter = Tuple[str, str, Any]
+
+
+def _default_format() -> str:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "csv"
+    return "parquet"
+
+
+@dataclass
+class Partition:
+    """One manifest entry."""
+
+    path: str
+    keys: Dict[str, str]
+    rows: int
+    digest: str
+    stats: Dict[str, List[Any]]
+
+
+def _month_key(dates: pd.Series) -> pd.Series:
+    return pd.to_datetime(dates).dt.strftime("%Y-%m")
+
+
+def _column_stats(frame: pd.DataFrame) -> Dict[str, List[Any]]:
+    """Min/max per date or numeric column (``None`` when all values are missing)."""
+    stats: Dict[str, List[Any]] = {}
+    for column in frame.columns:
+        series = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            valid = series.dropna()
+            stats[column] = (
+                [valid.min().isoformat(), valid.max().isoformat()] if len(valid) else [None, None]
+            )
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy(dtype=float)
+            if np.isnan(values).all():
+                stats[column] = [None, None]
+            else:
+                stats[column] = [float(np.nanmin(values)), float(np.nanmax(values))]
+    return stats
+
+
+def load_manifest(root: Path) -> Dict[str, Any]:
+    path = Path(root) / MANIFEST_NAME
+    if not path.exists():
+        raise FileNotFoundError(f"No partition manifest at {path}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_partitioned(
+    df: pd.DataFrame,
+    root: Path,
+    partition_by: Sequence[str] = PARTITION_COLUMNS,
+    fmt: Optional[str] = None,
+) -> Path:
+    """
+    Write ``df`` under ``root`` partitioned by ``partition_by``.
+
+    ``month`` is derived from ``date`` when requested and not present.
+    Partitions whose content digest matches the existing manifest are left
+    untouched; files of partitions that no longer exist (or were written in
+    another format or layout) are removed.  Returns the manifest path.
+    """
+    root = Path(root)
+    fmt = fmt or _default_format()
+    if fmt not in ("parquet", "csv"):
+        raise ValueError("fmt must be 'parquet' or 'csv'")
+    root.mkdir(parents=True, exist_ok=True)
+
+    frame = df.copy()
+    if "month" in partition_by and "month" not in frame.columns:
+        frame["month"] = _month_key(frame["date"])
+
+    previous: Dict[str, Dict[str, Any]] = {}
+    try:
+        previous = {entry["path"]: entry for entry in load_manifest(root)["partitions"]}
+    except FileNotFoundError:
+        pass
+
+    data_columns = [column for column in frame.columns if column not in partition_by]
+    partitions: List[Dict[str, Any]] = []
+    for keys, group in frame.groupby(list(partition_by), sort=True, observed=True):
+        keys = keys if isinstance(keys, tuple) else (keys,)
+        key_map = {name: str(value) for name, value in zip(partition_by, keys)}
+        relative = "/".join(f"{name}={value}" for name, value in key_map.items())
+        relative = f"{relative}/part-0.{fmt}"
+        body = group[data_columns].reset_index(drop=True)
+        digest = frame_digest(body)
+
+        target = root / relative
+        if previous.get(relative, {}).get("digest") != digest or not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + ".tmp")
+            if fmt == "parquet":
+                body.to_parquet(tmp, index=False)
+            else:
+                body.to_csv(tmp, index=False)
+            os.replace(tmp, target)
+
+        partitions.append(
+            {
+                "path": relative,
+                "keys": key_map,
+                "rows": len(body),
+                "digest": digest,
+                "stats": _column_stats(body),
+            }
+        )
+
+    current = {entry["path"] for entry in partitions}
+    for stale in set(previous) - current:
+        # Only the file: after a format change the directory holds the new one.
+        (root / stale).unlink(missing_ok=True)
+        # Remove now-empty parents (e.g. platform=X/ with no months left).
+        parent = (root / stale).parent
+        while parent != root and parent.exists() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "format": fmt,
+        "partition_by": list(partition_by),
+        "columns": data_columns,
+        "column_order": list(df.columns),
+        "partitions": partitions,
+    }
+    manifest_path = root / MANIFEST_NAME
+    tmp = manifest_path.with_name(MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, manifest_path)
+    return manifest_path
+
+
+def _range_may_match(low: Any, high: Any, op: str, value: Any) -> bool:
+    if low is None:
+        # All values missing: no comparison can match except !=.
+        return op == "!="
+    if isinstance(low, str):
+        low, high = pd.Timestamp(low), pd.Timestamp(high)
+        values = [pd.Timestamp(v) for v in value] if op == "in" else pd.Timestamp(value)
+    else:
+        values = value
+    if op == "==":
+        return low <= values <= high
+    if op == "!=":
+        return not (low == high == values)
+    if op == "<":
+        return low < values
+    if op == "<=":
+        return low <= values
+    if op == ">":
+        return high > values
+    if op == ">=":
+        return high >= values
+    return any(low <= item <= high for item in values)
+
+
+def _key_matches(key: str, op: str, value: Any) -> bool:
+    if op == "in":
+        return key in {str(item) for item in value}
+    if op in ("==", "!="):
+        return (key == str(value)) == (op == "==")
+    left, right = key, str(value)
+    return {"<": left < right, "<=": left <= right, ">": left > right, ">=": left >= right}[op]
+
+
+def prune_partitions(manifest: Dict[str, Any], filters: Iterable[Filter] = ()) -> List[Partition]:
+    """Return the partitions that can contain rows matching every filter."""
+    filters = list(filters)
+    for _, op, _ in filters:
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unsupported filter op {op!r}; expected one of {FILTER_OPS}")
+
+    selected = []
+    for entry in manifest["partitions"]:
+        keep = True
+        for column, op, value in filters:
+            if column in entry["keys"]:
+                keep = _key_matches(entry["keys"][column], op, value)
+            elif column in entry["stats"]:
+                low, high = entry["stats"][column]
+                keep = _range_may_match(low, high, op, value)
+            if not keep:
+                break
+        if keep:
+            selected.append(Partition(**entry))
+    return selected
+
+
+def _row_mask(frame: pd.DataFrame, column: str, op: str, value: Any) -> pd.Series:
+    series = frame[column]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        value = [pd.Timestamp(v) for v in value] if op == "in" else pd.Timestamp(value)
+    if op == "in":
+        return series.isin(list(value))
+    return {
+        "==": series == value,
+        "!=": series != value,
+        "<": series < value,
+        "<=": series <= value,
+        ">": series > value,
+        ">=": series >= value,
+    }[op]
+
+
+def _read_file(path: Path, fmt: str, columns: Optional[List[str]], filters: List[Filter]) -> pd.DataFrame:
+    if fmt == "parquet":
+        arrow_filters = [
+            (column, op, [pd.Timestamp(v) for v in value] if op == "in" and column == "date"
+             else pd.Timestamp(value) if column == "date" else value)
+            for column, op, value in filters
+        ]
+        return pd.read_parquet(path, columns=columns, filters=arrow_filters or None)
+    frame = pd.read_csv(path, usecols=columns, float_precision="round_trip")
+    if "date" in frame.columns:
+        frame["date"] = pd.to_datetime(frame["date"])
+    return frame
+
+
+def read_partitioned(
+    root: Path,
+    filters: Iterable[Filter] = (),
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read the partitions under ``root`` that match ``filters``.
+
+    ``filters`` are ``(column, op, value)`` tuples combined with AND, e.g.
+    ``[("platform", "==", "Meta"), ("date", ">=", "2024-12-25")]``; ``op`` is one
+    of ``==, !=, <, <=, >, >=, in``.  Partition columns are restored from the
+    directory names.  ``columns`` limits the columns returned.
+    """
+    root = Path(root)
+    manifest = load_manifest(root)
+    filters = list(filters)
+    data_columns = manifest["columns"]
+    file_filters = [item for item in filters if item[0] in data_columns]
+
+    read_columns = None
+    if columns is not None:
+        needed = set(columns) | {column for column, _, _ in file_filters}
+        read_columns = [column for column in data_columns if column in needed]
+    output_columns = list(columns) if columns is not None else manifest["column_order"]
+
+    frames = []
+    for partition in prune_partitions(manifest, filters):
+        frame = _read_file(root / partition.path, manifest["format"], read_columns, file_filters)
+        for column, op, value in file_filters:
+            frame = frame.loc[_row_mask(frame, column, op, value)]
+        for name, key in partition.keys.items():
+            frame[name] = key
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=output_columns)
+    result = pd.concat(frames, ignore_index=True)
+    order = [column for column in ("date", "platform") if column in result.columns]
+    if order:
+        # Stable sort restores the row order of the frame that was written.
+        result = result.sort_values(order, kind="stable")
+    return result[output_columns].reset_index(drop=True)
+
+
+__all__ = [
+    "PARTITION_COLUMNS",
+    "Partition",
+    "write_partitioned",
+    "load_manifest",
+    "prune_partitions",
+    "read_partitioned",
+]
@@ -0,0 +1,240 @@
+"""
+Power analysis and test-duration planning for the creative A/B test.
+
+``simulate_experiments`` draws N experiments × arms × days as 3-D arrays with
+one ``np.random.Generator``, using the same daily model as
+``week3_ab_testing.simulate_creative``: clipped normal spend, impressions, CTR
+and CVR, with the learning-period penalty applied to the first days.
+
+``power_curves`` then runs Week 3's analysis on the whole batch: drop the
+learning period, Welch's t-test of the treatment against control on the
+stable days, and "promote" when ``p < alpha`` with a positive difference (the
+rule in ``build_report``).  Running a test for ``d`` days observes the first
+``d`` simulated days, so every duration is evaluated from cumulative sums over
+one simulation of the longest test, and each effect size is one batch.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .hashing import frame_digest
+from .instrumentation import instrumented
+from .rendering import FigureTemplate, RenderConfig, render_figure
+from .week3_ab_testing import CREATIVE_A
+
+
+METRICS = ("roas", "cpa", "ctr", "cvr")
+
+POWER_TEMPLATE = FigureTemplate(name="ab_test_power_curves", figsize=(10, 6), style="whitegrid")
+
+
+@dataclass
+class PowerOutputs:
+    """Paths generated by run_power_analysis."""
+
+    table_csv: Path
+    figure: Path
+
+
+def _arm_parameters(arms: Sequence[Mapping[str, float]]) -> Dict[str, np.ndarray]:
+    """Arm parameters as ``(arms, 1)`` columns that broadcast over days."""
+    names = arms[0].keys()
+    return {name: np.array([[float(arm[name])] for arm in arms]) for name in names}
+
+
+def simulate_experiments(
+    arms: Sequence[Mapping[str, float]],
+    n_experiments: int,
+    num_days: int,
+    learning_period: int = 7,
+    avg_order_value: float = 86.0,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Daily metrics of ``n_experiments`` runs of every arm.
+
+    ``arms`` take ``simulate_creative``'s parameters (e.g. ``CREATIVE_A``).
+    Returns ``experiments × arms × days`` arrays keyed like its columns.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    p = _arm_parameters(arms)
+    shape = (n_experiments, len(arms), num_days)
+
+    spend = np.clip(rng.normal(p["spend_mean"], p["spend_std"], shape), p["spend_mean"] * 0.75, p["spend_mean"] * 1.35)
+    impressions = np.clip(rng.normal(p["imp_mean"], p["imp_std"], shape), p["imp_mean"] * 0.7, p["imp_mean"] * 1.4)
+    impressions = impressions.astype(np.int64)
+    ctr = np.clip(rng.normal(p["ctr_mean"], p["ctr_std"], shape), 0.005, None)
+    cvr = np.clip(rng.normal(p["cvr_mean"], p["cvr_std"], shape), 0.003, None)
+
+    ctr[..., :learning_period] *= p["learning_penalty"]
+    cvr[..., :learning_period] *= p["learning_penalty"]
+
+    clicks = np.clip(np.round(impressions * ctr).astype(np.int64), 1, None)
+    conversions = np.clip(np.round(clicks * cvr).astype(np.int64), 0, clicks)
+    revenue = conversions * avg_order_value
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "spend": spend,
+            "impressions": impressions,
+            "clicks": clicks,
+            "conversions": conversions,
+            "revenue": revenue,
+            "roas": revenue / spend,
+            "cpa": np.where(conversions > 0, spend / conversions, np.nan),
+            "ctr": clicks / impressions,
+            "cvr": conversions / clicks,
+        }
+
+
+def _prefix_moments(values: np.ndarray) -> tuple:
+    """Count, mean and sample variance over every prefix of the last axis, NaN-aware."""
+    valid = ~np.isnan(values)
+    # Centre on the first-day mean so the running sums of squares stay accurate.
+    shift = np.nanmean(values[..., :1])
+    centred = np.where(valid, values - shift, 0.0)
+    count = np.cumsum(valid, axis=-1)
+    total = np.cumsum(centred, axis=-1)
+    squares = np.cumsum(centred * centred, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        variance = (squares - count * mean * mean) / (count - 1)
+    return count, mean + shift, variance
+
+
+def welch_prefix_tests(control: np.ndarray, treatment: np.ndarray) -> tuple:
+    """
+    Welch's t-test of ``treatment`` vs ``control`` on every prefix of the days.
+
+    Inputs are ``experiments × days``; returns ``(difference, p-value)`` of the
+    same shape, where column ``k`` uses the first ``k + 1`` days (as
+    ``scipy.stats.ttest_ind(treatment, control, equal_var=False)``).
+    """
+    from scipy import stats
+
+    n_a, mean_a, var_a = _prefix_moments(control)
+    n_b, mean_b, var_b = _prefix_moments(treatment)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se_a, se_b = var_a / n_a, var_b / n_b
+        t_stat = (mean_b - mean_a) / np.sqrt(se_a + se_b)
+        dof = (se_a + se_b) ** 2 / (se_a**2 / (n_a - 1) + se_b**2 / (n_b - 1))
+    p_value = 2 * stats.t.sf(np.abs(t_stat), dof)
+    return mean_b - mean_a, p_value
+
+
+@instrumented()
+def power_curves(
+    lifts: Iterable[float] = (0.0, 0.02, 0.05, 0.1, 0.15, 0.2),
+    days: Iterable[int] = range(14, 57, 7),
+    control: Mapping[str, float] = CREATIVE_A,
+    treatment: Optional[Mapping[str, float]] = None,
+    n_experiments: int = 2000,
+    learning_period: int = 7,
+    metric: str = "roas",
+    alpha: float = 0.05,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Share of simulated tests that would promote the treatment, per effect size
+    and test length.
+
+    The treatment is ``treatment`` (default: a copy of ``control``) with its
+    mean conversion rate raised by each relative ``lift``; revenue is
+    proportional to conversions, so the lift carries over to ROAS.  ``days``
+    counts the whole test including the learning period.  At ``lift == 0``
+    the promotion rate is the false-positive rate (about ``alpha / 2``).
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+    days = np.asarray(sorted(days))
+    if days.min() <= learning_period + 1:
+        raise ValueError("Each test needs at least two days after the learning period")
+    treatment = dict(treatment if treatment is not None else control)
+    lifts = list(lifts)
+    # One child stream per lift, so lifts could be simulated independently.
+    streams = np.random.SeedSequence(seed).spawn(len(lifts))
+
+    rows = []
+    for lift, stream in zip(lifts, streams):
+        arm = dict(treatment, cvr_mean=treatment["cvr_mean"] * (1 + lift), cvr_std=treatment["cvr_std"] * (1 + lift))
+        batch = simulate_experiments(
+            [control, arm], n_experiments, int(days.max()), learning_period, rng=np.random.default_rng(stream)
+        )
+        stable = batch[metric][..., learning_period:]
+        difference, p_value = welch_prefix_tests(stable[:, 0], stable[:, 1])
+        promoted = (p_value < alpha) & (difference > 0)
+        columns = days - learning_period - 1
+        for num_days, column in zip(days, columns):
+            rows.append(
+                {
+                    "lift": lift,
+                    "num_days": int(num_days),
+                    "stable_days": int(num_days - learning_period),
+                    "power": float(promoted[:, column].mean()),
+                    "mean_difference": float(np.nanmean(difference[:, column])),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def required_days(curves: pd.DataFrame, target: float = 0.8) -> pd.DataFrame:
+    """Shortest simulated test length reaching ``target`` power for each lift (NaN if none)."""
+    reached = curves[curves["power"] >= target].groupby("lift")["num_days"].min()
+    return reached.reindex(curves["lift"].unique()).rename("required_days").reset_index()
+
+
+@instrumented()
+def plot_power_curves(
+    curves: pd.DataFrame,
+    output_dir: Path,
+    target: float = 0.8,
+    render_config: Optional[RenderConfig] = None,
+) -> Path:
+    """Power against test length, one line per lift."""
+
+    def draw(fig, axes) -> None:
+        ax = axes[0, 0]
+        for lift, group in curves.groupby("lift"):
+            ax.plot(group["num_days"], group["power"], marker="o", label=f"+{lift:.0%}")
+        ax.axhline(target, color="gray", linestyle="--", linewidth=1)
+        ax.set_ylim(0, 1)
+        ax.set_xlabel("Test length in days (incl. learning period)")
+        ax.set_ylabel("Power (share of tests promoting B)")
+        ax.set_title("A/B test power by effect size")
+        ax.legend(title="Lift")
+
+    data_hash = frame_digest(curves, extra={"target": target})
+    return render_figure(POWER_TEMPLATE, draw, output_dir / "ab_test_power_curves", data_hash, render_config)
+
+
+def run_power_analysis(
+    reports_dir: Path,
+    figures_dir: Path,
+    render_config: Optional[RenderConfig] = None,
+    target: float = 0.8,
+    **kwargs,
+) -> PowerOutputs:
+    """Write the power table (``ab_test_power.csv``) and curve figure; ``kwargs`` go to ``power_curves``."""
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    curves = power_curves(**kwargs)
+    table_path = reports_dir / "ab_test_power.csv"
+    curves.to_csv(table_path, index=False)
+    figure_path = plot_power_curves(curves, figures_dir, target=target, render_config=render_config)
+    return PowerOutputs(table_csv=table_path, figure=figure_path)
+
+
+__all__ = [
+    "PowerOutputs",
+    "simulate_experiments",
+    "welch_prefix_tests",
+    "power_curves",
+    "required_days",
+    "plot_power_curves",
+    "run_power_analysis",
+]
@@ -0,0 +1,302 @@
+"""
+Mergeable quantile sketches (t-digest) for CPA/ROAS percentiles.
+
+Week 1 summarises every (platform, campaign, day) cell of the integrated data
+as a t-digest: a short list of weighted centroids that are singletons in the
+tails and grow towards the median, about ``compression / 2`` of them plus
+``2 log2(n)`` tail centroids for ``n`` values.
+Digests merge by pooling their centroids, so medians and p90s for any rollup
+(platform, campaign, month, all data) come from the stored centroid table
+instead of rescanning rows.
+
+The kernel is vectorised over *many* digests at once: centroids carry a group
+id, one lexsort orders them by (group, mean), and the scale function
+``k(q) = δ / 2π · asin(2q − 1) + log2(q / (1 − q))`` assigns each centroid to a
+merge bin within its group.  The ``asin`` term is the usual t-digest ``k1``;
+on its own it leaves about ``(π/δ)²`` of the mass in the last centroid (0.1%
+at δ = 100, which biases p99.9 of a million values by ~20%).  The logit term
+caps every tail centroid at about half the weight beyond it, so the extreme
+centroids stay singletons however many values a digest holds.
+
+Building thousands of cell digests or rolling them up is a handful of numpy
+passes, not a Python loop per digest.
+
+Sketches are stored as a long table (key columns, ``metric``, ``mean``,
+``weight``), as Parquet when pyarrow is installed and CSV otherwise.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import instrumented
+
+
+SKETCH_METRICS = ("cpa", "roas", "ctr", "cvr")
+SKETCH_KEYS = ("platform", "campaign_name", "date")
+DEFAULT_COMPRESSION = 200.0
+
+
+def _scale(q: np.ndarray, compression: float) -> np.ndarray:
+    q = np.clip(q, np.finfo(np.float64).tiny, np.nextafter(1.0, 0.0))
+    return compression / (2 * np.pi) * np.arcsin(2 * q - 1) + np.log2(q) - np.log2(1 - q)
+
+
+def _group_bounds(groups: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start index and length of each run of equal ids in a sorted array."""
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if len(groups) else np.array([], int)
+    lengths = np.diff(np.r_[starts, len(groups)])
+    return starts, lengths
+
+
+def compress_grouped(
+    groups: np.ndarray,
+    means: np.ndarray,
+    weights: np.ndarray,
+    compression: float = DEFAULT_COMPRESSION,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compress the centroids of many digests at once.
+
+    ``groups`` identifies the digest of each centroid.  Digests with at most
+    ``compression`` centroids are kept as they are, so small cells stay exact.
+    Returns ``(groups, means, weights)`` sorted by group, then mean.
+    """
+    keep = np.isfinite(means) & (weights > 0)
+    groups, means, weights = groups[keep], means[keep], weights[keep].astype(np.float64)
+    order = np.lexsort((means, groups))
+    groups, means, weights = groups[order], means[order], weights[order]
+    if not len(groups):
+        return groups, means, weights
+
+    starts, lengths = _group_bounds(groups)
+    cumulative = np.cumsum(weights)
+    before_group = np.repeat(cumulative[starts] - weights[starts], lengths)
+    totals = np.repeat(np.add.reduceat(weights, starts), lengths)
+    q_left = (cumulative - weights - before_group) / totals
+    bins = np.floor(_scale(q_left, compression)).astype(np.int64)
+    small = np.repeat(lengths <= compression, lengths)
+    bins = np.where(small, np.arange(len(bins)), bins)
+
+    new_segment = np.r_[True, (groups[1:] != groups[:-1]) | (bins[1:] != bins[:-1])]
+    segment = np.cumsum(new_segment) - 1
+    merged_weights = np.bincount(segment, weights=weights)
+    merged_means = np.bincount(segment, weights=weights * means) / merged_weights
+    return groups[new_segment], merged_means, merged_weights
+
+
+def grouped_quantiles(
+    groups: np.ndarray,
+    means: np.ndarray,
+    weights: np.ndarray,
+    quantiles: Sequence[float],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Quantiles of every digest from centroids sorted by (group, mean).
+
+    Centroids are placed at the middle rank they cover and interpolated
+    linearly, which reproduces ``numpy.quantile`` while a digest still holds
+    single values.  Returns
+    ``(group ids, total weight per group, values[group, quantile])``.
+    """
+    starts, lengths = _group_bounds(groups)
+    ends = starts + lengths - 1
+    cumulative = np.cumsum(weights)
+    centres = cumulative - (weights + 1) / 2
+    base = cumulative[starts] - weights[starts]
+    totals = np.add.reduceat(weights, starts) if len(starts) else np.array([])
+
+    targets = base[:, None] + np.asarray(quantiles)[None, :] * (totals[:, None] - 1)
+    upper = np.searchsorted(centres, targets)
+    upper = np.clip(upper, starts[:, None], ends[:, None])
+    lower = np.clip(upper - 1, starts[:, None], ends[:, None])
+    span = centres[upper] - centres[lower]
+    fraction = np.where(span > 0, (targets - centres[lower]) / np.where(span > 0, span, 1), 0.0)
+    fraction = np.clip(fraction, 0.0, 1.0)
+    values = means[lower] + fraction * (means[upper] - means[lower])
+    return groups[starts], totals, values
+
+
+class TDigest:
+    """A single mergeable t-digest built on the grouped kernel."""
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.array([], dtype=np.float64)
+        self.weights = np.array([], dtype=np.float64)
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+
+    @classmethod
+    def from_centroids(
+        cls, means: np.ndarray, weights: np.ndarray, compression: float = DEFAULT_COMPRESSION
+    ) -> "TDigest":
+        digest = cls(compression)
+        digest._compress(means, weights)
+        return digest
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        groups = np.zeros(len(means), dtype=np.int64)
+        _, self.means, self.weights = compress_grouped(groups, means, weights, self.compression)
+
+    def add(self, values: Iterable[float]) -> "TDigest":
+        chunk = np.asarray(values, dtype=np.float64).ravel()
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered > 20 * self.compression:
+            self._flush()
+        return self
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        incoming = np.concatenate(self._buffer)
+        means = np.r_[self.means, incoming]
+        weights = np.r_[self.weights, np.ones(len(incoming))]
+        self._compress(means, weights)
+        self._buffer, self._buffered = [], 0
+
+    def merge(self, *others: "TDigest") -> "TDigest":
+        """Return a new digest holding this digest and ``others``."""
+        for digest in (self, *others):
+            digest._flush()
+        means = np.concatenate([digest.means for digest in (self, *others)])
+        weights = np.concatenate([digest.weights for digest in (self, *others)])
+        return TDigest.from_centroids(means, weights, self.compression)
+
+    @property
+    def count(self) -> float:
+        self._flush()
+        return float(self.weights.sum())
+
+    def quantile(self, q: Sequence[float]) -> np.ndarray:
+        self._flush()
+        if not len(self.means):
+            return np.full(len(q), np.nan)
+        groups = np.zeros(len(self.means), np.int64)
+        return grouped_quantiles(groups, self.means, self.weights, q)[2][0]
+
+
+@instrumented()
+def build_sketches(
+    frame: pd.DataFrame,
+    keys: Sequence[str] = SKETCH_KEYS,
+    metrics: Sequence[str] = SKETCH_METRICS,
+    compression: float = DEFAULT_COMPRESSION,
+) -> pd.DataFrame:
+    """
+    One t-digest per ``keys`` cell and metric, as a long centroid table.
+
+    Missing and infinite metric values (e.g. CPA without conversions) are
+    skipped.
+    """
+    keys = list(keys)
+    cells = frame.groupby(keys, sort=True, observed=True).ngroup().to_numpy()
+    cell_keys = frame[keys].drop_duplicates().sort_values(keys).reset_index(drop=True)
+
+    tables = []
+    for metric in metrics:
+        values = frame[metric].to_numpy(dtype=np.float64)
+        groups, means, weights = compress_grouped(cells, values, np.ones(len(values)), compression)
+        table = cell_keys.iloc[groups].reset_index(drop=True)
+        table["metric"] = metric
+        table["mean"] = means
+        table["weight"] = weights
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
+
+
+def _rollup_keys(sketches: pd.DataFrame, by: Sequence[str]) -> pd.DataFrame:
+    columns = {}
+    for key in by:
+        if key in sketches.columns:
+            columns[key] = sketches[key]
+        elif key in ("month", "week") and "date" in sketches.columns:
+            dates = pd.to_datetime(sketches["date"])
+            columns[key] = (
+                dates.dt.strftime("%Y-%m") if key == "month"
+                else dates.dt.to_period("W-SUN").dt.start_time.dt.strftime("%Y-%m-%d")
+            )
+        else:
+            raise KeyError(f"Cannot roll sketches up by {key!r}")
+    return pd.DataFrame(columns, index=sketches.index)
+
+
+@instrumented()
+def rollup_quantiles(
+    sketches: pd.DataFrame,
+    by: Sequence[str] = ("platform",),
+    quantiles: Sequence[float] = (0.5, 0.9),
+    metrics: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Percentiles per ``by`` group (plus ``metric``) by merging cell digests.
+
+    ``by`` may name any key column of the sketch table, ``month`` or ``week``
+    (derived from ``date``), or be empty for the whole data set.
+    """
+    if metrics is not None:
+        sketches = sketches[sketches["metric"].isin(list(metrics))]
+    keys = _rollup_keys(sketches, by)
+    keys["metric"] = sketches["metric"]
+    group_ids = keys.groupby(list(keys.columns), sort=True).ngroup().to_numpy()
+    labels = keys.drop_duplicates().sort_values(list(keys.columns)).reset_index(drop=True)
+
+    # Pooled centroids are only sorted: compressing them again would save
+    # memory for a table that is discarded right away, at some accuracy cost.
+    means = sketches["mean"].to_numpy(dtype=np.float64)
+    weights = sketches["weight"].to_numpy(dtype=np.float64)
+    order = np.lexsort((means, group_ids))
+    groups, means, weights = group_ids[order], means[order], weights[order]
+    ids, counts, values = grouped_quantiles(groups, means, weights, quantiles)
+    result = labels.iloc[ids].reset_index(drop=True)
+    result["count"] = counts.astype(np.int64)
+    for index, q in enumerate(quantiles):
+        result[f"p{round(q * 100):g}"] = values[:, index]
+    return result
+
+
+def sketch_path(directory: Path) -> Path:
+    """Where Week 1 stores the sketch table: Parquet with pyarrow, else CSV."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return Path(directory) / "metric_sketches.csv"
+    return Path(directory) / "metric_sketches.parquet"
+
+
+def write_sketches(sketches: pd.DataFrame, path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    if path.suffix == ".parquet":
+        sketches.to_parquet(tmp, index=False)
+    else:
+        sketches.to_csv(tmp, index=False)
+    tmp.replace(path)
+    return path
+
+
+def read_sketches(path: Path) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+__all__ = [
+    "SKETCH_METRICS",
+    "SKETCH_KEYS",
+    "TDigest",
+    "compress_grouped",
+    "grouped_quantiles",
+    "build_sketches",
+    "rollup_quantiles",
+    "sketch_path",
+    "write_sketches",
+    "read_sketches",
+]
@@ -0,0 +1,195 @@
+"""
+Memory-mapped cache of parsed raw exports.
+
+The first read of a raw export goes through ``parsing.read_export``; the
+resulting columns are stored as one ``.npy`` file each — numeric and boolean
+columns as-is, text columns as ``int32`` category codes plus a JSON list of
+categories — and later reads memory-map those files instead of parsing CSV.
+
+An entry is keyed by the SHA-256 of the raw file and the parse settings, so
+editing or regenerating an export (or changing an adapter) invalidates it.
+File digests are memoised on size and mtime, so a cache hit does not re-read
+the CSV either.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .hashing import file_digest
+from .parsing import ParsedExport, read_export
+
+
+# 2: empty cells parse as missing under pyarrow; declared numeric columns.
+CACHE_VERSION = 2
+META_NAME = "meta.json"
+DIGEST_MEMO = "digests.json"
+
+
+def _load_memo(cache_dir: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        return json.loads((cache_dir / DIGEST_MEMO).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_memo(cache_dir: Path, memo: Mapping[str, Dict[str, Any]]) -> None:
+    tmp = cache_dir / f"{DIGEST_MEMO}.tmp"
+    tmp.write_text(json.dumps(memo, indent=2), encoding="utf-8")
+    os.replace(tmp, cache_dir / DIGEST_MEMO)
+
+
+def entry_key(raw_path: Path, settings: Mapping[str, Any], memo: Optional[Dict] = None) -> str:
+    """Cache key covering the raw file content and the parse settings."""
+    hasher = hashlib.sha256()
+    hasher.update(file_digest(raw_path, memo).encode("ascii"))
+    hasher.update(json.dumps({"version": CACHE_VERSION, **settings}, sort_keys=True).encode("utf-8"))
+    return hasher.hexdigest()[:20]
+
+
+def _write_entry(entry_dir: Path, parsed: ParsedExport) -> None:
+    """Write ``parsed`` to ``entry_dir`` atomically (build in a temp dir, then rename)."""
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=entry_dir.parent, prefix=".tmp-"))
+    columns = []
+    try:
+        for index, name in enumerate(parsed.frame.columns):
+            series = parsed.frame[name]
+            if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+                np.save(tmp_dir / f"{index}.npy", series.to_numpy())
+                columns.append({"name": name, "kind": "array"})
+            else:
+                codes, categories = pd.factorize(series, use_na_sentinel=True)
+                np.save(tmp_dir / f"{index}.npy", codes.astype(np.int32))
+                columns.append({"name": name, "kind": "category", "categories": [str(c) for c in categories]})
+        for index, (name, mask) in enumerate(parsed.masked.items()):
+            np.save(tmp_dir / f"masked_{index}.npy", mask)
+        meta = {
+            "version": CACHE_VERSION,
+            "rows": len(parsed.frame),
+            "columns": columns,
+            "masked": list(parsed.masked),
+        }
+        (tmp_dir / META_NAME).write_text(json.dumps(meta), encoding="utf-8")
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Another process published the same entry first.
+            if not (entry_dir / META_NAME).exists():
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def _read_entry(entry_dir: Path, category_columns: Sequence[str]) -> ParsedExport:
+    meta = json.loads((entry_dir / META_NAME).read_text(encoding="utf-8"))
+    data = {}
+    for index, column in enumerate(meta["columns"]):
+        values = np.load(entry_dir / f"{index}.npy", mmap_mode="r")
+        if column["kind"] == "array":
+            data[column["name"]] = values
+            continue
+        categories = column["categories"]
+        if column["name"] in category_columns:
+            data[column["name"]] = pd.Categorical.from_codes(np.asarray(values), categories)
+        else:
+            labels = np.array(categories + [np.nan], dtype=object)
+            # Code -1 (missing) selects the trailing NaN.
+            data[column["name"]] = pd.Series(labels[values], dtype="str")
+    masked = {
+        name: np.load(entry_dir / f"masked_{index}.npy", mmap_mode="r")
+        for index, name in enumerate(meta["masked"])
+    }
+    return ParsedExport(pd.DataFrame(data), masked)
+
+
+def _namespace(raw_path: Path) -> str:
+    """Entry-name prefix of an export: its stem plus a digest of its directory."""
+    directory = str(raw_path.resolve().parent).encode("utf-8")
+    return f"{raw_path.stem}-{hashlib.sha256(directory).hexdigest()[:8]}"
+
+
+def _prune(cache_dir: Path, namespace: str, keep: str) -> None:
+    """Drop stale entries of the same export (same file name *and* directory)."""
+    for stale in cache_dir.glob(f"{namespace}-*"):
+        if stale.name != keep and stale.is_dir():
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def cached_read_export(
+    raw_path: Path,
+    cache_dir: Path,
+    skiprows: int = 0,
+    na_values: Sequence[str] = ("--",),
+    percent: Sequence[str] = (),
+    thresholds: Optional[Mapping[str, Mapping[str, float]]] = None,
+    string_columns: Sequence[str] = (),
+    numeric: Sequence[str] = (),
+    engine: str = "auto",
+    category_columns: Sequence[str] = (),
+) -> ParsedExport:
+    """
+    ``parsing.read_export`` backed by the memory-mapped cache in ``cache_dir``.
+
+    Text columns come back as strings, except ``category_columns`` which are
+    ``Categorical`` over the cached codes (no per-row string objects at all).
+    """
+    raw_path = Path(raw_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    thresholds = dict(thresholds or {})
+    settings = {
+        "skiprows": skiprows,
+        "na_values": list(na_values),
+        "percent": list(percent),
+        "thresholds": {name: dict(tokens) for name, tokens in thresholds.items()},
+        "string_columns": list(string_columns),
+        "numeric": list(numeric),
+    }
+    memo = _load_memo(cache_dir)
+    key = entry_key(raw_path, settings, memo)
+    _save_memo(cache_dir, memo)
+
+    # Exports with the same file name in different directories (data/raw vs
+    # data/benchmarks/scale_N) share a cache_dir without evicting each other.
+    namespace = _namespace(raw_path)
+    entry_name = f"{namespace}-{key}"
+    entry_dir = cache_dir / entry_name
+    if not (entry_dir / META_NAME).exists():
+        parsed = read_export(
+            raw_path,
+            skiprows=skiprows,
+            na_values=na_values,
+            percent=percent,
+            thresholds=thresholds,
+            string_columns=string_columns,
+            numeric=numeric,
+            engine=engine,
+        )
+        _write_entry(entry_dir, parsed)
+        _prune(cache_dir, namespace, entry_name)
+    return _read_entry(entry_dir, category_columns)
+
+
+def clear_cache(cache_dir: Path) -> None:
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+__all__ = [
+    "CACHE_VERSION",
+    "entry_key",
+    "cached_read_export",
+    "clear_cache",
+]
@@ -0,0 +1,300 @@
+"""
+Deduplicated reach from mergeable HyperLogLog sketches.
+
+Meta reports ``Reach`` per day, and adding days up counts a user once per day
+they saw an ad.  Each platform/campaign/day cell is therefore kept as a
+HyperLogLog sketch: ``2 ** precision`` one-byte registers holding the longest
+run of leading zeros seen among hashed user ids routed to that register.  The
+union of any set of cells is the element-wise maximum of their registers, so
+weekly or monthly reach per campaign or per platform is estimated from the
+daily sketches in constant memory (2 KB per cell at the default precision,
+about 2.3 % relative error).
+
+The exports carry no user ids.  ``sketch_user_ids`` builds the sketches from
+real exposure logs when they exist; until then ``AudienceModel`` stands in for
+them: every campaign draws its daily reach as a contiguous run of a campaign
+audience pool, placed at a random point of that pool each day, and pools of
+neighbouring campaigns share a configurable fraction of users.  A run covers
+each pool member with probability ``reach / pool``, independently per day, so
+expected unions are those of random daily audiences at a fraction of the cost.
+
+Counts are estimated with Ertl's improved raw estimator ("New cardinality
+estimation algorithms for HyperLogLog sketches", 2017), which needs neither
+bias tables nor a switch to linear counting for small sets.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import instrumented
+
+
+DEFAULT_PRECISION = 11
+CELL_KEYS = ("platform", "campaign_name", "date")
+PERIODS = ("day", "week", "month")
+ALL_CAMPAIGNS = "All campaigns"
+
+
+def _platform_salt(platform: str) -> np.uint64:
+    digest = hashlib.sha256(platform.encode("utf-8")).digest()
+    return np.frombuffer(digest[:8], dtype=np.uint64)[0]
+
+
+def hash_ids(ids: np.ndarray, salt: np.uint64 = np.uint64(0)) -> np.ndarray:
+    """64-bit hashes of user ids (integers or strings)."""
+    ids = np.asarray(ids)
+    if ids.dtype.kind in "iu":
+        return pd.util.hash_array(ids.astype(np.uint64) ^ salt)
+    return pd.util.hash_array(ids.astype(object))
+
+
+def register_ranks(hashes: np.ndarray, precision: int) -> tuple:
+    """Register index and rank (leading zeros + 1 of the remaining bits) per hash."""
+    index = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+    # A sentinel bit caps the rank at 65 - precision when the remaining bits are all zero.
+    remaining = (hashes << np.uint64(precision)) | np.uint64(1 << (precision - 1))
+    bit_length = np.frexp(remaining.astype(np.float64))[1]
+    rank = np.clip(65 - bit_length, 1, 65 - precision).astype(np.uint8)
+    return index, rank
+
+
+def _sigma(x: np.ndarray) -> np.ndarray:
+    # x + sum_k x^(2^k) 2^(k-1); callers exclude x == 1.
+    z, y, x = x.copy(), 1.0, x.copy()
+    for _ in range(64):
+        x = x * x
+        z = z + x * y
+        y += y
+    return z
+
+
+def _tau(x: np.ndarray) -> np.ndarray:
+    # (1 - x - sum_k (1 - x^(2^-k))^2 2^-k) / 3
+    z, y, x = 1 - x, 1.0, x.copy()
+    for _ in range(64):
+        x = np.sqrt(x)
+        y *= 0.5
+        z = z - (1 - x) ** 2 * y
+    return z / 3
+
+
+def estimate(registers: np.ndarray) -> np.ndarray:
+    """Distinct-count estimate per row of a ``cells × 2**precision`` register matrix."""
+    registers = np.atleast_2d(registers)
+    n_rows, m = registers.shape
+    q = 64 - int(np.log2(m))
+    rows = np.repeat(np.arange(n_rows), m)
+    histogram = np.bincount(rows * (q + 2) + registers.ravel(), minlength=n_rows * (q + 2))
+    histogram = histogram.reshape(n_rows, q + 2).astype(np.float64)
+
+    empty = histogram[:, 0] == m
+    zeros = np.where(empty, 0.0, histogram[:, 0] / m)
+    denominator = m * _sigma(zeros)
+    denominator += histogram[:, 1 : q + 1] @ np.exp2(-np.arange(1, q + 1))
+    denominator += m * _tau(1 - histogram[:, q + 1] / m) * 2.0 ** -q
+    alpha = 1 / (2 * np.log(2))
+    return np.where(empty, 0.0, alpha * m * m / np.where(empty, 1.0, denominator))
+
+
+def merge_registers(registers: np.ndarray, groups: np.ndarray) -> tuple:
+    """Union of the register rows sharing a group id: ``(group ids, registers)``."""
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    return sorted_groups[starts], np.maximum.reduceat(registers[order], starts, axis=0)
+
+
+@dataclass
+class ReachSketches:
+    """
+    Daily HyperLogLog sketches with the reported totals of each cell.
+
+    ``cells`` holds ``platform``, ``campaign_name``, ``date``, ``reach`` (the
+    platform's daily figure) and ``impressions``; row ``i`` of ``registers``
+    is the sketch of cell ``i``.
+    """
+
+    cells: pd.DataFrame
+    registers: np.ndarray
+    precision: int = DEFAULT_PRECISION
+
+    def rollup(self, by: Sequence[str] = ("platform", "campaign_name"), period: str = "week") -> pd.DataFrame:
+        """
+        Deduplicated reach per ``by`` group and ``period`` (``day``, ``week``
+        starting Monday, or ``month``).
+
+        ``reach_sum`` adds the daily figures; ``reach`` is the sketch estimate
+        of distinct users, and ``frequency`` is impressions per distinct user.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of {PERIODS}, got {period!r}")
+        dates = pd.to_datetime(self.cells["date"])
+        if period == "week":
+            start = dates - pd.to_timedelta(dates.dt.dayofweek, unit="D")
+        elif period == "month":
+            start = dates.dt.to_period("M").dt.start_time
+        else:
+            start = dates
+        keys = self.cells[list(by)].assign(period_start=start.dt.strftime("%Y-%m-%d"))
+        group_ids = keys.groupby(list(keys.columns), sort=True).ngroup().to_numpy()
+
+        ids, merged = merge_registers(self.registers, group_ids)
+        totals = (
+            self.cells[["reach", "impressions"]]
+            .assign(_group=group_ids, days=dates.dt.normalize())
+            .groupby("_group")
+            .agg(days=("days", "nunique"), impressions=("impressions", "sum"), reach_sum=("reach", "sum"))
+        )
+        result = keys.assign(_group=group_ids).drop_duplicates("_group").set_index("_group").loc[ids]
+        result = result.join(totals).reset_index(drop=True)
+        result.insert(len(by), "period", period)
+        result["reach"] = np.round(estimate(merged)).astype(np.int64)
+        result["frequency"] = result["impressions"] / result["reach"].where(result["reach"] > 0)
+        return result
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as handle:
+            np.savez_compressed(
+                handle,
+                precision=np.array(self.precision),
+                registers=self.registers,
+                **{column: self.cells[column].astype(str).to_numpy(dtype=str) for column in CELL_KEYS},
+                reach=self.cells["reach"].to_numpy(dtype=np.int64),
+                impressions=self.cells["impressions"].to_numpy(dtype=np.int64),
+            )
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "ReachSketches":
+        with np.load(path, allow_pickle=False) as data:
+            cells = pd.DataFrame(
+                {column: data[column] for column in (*CELL_KEYS, "reach", "impressions")}
+            )
+            return cls(cells=cells, registers=data["registers"], precision=int(data["precision"]))
+
+
+@dataclass(frozen=True)
+class AudienceModel:
+    """
+    Synthetic user ids for exports that only report daily reach.
+
+    Each campaign's audience pool holds ``pool_factor`` times its median daily
+    reach; consecutive campaigns of a platform share ``overlap`` of their pools.
+    Results depend only on ``seed`` and the cell values, not on row order.
+    """
+
+    pool_factor: float = 10.0
+    overlap: float = 0.25
+    seed: int = 42
+
+    @instrumented()
+    def sketch(self, cells: pd.DataFrame, precision: int = DEFAULT_PRECISION) -> ReachSketches:
+        cells = (
+            cells[[*CELL_KEYS, "reach", "impressions"]]
+            .dropna(subset=["reach"])
+            .sort_values(list(CELL_KEYS))
+            .reset_index(drop=True)
+        )
+        m = 1 << precision
+        registers = np.zeros(len(cells) * m, dtype=np.uint8)
+
+        for platform, platform_cells in cells.groupby("platform", sort=True):
+            salt = _platform_salt(str(platform))
+            campaigns = platform_cells.groupby("campaign_name", sort=True)
+            pools = {
+                name: max(1, int(np.ceil(self.pool_factor * group["reach"].median())))
+                for name, group in campaigns
+            }
+            strides = {name: max(1, int(pool * (1 - self.overlap))) for name, pool in pools.items()}
+            universe = sum(strides.values())
+            offset = 0
+            for name, group in campaigns:
+                pool = pools[name]
+                users = (offset + np.arange(pool, dtype=np.uint64)) % np.uint64(max(universe, pool))
+                index, rank = register_ranks(hash_ids(users, salt), precision)
+                offset += strides[name]
+
+                key = zlib.crc32(f"{platform}/{name}".encode("utf-8"))
+                rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(key,)))
+                reach = np.minimum(group["reach"].to_numpy(dtype=np.int64), pool)
+                starts = rng.integers(0, pool, size=len(group))
+                cell_of = np.repeat(group.index.to_numpy(), reach)
+                within_day = np.arange(reach.sum()) - np.repeat(np.cumsum(reach) - reach, reach)
+                positions = (np.repeat(starts, reach) + within_day) % pool
+                np.maximum.at(registers, cell_of * m + index[positions], rank[positions])
+
+        return ReachSketches(cells=cells, registers=registers.reshape(len(cells), m), precision=precision)
+
+
+@instrumented()
+def sketch_user_ids(
+    events: pd.DataFrame,
+    id_column: str = "user_id",
+    precision: int = DEFAULT_PRECISION,
+) -> ReachSketches:
+    """
+    Sketches from exposure logs with one row per impression and a user id column.
+
+    ``reach`` is the exact daily distinct count and ``impressions`` the row count.
+    """
+    events = events.assign(date=pd.to_datetime(events["date"]).dt.strftime("%Y-%m-%d"))
+    keys = list(CELL_KEYS)
+    cells = (
+        events.groupby(keys, sort=True)
+        .agg(reach=(id_column, "nunique"), impressions=(id_column, "size"))
+        .reset_index()
+    )
+    cell_ids = events.groupby(keys, sort=True).ngroup().to_numpy()
+    m = 1 << precision
+    registers = np.zeros(len(cells) * m, dtype=np.uint8)
+    for platform in events["platform"].unique():
+        rows = (events["platform"] == platform).to_numpy()
+        hashes = hash_ids(events.loc[rows, id_column].to_numpy(), _platform_salt(str(platform)))
+        index, rank = register_ranks(hashes, precision)
+        np.maximum.at(registers, cell_ids[rows] * m + index, rank)
+    return ReachSketches(cells=cells, registers=registers.reshape(len(cells), m), precision=precision)
+
+
+@instrumented()
+def reach_rollup(sketches: ReachSketches, periods: Sequence[str] = ("week", "month")) -> pd.DataFrame:
+    """
+    Campaign and platform-total reach per period as one long table for Power BI.
+
+    Platform totals carry ``campaign_name == ALL_CAMPAIGNS``; their ``reach``
+    removes users reached by several campaigns, so it is not the sum of the
+    campaign rows.
+    """
+    tables = []
+    for period in periods:
+        tables.append(sketches.rollup(("platform", "campaign_name"), period))
+        totals = sketches.rollup(("platform",), period)
+        totals.insert(1, "campaign_name", ALL_CAMPAIGNS)
+        tables.append(totals)
+    return pd.concat(tables, ignore_index=True)
+
+
+__all__ = [
+    "DEFAULT_PRECISION",
+    "ALL_CAMPAIGNS",
+    "hash_ids",
+    "register_ranks",
+    "estimate",
+    "merge_registers",
+    "ReachSketches",
+    "AudienceModel",
+    "sketch_user_ids",
+    "reach_rollup",
+]
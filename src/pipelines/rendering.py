@@ -0,0 +1,223 @@
+"""
+Figure rendering layer.
+
+Rendering used to dominate the Week 3 wall time: every call rebuilt its
+matplotlib figure, re-applied the seaborn theme and wrote a 300 DPI PNG even
+when nothing had changed.  This module keeps one figure per template and
+process, renders at a configurable DPI or as SVG, skips figures whose input
+digest matches the previous render, and can spread independent render jobs over
+worker processes running the Agg backend.
+
+matplotlib and seaborn are imported on first render so that importing the
+pipelines package stays cheap for jobs that never draw a figure.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+# Bump whenever a drawing routine changes so cached figures are re-rendered.
+TEMPLATE_VERSION = 1
+
+BASE_RC = {
+    "font.sans-serif": ["DejaVu Sans"],
+    "axes.unicode_minus": False,
+}
+
+SUPPORTED_FORMATS = ("png", "svg", "pdf")
+
+# One key file per figure, so concurrent renders into the same directory never
+# rewrite each other's entries.
+MANIFEST_DIR = ".render_cache"
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class RenderConfig:
+    """Output settings shared by every figure of a run."""
+
+    fmt: str = "png"
+    dpi: int = 300
+    skip_unchanged: bool = True
+
+    def __post_init__(self) -> None:
+        if self.fmt not in SUPPORTED_FORMATS:
+            raise ValueError(
+                f"Unsupported figure format {self.fmt!r}; expected one of {SUPPORTED_FORMATS}"
+            )
+        if self.dpi <= 0:
+            raise ValueError("dpi must be positive")
+
+
+@dataclass(frozen=True)
+class FigureTemplate:
+    """Layout of a reusable figure: size, subplot grid and seaborn axes style."""
+
+    name: str
+    figsize: Tuple[float, float]
+    nrows: int = 1
+    ncols: int = 1
+    style: Optional[str] = None
+    rc: Dict[str, object] = field(default_factory=dict, compare=False, hash=False)
+
+    def rc_params(self) -> Dict[str, object]:
+        params: Dict[str, object] = {}
+        if self.style is not None:
+            import seaborn as sns
+
+            params.update(sns.axes_style(self.style))
+        params.update(BASE_RC)
+        params.update(self.rc)
+        return params
+
+
+# One (figure, axes) pair per template and process.
+_FIGURES: Dict[str, Tuple[Figure, np.ndarray]] = {}
+
+
+def _acquire_figure(template: FigureTemplate) -> Tuple[Figure, np.ndarray]:
+    """Return the cached figure for ``template`` with all axes cleared."""
+    cached = _FIGURES.get(template.name)
+    if cached is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=template.figsize)
+        FigureCanvasAgg(fig)
+        axes = fig.subplots(template.nrows, template.ncols, squeeze=False)
+        _FIGURES[template.name] = (fig, axes)
+        return fig, axes
+
+    fig, axes = cached
+    for ax in axes.flat:
+        ax.clear()
+    return fig, axes
+
+
+def clear_figure_cache() -> None:
+    """Drop every cached template figure (frees memory in long-lived processes)."""
+    _FIGURES.clear()
+
+
+def _render_key(template: FigureTemplate, data_hash: str, config: RenderConfig) -> str:
+    payload = json.dumps(
+        {
+            "template": template.name,
+            "version": TEMPLATE_VERSION,
+            "data": data_hash,
+            "fmt": config.fmt,
+            "dpi": config.dpi,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _manifest_path(output_path: Path) -> Path:
+    return output_path.parent / MANIFEST_DIR / f"{output_path.name}.key"
+
+
+def _read_render_key(output_path: Path) -> Optional[str]:
+    try:
+        return _manifest_path(output_path).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def _write_render_key(output_path: Path, key: str) -> None:
+    path = _manifest_path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(key, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def render_figure(
+    template: FigureTemplate,
+    draw: Callable[[Figure, np.ndarray], None],
+    output_stem: Path,
+    data_hash: str,
+    config: Optional[RenderConfig] = None,
+) -> Path:
+    """
+    Draw ``template`` with ``draw`` and save it next to ``output_stem``.
+
+    Parameters
+    ----------
+    template
+        Figure layout; the underlying matplotlib figure is reused across calls.
+    draw
+        Callback receiving the figure and a 2-D array of axes.
+    output_stem
+        Output path without extension; the suffix follows ``config.fmt``.
+    data_hash
+        Digest of everything the figure depends on.  When it matches the
+        previous render and the file still exists, rendering is skipped.
+    config
+        Output settings, defaults to ``RenderConfig()``.
+    """
+    config = config or RenderConfig()
+    output_path = output_stem.with_suffix(f".{config.fmt}")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    key = _render_key(template, data_hash, config)
+    if config.skip_unchanged and output_path.exists() and _read_render_key(output_path) == key:
+        return output_path
+
+    import matplotlib
+
+    with matplotlib.rc_context(template.rc_params()):
+        fig, axes = _acquire_figure(template)
+        draw(fig, axes)
+        fig.tight_layout()
+        fig.savefig(output_path, dpi=config.dpi, format=config.fmt)
+
+    _write_render_key(output_path, key)
+    return output_path
+
+
+def _init_render_worker() -> None:
+    """Pin worker processes to the non-interactive Agg backend."""
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+
+
+def run_render_jobs(
+    job: Callable[[T], R],
+    items: Sequence[T],
+    max_workers: Optional[int] = None,
+) -> List[R]:
+    """
+    Apply ``job`` to every item, in worker processes when more than one is given.
+
+    ``job`` must be a module-level function so it can be pickled.  Results keep
+    the order of ``items``.
+    """
+    if max_workers == 1 or len(items) <= 1:
+        return [job(item) for item in items]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker) as pool:
+        return list(pool.map(job, items))
+
+
+__all__ = [
+    "RenderConfig",
+    "FigureTemplate",
+    "render_figure",
+    "clear_figure_cache",
+    "run_render_jobs",
+]
@@ -0,0 +1,665 @@
+"""
+Shardable generator for the synthetic Meta / Google / TikTok raw exports.
+
+The generator is organised in *blocks*: one campaign (TikTok: ad group), one
+copy of it and one calendar year.  Every block draws from its own stream,
+``SeedSequence(seed, spawn_key=(platform, template, copy, year))``, and always
+simulates the whole calendar year before rows outside the campaign's flight
+or the requested dates are dropped.  A row therefore depends only on the seed
+and its (campaign, copy, date) — never on which other rows are generated — so
+a run can be split into ``Shard`` s by campaign subset or date range, shards
+can run in any process, and the result equals a serial run.
+
+Within a block all days are drawn as arrays; the export quirks of the
+original script are kept: "--" placeholders, Meta's weekend dip and
+re-exported duplicate rows, Google's "< 10" privacy masking, budget
+exhaustion and reporting delay, TikTok's learning status, zero-cost days and
+missing conversions.  Campaign copies (``SyntheticConfig.copies``) and longer
+date ranges scale the fixture to tens of millions of rows; each shard is
+streamed to disk in chunks, so memory stays bounded by ``CHUNK_ROWS``.
+
+Files are written in the layouts the cleaners expect: one
+``<platform>_ads_raw.csv`` per platform (``layout="file"``), or one
+self-contained part file per shard under ``<platform>_ads_raw/``
+(``layout="parts"``).
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .marketing_calendar import promo_events_for
+
+
+PLATFORMS = ("meta", "google", "tiktok")
+
+RAW_FILES = {
+    "meta": "meta_ads_raw.csv",
+    "google": "google_ads_raw.csv",
+    "tiktok": "tiktok_ads_raw.csv",
+}
+
+SEED = 42
+CHUNK_ROWS = 250_000
+LAYOUTS = ("file", "parts")
+SHARD_BY = ("campaign", "date")
+
+# Average order value behind the conversion values (USD).
+ORDER_VALUE = 85
+# Share of Meta rows exported twice (about 30 per year for the 12 campaigns).
+META_DUPLICATE_RATE = 0.0087
+
+# Monthly pacing, based on typical spend seasonality.
+MONTH_SPEND_MULTIPLIER = np.array([0.95, 1.05, 1.00, 0.95, 1.00, 0.93, 0.92, 1.05, 1.08, 1.15, 1.35, 1.40])
+MONTH_CTR_MULTIPLIER = np.array([0.98, 1.05, 1.00, 0.97, 1.01, 0.95, 0.94, 1.04, 1.06, 1.08, 1.12, 1.15])
+MONTH_CVR_MULTIPLIER = np.array([0.96, 1.10, 1.00, 0.97, 1.02, 0.93, 0.92, 1.03, 1.05, 1.08, 1.20, 1.22])
+
+# Campaign templates.  ``start_date`` is absolute: years after it run all year.
+META_CAMPAIGNS: Tuple[Dict, ...] = (
+    {"name": "Always_On_Prospecting", "budget": 360, "ctr": 0.026, "cvr": 0.020, "has_conversion": True, "start_date": "2024-01-01"},
+    {"name": "Prospecting_Lookalike_A", "budget": 410, "ctr": 0.030, "cvr": 0.023, "has_conversion": True, "start_date": "2024-01-01"},
+    {"name": "Retargeting_Core", "budget": 320, "ctr": 0.048, "cvr": 0.055, "has_conversion": True, "start_date": "2024-01-01"},
+    {"name": "Brand_Awareness_Q1", "budget": 250, "ctr": 0.012, "cvr": 0.004, "has_conversion": False, "start_date": "2024-01-01"},
+    {"name": "Spring_Promo_Video", "budget": 380, "ctr": 0.034, "cvr": 0.026, "has_conversion": True, "start_date": "2024-03-01"},
+    {"name": "Summer_Collections", "budget": 300, "ctr": 0.029, "cvr": 0.020, "has_conversion": True, "start_date": "2024-06-01"},
+    {"name": "Back_to_School_Push", "budget": 420, "ctr": 0.036, "cvr": 0.027, "has_conversion": True, "start_date": "2024-08-01"},
+    {"name": "Holiday_Peak_Sales", "budget": 620, "ctr": 0.045, "cvr": 0.038, "has_conversion": True, "start_date": "2024-11-01"},
+    {"name": "Creative_Test_Variant_A", "budget": 160, "ctr": 0.028, "cvr": 0.021, "has_conversion": True, "start_date": "2024-02-20"},
+    {"name": "Creative_Test_Variant_B", "budget": 160, "ctr": 0.032, "cvr": 0.024, "has_conversion": True, "start_date": "2024-02-20"},
+    {"name": "Weekend_Flash_Sale", "budget": 200, "ctr": 0.040, "cvr": 0.030, "has_conversion": True, "start_date": "2024-01-01", "pause_weekend": True},
+    {"name": "Email_List_Retargeting", "budget": 290, "ctr": 0.050, "cvr": 0.058, "has_conversion": True, "start_date": "2024-01-01"},
+)
+
+GOOGLE_CAMPAIGNS: Tuple[Dict, ...] = (
+    {"name": "Search_Brand_Exact", "id": "1234567890", "budget": 370, "ctr": 0.155, "cvr": 0.090, "start_date": "2024-01-01"},
+    {"name": "Search_Generic_Broad", "id": "1234567891", "budget": 420, "ctr": 0.032, "cvr": 0.019, "start_date": "2024-01-01"},
+    {"name": "Display_Retargeting", "id": "1234567892", "budget": 260, "ctr": 0.009, "cvr": 0.034, "start_date": "2024-01-01"},
+    {"name": "Shopping_Product_Feed", "id": "1234567893", "budget": 480, "ctr": 0.047, "cvr": 0.030, "start_date": "2024-01-01"},
+    {"name": "Video_YouTube_Awareness", "id": "1234567894", "budget": 320, "ctr": 0.016, "cvr": 0.008, "start_date": "2024-01-01"},
+    {"name": "Search_Competitor_Keywords", "id": "1234567895", "budget": 340, "ctr": 0.029, "cvr": 0.016, "start_date": "2024-01-01"},
+    {"name": "Display_Lookalike", "id": "1234567896", "budget": 290, "ctr": 0.013, "cvr": 0.023, "start_date": "2024-01-15"},
+    {"name": "Search_Long_Tail", "id": "1234567897", "budget": 240, "ctr": 0.039, "cvr": 0.026, "start_date": "2024-01-01"},
+    {"name": "RLSA_Past_Visitors", "id": "1234567898", "budget": 280, "ctr": 0.053, "cvr": 0.044, "start_date": "2024-01-01"},
+    {"name": "Smart_Shopping", "id": "1234567899", "budget": 400, "ctr": 0.042, "cvr": 0.032, "start_date": "2024-01-25"},
+    {"name": "Holiday_Gift_Search", "id": "1234567800", "budget": 520, "ctr": 0.050, "cvr": 0.040, "start_date": "2024-10-01"},
+)
+
+TIKTOK_ADGROUPS: Tuple[Dict, ...] = (
+    {"campaign": "New_Year_Sale", "ad_group": "Lookalike_Audience_1", "budget": 320, "ctr": 0.032, "cvr": 0.028, "start_date": "2024-01-01"},
+    {"campaign": "New_Year_Sale", "ad_group": "Interest_Fashion", "budget": 300, "ctr": 0.030, "cvr": 0.027, "start_date": "2024-01-01"},
+    {"campaign": "Spring_Collections", "ad_group": "Broad_Interest_Apparel", "budget": 280, "ctr": 0.029, "cvr": 0.024, "start_date": "2024-03-01"},
+    {"campaign": "Summer_Vibes", "ad_group": "Spark_Addicts", "budget": 260, "ctr": 0.027, "cvr": 0.022, "start_date": "2024-06-01"},
+    {"campaign": "Back_to_School", "ad_group": "Student_Device", "budget": 310, "ctr": 0.031, "cvr": 0.026, "start_date": "2024-08-01"},
+    {"campaign": "Holiday_Mega_Sale", "ad_group": "Gift_Shoppers", "budget": 380, "ctr": 0.037, "cvr": 0.032, "start_date": "2024-11-01"},
+    {"campaign": "Creative_Test_Video", "ad_group": "UGC_Creator_A", "budget": 200, "ctr": 0.028, "cvr": 0.021, "start_date": "2024-02-15"},
+    {"campaign": "Creative_Test_Video", "ad_group": "UGC_Creator_B", "budget": 200, "ctr": 0.030, "cvr": 0.022, "start_date": "2024-02-15"},
+)
+
+# Column arrays, the rows to keep, and Meta's (duplicate flags, purchase drift).
+Block = Tuple[Dict[str, np.ndarray], np.ndarray, Optional[Tuple[np.ndarray, np.ndarray]]]
+
+TEMPLATES: Dict[str, Tuple[Dict, ...]] = {
+    "meta": META_CAMPAIGNS,
+    "google": GOOGLE_CAMPAIGNS,
+    "tiktok": TIKTOK_ADGROUPS,
+}
+
+COLUMNS: Dict[str, List[str]] = {
+    "meta": [
+        "Reporting starts",
+        "Reporting ends",
+        "Campaign name",
+        "Amount spent (USD)",
+        "Impressions",
+        "Link clicks",
+        "Purchases",
+        "Cost per purchase (USD)",
+        "Purchase conversion value (USD)",
+        "Reach",
+    ],
+    "google": [
+        "Day",
+        "Campaign",
+        "Campaign ID",
+        "Impr.",
+        "Clicks",
+        "Cost",
+        "Conversions",
+        "Conv. rate",
+        "Cost / conv.",
+        "Conv. value",
+    ],
+    "tiktok": [
+        "Date",
+        "Campaign Name",
+        "Ad Group Name",
+        "Cost",
+        "Impressions",
+        "Clicks",
+        "Conversions",
+        "CPA",
+        "CTR",
+        "CVR",
+        "Video Views",
+        "Video Play Actions",
+        "Learning Status",
+    ],
+}
+
+# Count columns that may hold "--"; kept as floats with NaN until written.
+NULLABLE_COUNTS = {
+    "meta": ("Purchases", "Purchase conversion value (USD)"),
+    "google": (),
+    "tiktok": ("Conversions",),
+}
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """What to generate: a date range, campaign copies and the root seed."""
+
+    start: str = "2024-01-01"
+    end: str = "2024-12-31"
+    copies: int = 1
+    seed: int = SEED
+
+    def __post_init__(self) -> None:
+        if self.copies < 1:
+            raise ValueError("copies must be >= 1")
+        if pd.Timestamp(self.start) > pd.Timestamp(self.end):
+            raise ValueError(f"start {self.start} is after end {self.end}")
+
+
+@dataclass(frozen=True)
+class Entity:
+    """One campaign (TikTok: ad group) copy, identified by template and copy index."""
+
+    platform: str
+    template: int
+    copy: int
+
+    @property
+    def spec(self) -> Mapping:
+        return TEMPLATES[self.platform][self.template]
+
+    @property
+    def name(self) -> str:
+        """Export name; copies other than 0 get an ``_rNNNN`` suffix."""
+        key = "ad_group" if self.platform == "tiktok" else "name"
+        suffix = "" if self.copy == 0 else f"_r{self.copy:04d}"
+        return self.spec[key] + suffix
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    A unit of generation: one platform, optionally restricted to some
+    campaigns (``Entity.name``; TikTok: ad group names) and/or dates.
+    """
+
+    platform: str
+    campaigns: Optional[Tuple[str, ...]] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.platform not in PLATFORMS:
+            raise ValueError(f"platform must be one of {PLATFORMS}, got {self.platform!r}")
+
+
+def entities(platform: str, copies: int = 1) -> List[Entity]:
+    """Entities in export order: copy-major, templates in declaration order."""
+    return [Entity(platform, template, copy) for copy in range(copies) for template in range(len(TEMPLATES[platform]))]
+
+
+@lru_cache(maxsize=None)
+def _calendar(year: int) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Days of ``year`` with their date strings and spend/CTR/CVR multipliers."""
+    days = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+    month = days.month.to_numpy() - 1
+    spend = MONTH_SPEND_MULTIPLIER[month].copy()
+    ctr = MONTH_CTR_MULTIPLIER[month].copy()
+    cvr = MONTH_CVR_MULTIPLIER[month].copy()
+    # Promo windows follow the US calendar (identical to the 2024 events).
+    for event in promo_events_for("US", [year]).itertuples():
+        inside = (days >= event.start) & (days <= event.end)
+        spend[inside] *= event.spend
+        ctr[inside] *= event.ctr
+        cvr[inside] *= event.cvr
+    labels = days.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    return days, labels, spend, ctr, cvr
+
+
+def _trunc(values: np.ndarray) -> np.ndarray:
+    """``int()`` semantics (truncate toward zero) for float arrays."""
+    return np.trunc(values).astype(np.int64)
+
+
+def _percent(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.char.mod("%.2f%%", np.where(denominator > 0, numerator / denominator * 100, 0.0))
+
+
+def _meta_block(entity: Entity, year: int, rng: np.random.Generator) -> Block:
+    spec = entity.spec
+    days, labels, spend_mult, ctr_mult, cvr_mult = _calendar(year)
+    n = len(days)
+    budget, base = spec["budget"], spec["budget"] * 55
+
+    impressions = np.maximum(150, _trunc(rng.normal(base * spend_mult, base * 0.18)))
+    ctr = np.maximum(0.001, rng.normal(spec["ctr"] * ctr_mult, spec["ctr"] * 0.22))
+    clicks = _trunc(impressions * ctr)
+    spend = np.round(np.maximum(15, rng.normal(budget * spend_mult, budget * 0.18)), 2)
+    cvr = np.maximum(0.001, rng.normal(spec["cvr"] * cvr_mult, spec["cvr"] * 0.28))
+    conversions = _trunc(clicks * cvr)
+    reach_share = rng.uniform(0.68, 0.82, n)
+    duplicated = rng.random(n) < META_DUPLICATE_RATE
+    adjustment = rng.integers(-2, 4, n)
+
+    # Weekends run about 15% cooler.
+    weekend = np.asarray(days.weekday >= 5)
+    impressions = np.where(weekend, _trunc(impressions * 0.85), impressions)
+    clicks = np.where(weekend, _trunc(clicks * 0.85), clicks)
+    spend = np.where(weekend, np.round(spend * 0.88, 2), spend)
+    reach = _trunc(impressions * reach_share)
+
+    if spec["has_conversion"]:
+        scaled = np.where(weekend & (conversions > 0), _trunc(conversions * 0.88), conversions)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cpa = np.where(scaled > 0, np.round(spend / scaled, 2), np.nan)
+        # A weekend day scaled down to zero purchases still reports spend / 1.
+        cpa = np.where(weekend & (conversions > 0) & (scaled == 0), spend, cpa)
+        purchases = scaled.astype(np.float64)
+        value = purchases * ORDER_VALUE
+    else:
+        purchases = value = cpa = np.full(n, np.nan)
+
+    keep = days >= pd.Timestamp(spec["start_date"])
+    if spec.get("pause_weekend", False):
+        keep &= ~weekend
+    columns = {
+        "Reporting starts": labels,
+        "Reporting ends": labels,
+        "Campaign name": np.full(n, entity.name, dtype=object),
+        "Amount spent (USD)": spend,
+        "Impressions": impressions,
+        "Link clicks": clicks,
+        "Purchases": purchases,
+        "Cost per purchase (USD)": cpa,
+        "Purchase conversion value (USD)": value,
+        "Reach": reach,
+    }
+    return columns, keep, (duplicated, adjustment)
+
+
+def _meta_duplicates(columns: Dict[str, np.ndarray], rows: np.ndarray, adjustment: np.ndarray) -> Dict[str, np.ndarray]:
+    """Re-exported copies of ``rows`` whose purchases drifted by ``adjustment``."""
+    duplicates = {name: values[rows] for name, values in columns.items()}
+    purchases = duplicates["Purchases"]
+    adjusted = (purchases > 0) & ~np.isnan(purchases)
+    updated = np.where(adjusted, np.maximum(0, purchases + adjustment[rows]), purchases)
+    repriced = adjusted & (updated > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        duplicates["Cost per purchase (USD)"] = np.where(
+            repriced, np.round(duplicates["Amount spent (USD)"] / updated, 2), duplicates["Cost per purchase (USD)"]
+        )
+    duplicates["Purchase conversion value (USD)"] = np.where(
+        repriced, updated * ORDER_VALUE, duplicates["Purchase conversion value (USD)"]
+    )
+    duplicates["Purchases"] = updated
+    return duplicates
+
+
+def _google_block(entity: Entity, year: int, rng: np.random.Generator) -> Block:
+    spec = entity.spec
+    days, labels, spend_mult, ctr_mult, cvr_mult = _calendar(year)
+    n = len(days)
+    budget = spec["budget"]
+
+    impressions = np.maximum(120, _trunc(rng.normal(budget * 48 * spend_mult, budget * 9)))
+    ctr = np.maximum(0.001, rng.normal(spec["ctr"] * ctr_mult, spec["ctr"] * 0.20))
+    clicks = _trunc(impressions * ctr)
+    cost = np.round(np.maximum(12, rng.normal(budget * spend_mult, budget * 0.18)), 2)
+    cvr = np.maximum(0.001, rng.normal(spec["cvr"] * cvr_mult, spec["cvr"] * 0.24))
+    privacy_draw, exhausted_draw, delay_draw = rng.random((3, n))
+
+    raw_conversions = clicks * cvr
+    conversions = _trunc(raw_conversions)
+    conv_rate = _percent(conversions, clicks)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cost_per_conv = np.where(conversions > 0, np.round(cost / conversions, 2), np.nan)
+
+    # Google's privacy threshold: small conversion counts may show as "< 10".
+    private = (raw_conversions < 10) & (privacy_draw < 0.35)
+    # Reporting delay: about 2% of rows show conversions as "--".
+    delayed = delay_draw < 0.02
+    hidden = private | delayed
+    converted = conversions > 0
+
+    conversions_display = np.where(private, "< 10", conversions.astype(str))
+    conversions_display = np.where(delayed, "--", conversions_display).astype(object)
+    conv_rate_display = np.where(hidden, "--", conv_rate).astype(object)
+    cost_per_conv_display = np.where(hidden | ~converted, "--", cost_per_conv.astype(str)).astype(object)
+    value_display = np.where(hidden | ~converted, "--", (conversions * ORDER_VALUE).astype(str)).astype(object)
+
+    # Budget exhausted mid-day: delivery drops for the rest of the day.
+    exhausted = exhausted_draw < 0.06
+    impressions = np.where(exhausted, _trunc(impressions * 0.6), impressions)
+    clicks = np.where(exhausted, _trunc(clicks * 0.6), clicks)
+
+    copy_id = str(int(spec["id"]) + entity.copy * 1000)
+    columns = {
+        "Day": labels,
+        "Campaign": np.full(n, entity.name, dtype=object),
+        "Campaign ID": np.full(n, copy_id, dtype=object),
+        "Impr.": impressions,
+        "Clicks": clicks,
+        "Cost": cost,
+        "Conversions": conversions_display,
+        "Conv. rate": conv_rate_display,
+        "Cost / conv.": cost_per_conv_display,
+        "Conv. value": value_display,
+    }
+    return columns, days >= pd.Timestamp(spec["start_date"]), None
+
+
+def _tiktok_block(entity: Entity, year: int, rng: np.random.Generator) -> Block:
+    spec = entity.spec
+    days, labels, spend_mult, ctr_mult, cvr_mult = _calendar(year)
+    n = len(days)
+    budget = spec["budget"]
+    start = pd.Timestamp(spec["start_date"])
+
+    cost = np.round(np.maximum(6, rng.normal(budget * spend_mult, budget * 0.22)), 2)
+    impressions = np.maximum(90, _trunc(rng.normal(budget * 62 * spend_mult, budget * 14)))
+    ctr = np.maximum(0.001, rng.normal(spec["ctr"] * ctr_mult, spec["ctr"] * 0.22))
+    clicks = _trunc(impressions * ctr)
+    cvr = np.maximum(0.001, rng.normal(spec["cvr"] * cvr_mult, spec["cvr"] * 0.26))
+    conversions = np.maximum(0, _trunc(clicks * cvr))
+    learning_draw, limited_draw, zero_cost_draw, missing_draw = rng.random((4, n))
+    video_views = _trunc(impressions * rng.uniform(0.45, 0.72, n))
+    video_actions = _trunc(video_views * rng.uniform(0.65, 0.9, n))
+
+    days_active = ((days - start).days).to_numpy()
+    learning = (days_active < 5) | (learning_draw < 0.07)
+    status = np.where(learning, "Learning", np.where(limited_draw < 0.05, "Limited", "Active")).astype(object)
+    cost = np.where(zero_cost_draw < 0.05, 0.0, cost)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cpa = np.where(conversions > 0, np.round(cost / conversions, 2), np.nan)
+    # Some zero-conversion rows are exported as "--".
+    missing = (conversions == 0) & (missing_draw < 0.05)
+    columns = {
+        "Date": labels,
+        "Campaign Name": np.full(n, spec["campaign"], dtype=object),
+        "Ad Group Name": np.full(n, entity.name, dtype=object),
+        "Cost": cost,
+        "Impressions": impressions,
+        "Clicks": clicks,
+        "Conversions": np.where(missing, np.nan, conversions.astype(np.float64)),
+        "CPA": np.where(missing, np.nan, cpa),
+        "CTR": _percent(clicks, impressions).astype(object),
+        "CVR": _percent(conversions, clicks).astype(object),
+        "Video Views": video_views,
+        "Video Play Actions": video_actions,
+        "Learning Status": status,
+    }
+    return columns, days >= start, None
+
+
+BLOCKS = {"meta": _meta_block, "google": _google_block, "tiktok": _tiktok_block}
+
+
+def block_rows(
+    entity: Entity, year: int, seed: int = SEED, start: Optional[str] = None, end: Optional[str] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Rows of one entity in one calendar year, restricted to ``[start, end]``.
+
+    The whole year is always simulated from the block's own stream, so the
+    restriction never changes the values of the rows that remain.
+    """
+    stream = np.random.SeedSequence(seed, spawn_key=(PLATFORMS.index(entity.platform), entity.template, entity.copy, year))
+    columns, keep, extra = BLOCKS[entity.platform](entity, year, np.random.default_rng(stream))
+    days = _calendar(year)[0]
+    if start is not None:
+        keep = keep & (days >= pd.Timestamp(start))
+    if end is not None:
+        keep = keep & (days <= pd.Timestamp(end))
+
+    rows = {name: values[keep] for name, values in columns.items()}
+    if extra is not None:
+        duplicated, adjustment = extra
+        duplicates = _meta_duplicates(columns, keep & duplicated, adjustment)
+        rows = {name: np.concatenate([rows[name], duplicates[name]]) for name in rows}
+    return rows
+
+
+def _frame(platform: str, blocks: Sequence[Dict[str, np.ndarray]]) -> pd.DataFrame:
+    frame = pd.DataFrame({name: np.concatenate([block[name] for block in blocks]) for name in COLUMNS[platform]})
+    for name in NULLABLE_COUNTS[platform]:
+        frame[name] = frame[name].astype("Int64")
+    return frame
+
+
+def _clip_range(config: SyntheticConfig, shard: Shard) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    start = max(pd.Timestamp(config.start), pd.Timestamp(shard.start or config.start))
+    end = min(pd.Timestamp(config.end), pd.Timestamp(shard.end or config.end))
+    return start, end
+
+
+def shard_chunks(config: SyntheticConfig, shard: Shard, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Rows of ``shard`` in export order, as frames of about ``chunk_rows`` rows."""
+    start, end = _clip_range(config, shard)
+    selected = entities(shard.platform, config.copies)
+    if shard.campaigns is not None:
+        wanted = set(shard.campaigns)
+        selected = [entity for entity in selected if entity.name in wanted]
+
+    pending: List[Dict[str, np.ndarray]] = []
+    pending_rows = 0
+    for entity in selected:
+        for year in range(start.year, end.year + 1):
+            rows = block_rows(entity, year, config.seed, start, end)
+            pending.append(rows)
+            pending_rows += len(next(iter(rows.values())))
+            if pending_rows >= chunk_rows:
+                yield _frame(shard.platform, pending)
+                pending, pending_rows = [], 0
+    if pending_rows:
+        yield _frame(shard.platform, pending)
+
+
+def file_header(platform: str, config: SyntheticConfig) -> str:
+    """Everything above the first data row: Google's report preamble and the column names."""
+    preamble = ""
+    if platform == "google":
+        preamble = f"Campaign performance report\nDownloaded: {pd.Timestamp(config.end):%Y-%m-%d} 23:59:59 PST\n\n"
+    return preamble + ",".join(COLUMNS[platform]) + "\n"
+
+
+def write_shard(config: SyntheticConfig, shard: Shard, handle: TextIO, chunk_rows: int = CHUNK_ROWS) -> int:
+    """Stream the data rows of ``shard`` (no header) to ``handle``; returns the row count."""
+    rows = 0
+    for chunk in shard_chunks(config, shard, chunk_rows):
+        chunk.to_csv(handle, index=False, header=False, na_rep="--")
+        rows += len(chunk)
+    return rows
+
+
+def _write_part(config: SyntheticConfig, shard: Shard, path: str, header: str) -> int:
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        handle.write(header)
+        return write_shard(config, shard, handle)
+
+
+def _split(items: Sequence, parts: int) -> List[Sequence]:
+    bounds = np.linspace(0, len(items), min(parts, len(items)) + 1).round().astype(int)
+    return [items[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def plan_shards(
+    config: SyntheticConfig,
+    platforms: Sequence[str] = PLATFORMS,
+    shards_per_platform: int = 1,
+    by: str = "campaign",
+) -> List[Shard]:
+    """
+    Contiguous shards per platform, split by campaign or by date range.
+
+    Campaign shards concatenate to exactly the unsharded export; date shards
+    hold the same rows ordered by date window first, so ``generate`` only
+    accepts them with ``layout="parts"``.
+    """
+    if by not in SHARD_BY:
+        raise ValueError(f"by must be one of {SHARD_BY}, got {by!r}")
+    shards = []
+    for platform in platforms:
+        if shards_per_platform <= 1:
+            shards.append(Shard(platform))
+        elif by == "campaign":
+            names = [entity.name for entity in entities(platform, config.copies)]
+            shards.extend(Shard(platform, campaigns=tuple(part)) for part in _split(names, shards_per_platform))
+        else:
+            days = pd.date_range(config.start, config.end, freq="D")
+            shards.extend(
+                Shard(platform, start=f"{part[0]:%Y-%m-%d}", end=f"{part[-1]:%Y-%m-%d}")
+                for part in _split(days, shards_per_platform)
+            )
+    return shards
+
+
+def generate(
+    output_dir: Path,
+    config: SyntheticConfig = SyntheticConfig(),
+    shards: Optional[Sequence[Shard]] = None,
+    max_workers: Optional[int] = None,
+    layout: str = "file",
+) -> Dict[str, int]:
+    """
+    Generate the raw exports into ``output_dir``; returns data rows per platform.
+
+    ``shards`` defaults to one shard per platform (see ``plan_shards``).
+    With ``max_workers == 1`` shards are streamed in-process, otherwise they
+    run on a process pool, each writing its own part file.  ``layout="file"``
+    joins the parts, in shard order, into ``<platform>_ads_raw.csv`` — the
+    bytes equal an unsharded serial run, which is why several date-range shards
+    of one platform (whose concatenation is ordered by date window, not by
+    campaign) are rejected there.  ``layout="parts"`` keeps them as
+    ``<platform>_ads_raw/part-NNNNN.csv``, each with its own header.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {LAYOUTS}, got {layout!r}")
+    shards = list(shards) if shards is not None else plan_shards(config)
+    if layout == "file":
+        for platform in dict.fromkeys(shard.platform for shard in shards):
+            own = [shard for shard in shards if shard.platform == platform]
+            if len(own) > 1 and any(shard.start is not None or shard.end is not None for shard in own):
+                raise ValueError(
+                    f"{platform}: date-range shards cannot be joined in export order; use layout='parts'"
+                )
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    platforms = list(dict.fromkeys(shard.platform for shard in shards))
+    headers = {platform: file_header(platform, config) for platform in platforms}
+    rows = dict.fromkeys(platforms, 0)
+
+    if layout == "file" and max_workers == 1:
+        for platform in platforms:
+            target = output_dir / RAW_FILES[platform]
+            tmp = target.with_suffix(".csv.tmp")
+            with tmp.open("w", newline="", encoding="utf-8") as handle:
+                handle.write(headers[platform])
+                for shard in shards:
+                    if shard.platform == platform:
+                        rows[platform] += write_shard(config, shard, handle)
+            os.replace(tmp, target)
+        return rows
+
+    if layout == "parts":
+        part_dirs = {platform: output_dir / Path(RAW_FILES[platform]).stem for platform in platforms}
+        for part_dir in part_dirs.values():
+            if part_dir.exists():
+                shutil.rmtree(part_dir)
+            part_dir.mkdir(parents=True)
+        scratch = None
+    else:
+        scratch = Path(tempfile.mkdtemp(prefix=".shards-", dir=output_dir))
+        part_dirs = {}
+
+    counters = dict.fromkeys(platforms, 0)
+    paths = []
+    for shard in shards:
+        name = f"part-{counters[shard.platform]:05d}.csv"
+        counters[shard.platform] += 1
+        paths.append(str(part_dirs[shard.platform] / name if scratch is None else scratch / f"{shard.platform}-{name}"))
+    part_headers = [headers[shard.platform] if layout == "parts" else "" for shard in shards]
+    configs = [config] * len(shards)
+
+    try:
+        if max_workers == 1:
+            counts = list(map(_write_part, configs, shards, paths, part_headers))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                counts = list(pool.map(_write_part, configs, shards, paths, part_headers))
+        for shard, count in zip(shards, counts):
+            rows[shard.platform] += count
+
+        if scratch is not None:
+            for platform in platforms:
+                target = output_dir / RAW_FILES[platform]
+                tmp = target.with_suffix(".csv.tmp")
+                with tmp.open("w", newline="", encoding="utf-8") as handle:
+                    handle.write(headers[platform])
+                    for shard, path in zip(shards, paths):
+                        if shard.platform == platform:
+                            with open(path, encoding="utf-8", newline="") as part:
+                                shutil.copyfileobj(part, handle, 1 << 20)
+                os.replace(tmp, target)
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+    return rows
+
+
+def expected_rows(config: SyntheticConfig, platform: str) -> int:
+    """Approximate data rows of ``platform`` for ``config`` (flights, paused weekends; Meta excludes duplicates)."""
+    days = pd.date_range(config.start, config.end, freq="D")
+    total = 0
+    for spec in TEMPLATES[platform]:
+        live = days >= pd.Timestamp(spec["start_date"])
+        if spec.get("pause_weekend", False):
+            live &= days.weekday < 5
+        total += int(live.sum())
+    return total * config.copies
+
+
+__all__ = [
+    "PLATFORMS",
+    "RAW_FILES",
+    "SEED",
+    "META_CAMPAIGNS",
+    "GOOGLE_CAMPAIGNS",
+    "TIKTOK_ADGROUPS",
+    "SyntheticConfig",
+    "Entity",
+    "Shard",
+    "entities",
+    "block_rows",
+    "shard_chunks",
+    "file_header",
+    "write_shard",
+    "plan_shards",
+    "generate",
+    "expected_rows",
+]
@@ -0,0 +1,443 @@
+"""
+Declarative data-quality validation for cleaned platform data.
+
+Rules are plain data (``Rule``) evaluated as vectorised boolean masks, so every
+rule for a dataset is checked in a single pass over an in-memory frame.  Each
+dataset is loaded once (or handed over straight from ``run_week1_pipeline``)
+and the outcome is a machine-readable ``ValidationReport`` with the number of
+offending rows per rule.
+
+``QualityGate`` applies the rules inline, e.g. inside ``run_week1_pipeline``
+right after each cleaner: it either fails fast or moves offending rows into a
+quarantine CSV, and accumulates statistics chunk by chunk when streaming.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+RULE_KINDS = (
+    "required_columns",
+    "numeric",
+    "not_null",
+    "range",
+    "finite",
+    "unique",
+    "identity",
+)
+
+GATE_MODES = ("fail", "quarantine")
+
+# Rules whose outcome is a property of the whole frame rather than of rows.
+FRAME_RULES = {"required_columns", "numeric"}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One validation rule.
+
+    ``kind`` selects the check and ``params`` its settings:
+
+    - ``required_columns``: ``columns`` must all exist.
+    - ``numeric``: ``columns`` must have a numeric dtype.
+    - ``not_null``: no missing values in ``columns``.
+    - ``range``: values within ``params["min"]``/``params["max"]`` (NaN ignored).
+    - ``finite``: no ±inf in ``columns``.
+    - ``unique``: no duplicated rows over ``columns`` (all columns if empty).
+    - ``identity``: ``numerator / denominator ≈ expected`` within ``rtol``/``atol``
+      wherever all three are present and the denominator is non-zero.
+    """
+
+    name: str
+    kind: str
+    columns: Tuple[str, ...] = ()
+    params: Mapping[str, Any] = field(default_factory=dict)
+    severity: str = "error"
+
+    def __post_init__(self) -> None:
+        if self.kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule kind {self.kind!r}; expected one of {RULE_KINDS}")
+        if self.severity not in ("error", "warning"):
+            raise ValueError("severity must be 'error' or 'warning'")
+
+
+REQUIRED_COLUMNS = (
+    "date",
+    "platform",
+    "campaign_name",
+    "spend",
+    "impressions",
+    "clicks",
+    "conversions",
+    "revenue",
+    "ctr",
+    "cvr",
+    "cpa",
+    "roas",
+)
+
+NUMERIC_COLUMNS = (
+    "spend",
+    "impressions",
+    "clicks",
+    "conversions",
+    "revenue",
+    "ctr",
+    "cvr",
+    "cpa",
+    "roas",
+)
+
+DEFAULT_RULES: Tuple[Rule, ...] = (
+    Rule("schema", "required_columns", REQUIRED_COLUMNS),
+    Rule("numeric_types", "numeric", NUMERIC_COLUMNS),
+    Rule("keys_present", "not_null", ("date", "platform", "campaign_name")),
+    Rule("ctr_range", "range", ("ctr",), {"min": 0.0, "max": 1.0}),
+    Rule("cvr_range", "range", ("cvr",), {"min": 0.0, "max": 1.0}),
+    Rule(
+        "non_negative",
+        "range",
+        ("spend", "impressions", "clicks", "conversions", "revenue"),
+        {"min": 0.0},
+    ),
+    Rule("finite_ratios", "finite", ("ctr", "cvr", "cpa", "roas")),
+    Rule("duplicate_rows", "unique", severity="warning"),
+    Rule(
+        "cpa_identity",
+        "identity",
+        ("spend", "conversions", "cpa"),
+        {"rtol": 0.01, "atol": 0.01},
+        severity="warning",
+    ),
+)
+
+
+@dataclass
+class RuleResult:
+    dataset: str
+    rule: str
+    kind: str
+    severity: str
+    columns: List[str]
+    rows_checked: int
+    offending_rows: int
+    passed: bool
+    detail: str = ""
+
+
+@dataclass
+class FrameValidation:
+    """Rule results for one frame plus the per-row error mask."""
+
+    dataset: str
+    results: List[RuleResult]
+    error_mask: np.ndarray
+    warning_mask: np.ndarray
+    rule_masks: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def passed(self) -> bool:
+        return all(result.passed for result in self.results if result.severity == "error")
+
+    @property
+    def frame_errors(self) -> List[RuleResult]:
+        """Failed error rules that cannot be fixed by dropping rows."""
+        return [
+            result
+            for result in self.results
+            if not result.passed and result.severity == "error" and result.kind in FRAME_RULES
+        ]
+
+
+@dataclass
+class ValidationReport:
+    """Machine-readable outcome of validating one or more datasets."""
+
+    results: List[RuleResult] = field(default_factory=list)
+    quarantined: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def passed(self) -> bool:
+        return all(result.passed for result in self.results if result.severity == "error")
+
+    def extend(self, validation: FrameValidation) -> None:
+        self.results.extend(validation.results)
+
+    def merge(self, validation: FrameValidation) -> None:
+        """
+        Fold another chunk of the same dataset into the running totals.
+
+        Row counts are summed per (dataset, rule).  Duplicate detection only
+        sees rows within a chunk.
+        """
+        index = {(result.dataset, result.rule): result for result in self.results}
+        for result in validation.results:
+            current = index.get((result.dataset, result.rule))
+            if current is None:
+                self.results.append(result)
+                continue
+            current.rows_checked += result.rows_checked
+            current.offending_rows += result.offending_rows
+            current.passed = current.passed and result.passed
+            current.detail = current.detail or result.detail
+
+    def failures(self, severity: Optional[str] = None) -> List[RuleResult]:
+        return [
+            result
+            for result in self.results
+            if not result.passed and (severity is None or result.severity == severity)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "passed": self.passed,
+            "errors": len(self.failures("error")),
+            "warnings": len(self.failures("warning")),
+            "quarantined": dict(self.quarantined),
+            "results": [asdict(result) for result in self.results],
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([asdict(result) for result in self.results])
+
+    def write_json(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+
+def _numeric(df: pd.DataFrame, columns: Sequence[str]) -> Optional[np.ndarray]:
+    """2-D float view of ``columns`` or ``None`` when one is missing/non-numeric."""
+    if any(col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]) for col in columns):
+        return None
+    return df[list(columns)].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _row_mask(df: pd.DataFrame, rule: Rule) -> Tuple[Optional[np.ndarray], str]:
+    """Return the offending-row mask for a row-level rule (``None`` = not evaluable)."""
+    columns = list(rule.columns)
+    if rule.kind == "not_null":
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            return None, f"missing columns {missing}"
+        return df[columns].isna().to_numpy().any(axis=1), ""
+
+    if rule.kind == "unique":
+        subset = columns or None
+        if subset and any(col not in df.columns for col in subset):
+            return None, "missing columns"
+        return df.duplicated(subset=subset, keep="first").to_numpy(), ""
+
+    values = _numeric(df, columns)
+    if values is None:
+        return None, "columns missing or not numeric"
+
+    if rule.kind == "range":
+        mask = np.zeros(len(df), dtype=bool)
+        if "min" in rule.params:
+            mask |= (values < rule.params["min"]).any(axis=1)
+        if "max" in rule.params:
+            mask |= (values > rule.params["max"]).any(axis=1)
+        return mask, ""
+
+    if rule.kind == "finite":
+        return np.isinf(values).any(axis=1), ""
+
+    if rule.kind == "identity":
+        numerator, denominator, expected = values[:, 0], values[:, 1], values[:, 2]
+        usable = ~np.isnan(values).any(axis=1) & (denominator != 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            actual = numerator / denominator
+        close = np.isclose(
+            actual,
+            expected,
+            rtol=rule.params.get("rtol", 1e-6),
+            atol=rule.params.get("atol", 0.0),
+        )
+        return usable & ~close, ""
+
+    raise ValueError(f"Rule kind {rule.kind!r} is not row-level")
+
+
+def validate_frame(
+    df: pd.DataFrame,
+    dataset: str,
+    rules: Iterable[Rule] = DEFAULT_RULES,
+) -> FrameValidation:
+    """Evaluate every rule against ``df`` in one pass."""
+    n_rows = len(df)
+    error_mask = np.zeros(n_rows, dtype=bool)
+    warning_mask = np.zeros(n_rows, dtype=bool)
+    results: List[RuleResult] = []
+    rule_masks: Dict[str, np.ndarray] = {}
+
+    for rule in rules:
+        detail = ""
+        offending = 0
+        if rule.kind == "required_columns":
+            missing = [col for col in rule.columns if col not in df.columns]
+            passed = not missing
+            detail = f"missing columns {missing}" if missing else ""
+        elif rule.kind == "numeric":
+            bad = [
+                f"{col}:{df[col].dtype}"
+                for col in rule.columns
+                if col in df.columns and not pd.api.types.is_numeric_dtype(df[col])
+            ]
+            passed = not bad
+            detail = f"non-numeric columns {bad}" if bad else ""
+        else:
+            mask, detail = _row_mask(df, rule)
+            if mask is None:
+                passed = False
+            else:
+                offending = int(mask.sum())
+                passed = offending == 0
+                target = error_mask if rule.severity == "error" else warning_mask
+                target |= mask
+                if offending:
+                    rule_masks[rule.name] = mask
+
+        results.append(
+            RuleResult(
+                dataset=dataset,
+                rule=rule.name,
+                kind=rule.kind,
+                severity=rule.severity,
+                columns=list(rule.columns),
+                rows_checked=n_rows,
+                offending_rows=offending,
+                passed=passed,
+                detail=detail,
+            )
+        )
+
+    return FrameValidation(dataset, results, error_mask, warning_mask, rule_masks)
+
+
+def validate_frames(
+    frames: Mapping[str, pd.DataFrame],
+    rules: Iterable[Rule] = DEFAULT_RULES,
+) -> ValidationReport:
+    """Validate several in-memory frames with the same rules."""
+    rules = tuple(rules)
+    report = ValidationReport()
+    for dataset, frame in frames.items():
+        report.extend(validate_frame(frame, dataset, rules))
+    return report
+
+
+def validate_files(
+    paths: Mapping[str, Path],
+    rules: Iterable[Rule] = DEFAULT_RULES,
+) -> ValidationReport:
+    """Load each CSV exactly once and validate it."""
+    return validate_frames({name: pd.read_csv(path) for name, path in paths.items()}, rules)
+
+
+class DataQualityError(ValueError):
+    """Raised by a ``QualityGate`` when a frame violates an error-level rule."""
+
+    def __init__(self, message: str, report: ValidationReport):
+        super().__init__(message)
+        self.report = report
+
+
+@dataclass
+class QualityGate:
+    """
+    Inline validation hook for in-memory frames.
+
+    ``mode="fail"`` raises ``DataQualityError`` on any error-level violation.
+    ``mode="quarantine"`` drops offending rows, appends them (with a
+    ``failed_rules`` column) to ``<quarantine_dir>/<dataset>_quarantine.csv`` and
+    returns the remaining rows; schema/dtype failures still raise because no
+    subset of rows can fix them.  ``check`` may be called once per chunk, the
+    statistics in ``report`` are accumulated incrementally.
+    """
+
+    mode: str = "fail"
+    rules: Tuple[Rule, ...] = DEFAULT_RULES
+    quarantine_dir: Optional[Path] = None
+    report: ValidationReport = field(default_factory=ValidationReport)
+    _started: set = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.mode not in GATE_MODES:
+            raise ValueError(f"mode must be one of {GATE_MODES}")
+        if self.mode == "quarantine" and self.quarantine_dir is None:
+            raise ValueError("quarantine mode requires quarantine_dir")
+        self.rules = tuple(self.rules)
+
+    def check(self, df: pd.DataFrame, dataset: str) -> pd.DataFrame:
+        """Validate ``df`` and return the rows allowed through the gate."""
+        validation = validate_frame(df, dataset, self.rules)
+        self.report.merge(validation)
+
+        if validation.frame_errors:
+            raise DataQualityError(self._describe(validation, validation.frame_errors), self.report)
+        if not validation.error_mask.any():
+            return df
+        failed = [
+            result for result in validation.results
+            if not result.passed and result.severity == "error"
+        ]
+        if self.mode == "fail":
+            raise DataQualityError(self._describe(validation, failed), self.report)
+
+        self._quarantine(df, validation)
+        return df.loc[~validation.error_mask].reset_index(drop=True)
+
+    def quarantine_path(self, dataset: str) -> Path:
+        assert self.quarantine_dir is not None
+        return self.quarantine_dir / f"{dataset.lower()}_quarantine.csv"
+
+    def _quarantine(self, df: pd.DataFrame, validation: FrameValidation) -> None:
+        mask = validation.error_mask
+        bad = df.loc[mask].copy()
+        errors = {result.rule for result in validation.results if result.severity == "error"}
+        labels = pd.Series("", index=df.index)
+        for name, rule_mask in validation.rule_masks.items():
+            if name in errors:
+                labels[rule_mask] += name + ";"
+        bad["failed_rules"] = labels[mask].str.rstrip(";")
+
+        path = self.quarantine_path(validation.dataset)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        first = validation.dataset not in self._started
+        self._started.add(validation.dataset)
+        bad.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+        quarantined = self.report.quarantined
+        quarantined[validation.dataset] = quarantined.get(validation.dataset, 0) + int(mask.sum())
+
+    @staticmethod
+    def _describe(validation: FrameValidation, failed: List[RuleResult]) -> str:
+        parts = [
+            f"{result.rule} ({result.offending_rows} rows)" if result.offending_rows
+            else f"{result.rule}: {result.detail}"
+            for result in failed
+        ]
+        return f"{validation.dataset} failed data-quality rules: " + ", ".join(parts)
+
+
+__all__ = [
+    "Rule",
+    "RuleResult",
+    "FrameValidation",
+    "ValidationReport",
+    "DataQualityError",
+    "QualityGate",
+    "DEFAULT_RULES",
+    "validate_frame",
+    "validate_frames",
+    "validate_files",
+]
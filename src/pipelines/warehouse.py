@@ -0,0 +1,302 @@
+"""
+Local analytical query layer over the Week 1 outputs (SQLite, standard library).
+
+``build_warehouse`` streams ``integrated_data.csv`` into an indexed fact table
+with calendar columns, pre-aggregates the grains the dashboard uses (day ×
+platform, quarter × campaign) into rollup tables, and defines one view per
+Power BI page.  CSV rows are streamed as text into a temporary staging table
+(outside the database file) and typed with one ``INSERT ... SELECT``, so no
+pandas frame is built at any point; dashboard queries read the rollups and
+stay fast as the fact table grows.
+
+The database records the digest of the CSV it was built from and is only
+rebuilt when that changes.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .hashing import file_digest
+
+
+SCHEMA_VERSION = 1
+
+SOURCE_COLUMNS = (
+    "date",
+    "platform",
+    "campaign_name",
+    "spend",
+    "impressions",
+    "clicks",
+    "conversions",
+    "revenue",
+    "ctr",
+    "cvr",
+    "cpa",
+    "roas",
+)
+
+# Ratios follow the DAX measures: DIVIDE(numerator, denominator, 0).
+_RATIOS = """
+    COALESCE(SUM(revenue) / NULLIF(SUM(spend), 0), 0) AS roas,
+    COALESCE(CAST(SUM(clicks) AS REAL) / NULLIF(SUM(impressions), 0), 0) AS ctr,
+    COALESCE(SUM(conversions) / NULLIF(SUM(clicks), 0), 0) AS cvr,
+    COALESCE(SUM(spend) / NULLIF(SUM(conversions), 0), 0) AS cpa
+"""
+
+_TOTALS = """
+    SUM(spend) AS spend,
+    SUM(revenue) AS revenue,
+    SUM(impressions) AS impressions,
+    SUM(clicks) AS clicks,
+    SUM(conversions) AS conversions
+"""
+
+SCHEMA = f"""
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+
+CREATE TEMP TABLE staging ({", ".join(f"{column} TEXT" for column in SOURCE_COLUMNS)});
+
+CREATE TABLE fact_ads (
+    date TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    day_of_week INTEGER NOT NULL,  -- Monday = 0, as in pandas
+    platform TEXT NOT NULL,
+    campaign_name TEXT NOT NULL,
+    spend REAL,
+    impressions INTEGER,
+    clicks INTEGER,
+    conversions REAL,
+    revenue REAL,
+    ctr REAL,
+    cvr REAL,
+    cpa REAL,
+    roas REAL
+);
+"""
+
+INDEXES = """
+CREATE INDEX ix_fact_platform_date ON fact_ads (platform, date);
+CREATE INDEX ix_fact_date ON fact_ads (date);
+CREATE INDEX ix_fact_campaign ON fact_ads (campaign_name, platform);
+"""
+
+ROLLUPS = f"""
+CREATE TABLE agg_daily_platform AS
+SELECT date, year, quarter, month, day_of_week, platform, {_TOTALS}
+FROM fact_ads
+GROUP BY date, platform;
+CREATE UNIQUE INDEX ix_agg_daily ON agg_daily_platform (platform, date);
+
+CREATE TABLE agg_campaign_quarter AS
+SELECT year, quarter, platform, campaign_name, {_TOTALS}
+FROM fact_ads
+GROUP BY year, quarter, platform, campaign_name;
+CREATE INDEX ix_agg_campaign ON agg_campaign_quarter (platform, year, quarter);
+"""
+
+VIEWS = {
+    # Page 1 — Overview
+    "overview_kpis": f"""
+        SELECT MIN(date) AS first_date, MAX(date) AS last_date, {_TOTALS}, {_RATIOS}
+        FROM agg_daily_platform
+    """,
+    "overview_trend": f"""
+        SELECT date, {_TOTALS}, {_RATIOS}
+        FROM agg_daily_platform
+        GROUP BY date
+        ORDER BY date
+    """,
+    # Page 2 — Platform Comparison
+    "platform_quarter": f"""
+        SELECT platform, year, quarter, {_TOTALS}, {_RATIOS}
+        FROM agg_daily_platform
+        GROUP BY platform, year, quarter
+        ORDER BY platform, year, quarter
+    """,
+    "campaign_table": f"""
+        SELECT platform, campaign_name, {_TOTALS}, {_RATIOS}
+        FROM agg_campaign_quarter
+        GROUP BY platform, campaign_name
+        ORDER BY spend DESC
+    """,
+    # Page 3 — Time Analysis
+    "time_heatmap": f"""
+        SELECT platform, month, day_of_week, {_TOTALS}, {_RATIOS}
+        FROM agg_daily_platform
+        GROUP BY platform, month, day_of_week
+        ORDER BY platform, month, day_of_week
+    """,
+}
+
+DASHBOARD_PAGES = {
+    "Overview": ("overview_kpis", "overview_trend"),
+    "Platform Comparison": ("platform_quarter", "campaign_table"),
+    "Time Analysis": ("time_heatmap",),
+}
+
+_LOAD_FACT = f"""
+INSERT INTO fact_ads
+SELECT
+    date,
+    CAST(strftime('%Y', date) AS INTEGER),
+    (CAST(strftime('%m', date) AS INTEGER) + 2) / 3,
+    CAST(strftime('%m', date) AS INTEGER),
+    (CAST(strftime('%w', date) AS INTEGER) + 6) % 7,
+    platform,
+    campaign_name,
+    {", ".join(
+        f"CAST(NULLIF({column}, '') AS {'INTEGER' if column in ('impressions', 'clicks') else 'REAL'})"
+        for column in SOURCE_COLUMNS[3:]
+    )}
+FROM staging
+"""
+
+
+def _read_rows(csv_path: Path) -> Iterator[List[str]]:
+    with csv_path.open(newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        header = next(reader)
+        positions = [header.index(column) for column in SOURCE_COLUMNS]
+        if positions == list(range(len(SOURCE_COLUMNS))) and len(header) == len(SOURCE_COLUMNS):
+            yield from reader
+        else:
+            for row in reader:
+                yield [row[index] for index in positions]
+
+
+def _stored_digest(db_path: Path) -> Optional[str]:
+    if not db_path.exists():
+        return None
+    try:
+        with closing(sqlite3.connect(db_path)) as conn:
+            rows = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    except sqlite3.DatabaseError:
+        return None
+    if rows.get("schema_version") != str(SCHEMA_VERSION):
+        return None
+    return rows.get("source_digest")
+
+
+def build_warehouse(integrated_path: Path, db_path: Path, force: bool = False) -> bool:
+    """
+    (Re)build ``db_path`` from ``integrated_path``.
+
+    Returns ``False`` when the database is already up to date with the CSV.
+    The new database is built next to the old one and swapped in atomically.
+    """
+    digest = file_digest(integrated_path)
+    if not force and _stored_digest(db_path) == digest:
+        return False
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        with closing(sqlite3.connect(tmp_path)) as conn:
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.executescript(SCHEMA)
+            conn.executemany(
+                f"INSERT INTO staging VALUES ({', '.join('?' * len(SOURCE_COLUMNS))})",
+                _read_rows(integrated_path),
+            )
+            conn.execute(_LOAD_FACT)
+            conn.execute("DROP TABLE staging")
+            conn.executescript(INDEXES)
+            conn.executescript(ROLLUPS)
+            for name, sql in VIEWS.items():
+                conn.execute(f"CREATE VIEW v_{name} AS {sql}")
+            conn.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [
+                    ("schema_version", str(SCHEMA_VERSION)),
+                    ("source", str(integrated_path)),
+                    ("source_digest", digest),
+                ],
+            )
+            conn.commit()
+            conn.execute("ANALYZE")
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return True
+
+
+class Warehouse:
+    """Read-only access to a database built by ``build_warehouse``."""
+
+    def __init__(self, db_path: Path):
+        if not Path(db_path).exists():
+            raise FileNotFoundError(f"{db_path} does not exist; run build_warehouse first")
+        self.db_path = Path(db_path)
+        # as_uri() percent-encodes "?", "#" and "%" in the path.
+        self._conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "Warehouse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Run ``sql`` and return ``(column_names, rows)``."""
+        cursor = self._conn.execute(sql, params)
+        columns = [description[0] for description in cursor.description or ()]
+        return columns, cursor.fetchall()
+
+    def records(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        columns, rows = self.query(sql, params)
+        return [dict(zip(columns, row)) for row in rows]
+
+    def view(
+        self,
+        name: str,
+        platform: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Query dashboard view ``name``, optionally for one platform."""
+        if name not in VIEWS:
+            raise KeyError(f"Unknown view {name!r}; available: {sorted(VIEWS)}")
+        params: List[Any] = []
+        if platform is not None:
+            # Views without a platform column are recomputed from the rollup.
+            sql = VIEWS[name].replace(
+                "FROM agg_daily_platform", "FROM agg_daily_platform WHERE platform = ?"
+            ).replace(
+                "FROM agg_campaign_quarter", "FROM agg_campaign_quarter WHERE platform = ?"
+            )
+            params.append(platform)
+        else:
+            sql = f"SELECT * FROM v_{name}"
+        if limit is not None:
+            sql = f"SELECT * FROM ({sql}) LIMIT ?"
+            params.append(int(limit))
+        return self.query(sql, params)
+
+    def to_frame(self, sql: str, params: Sequence[Any] = ()):
+        """Convenience for notebooks: the query result as a DataFrame."""
+        import pandas as pd
+
+        columns, rows = self.query(sql, params)
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+
+__all__ = [
+    "VIEWS",
+    "DASHBOARD_PAGES",
+    "build_warehouse",
+    "Warehouse",
+]
@@ -4,32 +4,24 @@ Week 1 data preparation pipeline.
 This module consolidates the data-cleaning logic that originally lived inside the
 exploratory notebooks.  Each helper returns a tidy DataFrame with a consistent
 schema so the output can be reused across notebooks, scripts, or production jobs.
+Platform specifics live in ``adapters.py``; the cleaners below are thin
+wrappers around its shared kernel.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Sequence
 
-import numpy as np
 import pandas as pd
 
-
-FINAL_COLUMNS = [
-    "date",
-    "platform",
-    "campaign_name",
-    "spend",
-    "impressions",
-    "clicks",
-    "conversions",
-    "revenue",
-    "ctr",
-    "cvr",
-    "cpa",
-    "roas",
-]
+from .adapters import FINAL_COLUMNS, PlatformAdapter, clean_platform, get_adapter  # noqa: F401
+from .instrumentation import instrumented
+from .partitioning import write_partitioned
+from .quantile_sketch import build_sketches, write_sketches
+from .reach import AudienceModel, reach_rollup
+from .validation import QualityGate
 
 
 @dataclass
@@ -40,137 +32,45 @@ class Week1Outputs:
     google_cleaned: Path
     tiktok_cleaned: Path
     integrated: Path
-
-
-def _replace_inf_with_nan(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
-    """Replace +/- inf with NaN for selected columns."""
-    df[columns] = df[columns].replace([np.inf, -np.inf], np.nan)
-    return df
-
-
-def clean_meta_ads(raw_path: Path) -> pd.DataFrame:
+    quality_report: Optional[Path] = None
+    extra_cleaned: Dict[str, Path] = field(default_factory=dict)
+    partition_manifest: Optional[Path] = None
+    metric_sketches: Optional[Path] = None
+    reach_sketches: Optional[Path] = None
+    reach_rollup: Optional[Path] = None
+
+
+@instrumented()
+def clean_meta_ads(
+    raw_path: Path,
+    include_extra: bool = False,
+    cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
     """Clean Meta Ads export."""
-    df = pd.read_csv(raw_path, na_values=["--"])
-    rename_map = {
-        "Reporting starts": "date",
-        "Reporting ends": "date_end",
-        "Campaign name": "campaign_name",
-        "Amount spent (USD)": "spend",
-        "Impressions": "impressions",
-        "Link clicks": "clicks",
-        "Purchases": "conversions",
-        "Cost per purchase (USD)": "cpa",
-        "Purchase conversion value (USD)": "revenue",
-        "Reach": "reach",
-    }
-    df = df.rename(columns=rename_map)
-    df = df.drop(columns=[col for col in ["date_end"] if col in df.columns])
-
-    df["date"] = pd.to_datetime(df["date"])
-    money_cols = ["spend", "cpa", "revenue"]
-    df[money_cols] = df[money_cols].apply(pd.to_numeric, errors="coerce")
-    df[money_cols] = df[money_cols].round(2)
-
-    df["platform"] = "Meta"
-    df["ctr"] = df["clicks"] / df["impressions"]
-    df["cvr"] = df["conversions"] / df["clicks"]
-    df["cpa"] = df["spend"] / df["conversions"]
-    df["roas"] = df["revenue"] / df["spend"]
-
-    df = _replace_inf_with_nan(df, ["ctr", "cvr", "cpa", "roas"])
-    df = df.sort_values("date").reset_index(drop=True)
-
-    return df[FINAL_COLUMNS].copy()
-
-
-def clean_google_ads(raw_path: Path) -> pd.DataFrame:
-    """Clean Google Ads export."""
-    column_names = [
-        "date",
-        "campaign_name",
-        "campaign_id",
-        "impressions",
-        "clicks",
-        "spend",
-        "conversions",
-        "cvr_google",
-        "cpa_google",
-        "revenue",
-    ]
-    df = pd.read_csv(raw_path, skiprows=4, names=column_names, na_values=["--"])
-
-    # Google privacy threshold sometimes reports "< 10" etc.
-    df["conversions"] = (
-        df["conversions"].astype(str).str.replace("< 10", "5", regex=False)
-    )
-    df["conversions"] = pd.to_numeric(df["conversions"], errors="coerce")
+    return clean_platform(raw_path, get_adapter("meta"), include_extra, cache_dir=cache_dir)
 
-    df["cvr_google"] = (
-        df["cvr_google"].astype(str).str.replace("%", "", regex=False)
-    )
-    df["cvr_google"] = pd.to_numeric(df["cvr_google"], errors="coerce") / 100.0
 
-    df["cpa_google"] = pd.to_numeric(df["cpa_google"], errors="coerce")
-    df["revenue"] = pd.to_numeric(df["revenue"], errors="coerce")
-    df["spend"] = pd.to_numeric(df["spend"], errors="coerce")
-    df["clicks"] = pd.to_numeric(df["clicks"], errors="coerce")
-    df["impressions"] = pd.to_numeric(df["impressions"], errors="coerce")
-
-    df["ctr"] = df["clicks"] / df["impressions"]
-    df["platform"] = "Google"
-    df["roas"] = df["revenue"] / df["spend"]
-
-    df = _replace_inf_with_nan(df, ["ctr", "roas"])
-    df = df.rename(columns={"cvr_google": "cvr", "cpa_google": "cpa"})
-    df = df.drop(columns=[col for col in ["campaign_id"] if col in df.columns])
-    df["date"] = pd.to_datetime(df["date"])
-
-    return df[FINAL_COLUMNS].copy()
+@instrumented()
+def clean_google_ads(
+    raw_path: Path,
+    include_extra: bool = False,
+    cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Clean Google Ads export."""
+    return clean_platform(raw_path, get_adapter("google"), include_extra, cache_dir=cache_dir)
 
 
-def clean_tiktok_ads(raw_path: Path) -> pd.DataFrame:
+@instrumented()
+def clean_tiktok_ads(
+    raw_path: Path,
+    include_extra: bool = False,
+    cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
     """Clean TikTok Ads export."""
-    rename_map = {
-        "Date": "date",
-        "Campaign Name": "campaign_name",
-        "Ad Group Name": "ad_group_name",
-        "Cost": "spend",
-        "Impressions": "impressions",
-        "Clicks": "clicks",
-        "Conversions": "conversions",
-        "CPA": "cpa",
-        "CTR": "ctr",
-        "CVR": "cvr",
-        "Video Views": "views",
-        "Video Play Actions": "actions",
-        "Learning Status": "learning_status",
-    }
-    df = pd.read_csv(raw_path, na_values=["--"]).rename(columns=rename_map)
-
-    df["date"] = pd.to_datetime(df["date"])
-    df["ctr"] = (
-        df["ctr"].astype(str).str.replace("%", "", regex=False)
-    ).astype(float) / 100.0
-    df["cvr"] = (
-        df["cvr"].astype(str).str.replace("%", "", regex=False)
-    ).astype(float) / 100.0
-
-    df["spend"] = pd.to_numeric(df["spend"], errors="coerce")
-    df["conversions"] = pd.to_numeric(df["conversions"], errors="coerce")
-
-    df["revenue"] = 80 * df["conversions"]
-    df["roas"] = df["revenue"] / df["spend"]
-    df["platform"] = "TikTok"
-
-    df = _replace_inf_with_nan(df, ["ctr", "cvr", "roas"])
-
-    # Some exports include pre-calculated CPA; recompute to ensure consistency.
-    df["cpa"] = df["spend"] / df["conversions"]
-    df = _replace_inf_with_nan(df, ["cpa"])
-
-    return df[FINAL_COLUMNS].copy()
+    return clean_platform(raw_path, get_adapter("tiktok"), include_extra, cache_dir=cache_dir)
 
 
+@instrumented()
 def integrate_platforms(platform_frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     """Concatenate cleaned frames from each platform."""
     frames = []
@@ -187,6 +87,13 @@ def integrate_platforms(platform_frames: Dict[str, pd.DataFrame]) -> pd.DataFram
 def run_week1_pipeline(
     raw_dir: Path,
     processed_dir: Path,
+    quality_gate: Optional[QualityGate] = None,
+    extra_adapters: Sequence[PlatformAdapter] = (),
+    cache_dir: Optional[Path] = None,
+    partition_dir: Optional[Path] = None,
+    sketch_path: Optional[Path] = None,
+    reach_path: Optional[Path] = None,
+    audience_model: Optional[AudienceModel] = None,
 ) -> Week1Outputs:
     """
     Execute the full Week 1 cleaning workflow.
@@ -198,12 +105,61 @@ def run_week1_pipeline(
         tiktok_ads_raw.csv).
     processed_dir
         Directory where cleaned CSVs should be saved.
+    quality_gate
+        Optional ``QualityGate`` applied to each frame right after its cleaner,
+        before anything else is parsed or written.  Its report is saved as
+        ``quality_report.json``, also when the gate stops the run.
+    extra_adapters
+        Additional platforms (see ``adapters.load_adapters``) cleaned from
+        ``raw_dir`` into ``<key>_cleaned.csv`` and included in the integration.
+    cache_dir
+        Optional raw-ingest cache (see ``raw_cache``); unchanged exports are
+        memory-mapped from it instead of being parsed again.
+    partition_dir
+        Optional root for a ``platform=<P>/month=<YYYY-MM>/`` copy of the
+        integrated data (see ``partitioning.read_partitioned``).
+    sketch_path
+        Optional Parquet/CSV file for per platform/campaign/day t-digests of
+        CPA, ROAS, CTR and CVR; percentiles at any rollup come from merging
+        them (see ``quantile_sketch.rollup_quantiles``).
+    reach_path
+        Optional ``.npz`` file for daily HyperLogLog reach sketches of the Meta
+        campaigns; weekly and monthly deduplicated reach is also written to
+        ``reach_rollup.csv`` (see ``reach.reach_rollup``).
+    audience_model
+        How synthetic user ids are drawn from the reported daily reach;
+        defaults to ``AudienceModel()``.
     """
     processed_dir.mkdir(parents=True, exist_ok=True)
 
-    meta = clean_meta_ads(raw_dir / "meta_ads_raw.csv")
-    google = clean_google_ads(raw_dir / "google_ads_raw.csv")
-    tiktok = clean_tiktok_ads(raw_dir / "tiktok_ads_raw.csv")
+    def gate(frame: pd.DataFrame, dataset: str) -> pd.DataFrame:
+        return frame if quality_gate is None else quality_gate.check(frame, dataset)
+
+    # Each frame is checked as soon as its cleaner returns, so a bad export
+    # stops the run before the next one is parsed.  The report is written
+    # even when the gate raises.
+    quality_report = None
+    try:
+        meta = gate(
+            clean_meta_ads(raw_dir / "meta_ads_raw.csv", include_extra=reach_path is not None, cache_dir=cache_dir),
+            "Meta",
+        )
+        google = gate(clean_google_ads(raw_dir / "google_ads_raw.csv", cache_dir=cache_dir), "Google")
+        tiktok = gate(clean_tiktok_ads(raw_dir / "tiktok_ads_raw.csv", cache_dir=cache_dir), "TikTok")
+        extras = {}
+        for adapter in extra_adapters:
+            extras[adapter.key] = gate(
+                clean_platform(raw_dir / adapter.filename, adapter, cache_dir=cache_dir), adapter.platform
+            )
+    finally:
+        if quality_gate is not None:
+            quality_report = quality_gate.report.write_json(processed_dir / "quality_report.json")
+
+    meta_reach = None
+    if reach_path is not None:
+        # Reach is Meta-only and outside FINAL_COLUMNS; set it aside for the sketches.
+        meta_reach = meta[["date", "campaign_name", "reach"]]
+        meta = meta[FINAL_COLUMNS]
 
     meta_path = processed_dir / "meta_cleaned.csv"
     google_path = processed_dir / "google_cleaned.csv"
@@ -213,17 +169,51 @@ def run_week1_pipeline(
     google.to_csv(google_path, index=False)
     tiktok.to_csv(tiktok_path, index=False)
 
+    extra_paths = {}
+    for adapter in extra_adapters:
+        extra_paths[adapter.key] = processed_dir / f"{adapter.key}_cleaned.csv"
+        extras[adapter.key].to_csv(extra_paths[adapter.key], index=False)
+
     integrated = integrate_platforms(
-        {"Meta": meta, "Google": google, "TikTok": tiktok}
+        {
+            "Meta": meta,
+            "Google": google,
+            "TikTok": tiktok,
+            **{adapter.platform: extras[adapter.key] for adapter in extra_adapters},
+        }
     )
     integrated_path = processed_dir / "integrated_data.csv"
     integrated.to_csv(integrated_path, index=False)
 
+    partition_manifest = None
+    if partition_dir is not None:
+        partition_manifest = write_partitioned(integrated, partition_dir)
+
+    metric_sketches = None
+    if sketch_path is not None:
+        metric_sketches = write_sketches(build_sketches(integrated), sketch_path)
+
+    reach_sketches = reach_table = None
+    if reach_path is not None:
+        # Duplicated export rows repeat the same campaign-day; count it once.
+        keys = ["date", "campaign_name"]
+        cells = meta.drop_duplicates(keys).merge(meta_reach.drop_duplicates(keys), on=keys)
+        sketches = (audience_model or AudienceModel()).sketch(cells)
+        reach_sketches = sketches.save(reach_path)
+        reach_table = processed_dir / "reach_rollup.csv"
+        reach_rollup(sketches).to_csv(reach_table, index=False)
+
     return Week1Outputs(
         meta_cleaned=meta_path,
         google_cleaned=google_path,
         tiktok_cleaned=tiktok_path,
         integrated=integrated_path,
+        quality_report=quality_report,
+        extra_cleaned=extra_paths,
+        partition_manifest=partition_manifest,
+        metric_sketches=metric_sketches,
+        reach_sketches=reach_sketches,
+        reach_rollup=reach_table,
     )
 
 
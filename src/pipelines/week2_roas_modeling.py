@@ -5,26 +5,48 @@ This module turns the exploratory notebook logic into reusable functions that:
 1. prepare daily, platform-level features with lagged context, and
 2. train a residual Random Forest model to predict ROAS uplift beyond the
    trailing 7-day average.
+
+scikit-learn is imported inside the training and evaluation helpers so feature
+preparation can run without loading it.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.model_selection import RandomizedSearchCV, TimeSeriesSplit
 import json
 
-
-# Holidays used in the original notebook feature engineering
-HOLIDAYS_2024 = pd.to_datetime(
-    ["2024-01-01", "2024-02-14", "2024-03-17", "2024-07-04", "2024-11-28"]
-)
+from .drift import DriftMonitor
+from .encoding import CategoricalEncoder
+from .instrumentation import instrumented, stage
+from .marketing_calendar import FEATURE_COLUMNS as CALENDAR_COLUMNS, calendar_features
+from .partitioning import read_partitioned
+
+if TYPE_CHECKING:
+    from scipy import sparse
+    from sklearn.ensemble import RandomForestRegressor
+
+
+DAILY_SUMS = ["spend", "revenue", "clicks", "conversions", "impressions"]
+LAG_FEATURES = ["roas", "spend", "ctr", "cvr"]
+# Features that are functions of the date alone; drift monitoring reports them
+# but judges seasonality by the metrics instead.
+DATE_FEATURES = ["month", "day_of_week", "is_weekend", "is_q4", *CALENDAR_COLUMNS]
+# Identifiers, targets and raw sums that never enter X.
+NON_FEATURE_COLUMNS = {
+    "revenue",
+    "clicks",
+    "conversions",
+    "impressions",
+    "date",
+    "platform",
+    "roas",
+    "residual",
+}
 
 
 @dataclass
@@ -33,30 +55,20 @@ class ModelArtifacts:
 
     model_path: Path
     metrics_path: Path
+    encoder_path: Optional[Path] = None
+    drift_path: Optional[Path] = None
 
 
-def prepare_daily_features(
-    integrated_path: Path,
-    lag_days: int = 7,
-) -> pd.DataFrame:
+def aggregate_daily(df: pd.DataFrame, cpa_fill: Optional[float] = None) -> pd.DataFrame:
     """
-    Aggregate integrated platform data to a modeling-ready dataframe.
+    Sum integrated rows to one row per date and platform and add ratio metrics.
 
-    The function mirrors the feature engineering steps from the notebook but
-    removes exploratory prints/side effects.
+    Undefined CPA (no conversions) is filled with ``cpa_fill``, by default the
+    median CPA of the aggregated frame.
     """
-    df = pd.read_csv(integrated_path)
-    df["date"] = pd.to_datetime(df["date"])
-
     daily = (
         df.groupby(["date", "platform"], as_index=False)
-        .agg(
-            spend=("spend", "sum"),
-            revenue=("revenue", "sum"),
-            clicks=("clicks", "sum"),
-            conversions=("conversions", "sum"),
-            impressions=("impressions", "sum"),
-        )
+        .agg(**{column: (column, "sum") for column in DAILY_SUMS})
         .sort_values(["date", "platform"])
         .reset_index(drop=True)
     )
@@ -72,11 +84,43 @@ def prepare_daily_features(
     # Fill unavoidable NaNs (mostly from zero conversions/clicks)
     daily["roas"] = daily["roas"].fillna(0.0)
     daily["cvr"] = daily["cvr"].fillna(0.0)
-    daily["cpa"] = daily["cpa"].fillna(daily["cpa"].median())
+    daily["cpa"] = daily["cpa"].fillna(daily["cpa"].median() if cpa_fill is None else cpa_fill)
     daily["ctr"] = daily["ctr"].fillna(0.0)
+    return daily
 
-    lag_features = ["roas", "spend", "ctr", "cvr"]
-    for col in lag_features:
+
+def add_calendar_columns(daily: pd.DataFrame, region: str = "US") -> pd.DataFrame:
+    """Append month/weekday flags and ``region`` holiday/promo features."""
+    daily["month"] = daily["date"].dt.month
+    daily["day_of_week"] = daily["date"].dt.dayofweek
+    daily["is_weekend"] = (daily["day_of_week"] >= 5).astype(int)
+    daily["is_q4"] = daily["month"].isin([10, 11, 12]).astype(int)
+    return daily.join(calendar_features(daily["date"], region=region))
+
+
+@instrumented()
+def prepare_daily_features(
+    integrated_path: Path,
+    lag_days: int = 7,
+    region: str = "US",
+) -> pd.DataFrame:
+    """
+    Aggregate integrated platform data to a modeling-ready dataframe.
+
+    The function mirrors the feature engineering steps from the notebook but
+    removes exploratory prints/side effects.  ``integrated_path`` may also be a
+    partitioned directory written by Week 1; only the needed columns are read.
+    Holiday and promo-window features use the ``region`` marketing calendar.
+    """
+    if Path(integrated_path).is_dir():
+        df = read_partitioned(integrated_path, columns=["date", "platform", *DAILY_SUMS])
+    else:
+        df = pd.read_csv(integrated_path)
+        df["date"] = pd.to_datetime(df["date"])
+
+    daily = aggregate_daily(df)
+
+    for col in LAG_FEATURES:
         daily[f"{col}_last_{lag_days}"] = (
             daily.groupby("platform")[col]
             .transform(lambda s: s.rolling(window=lag_days, min_periods=lag_days).mean())
@@ -97,20 +141,7 @@ def prepare_daily_features(
         ["spend_growth", "conv_growth"]
     ].fillna(0.0)
 
-    # Calendar features
-    daily["month"] = daily["date"].dt.month
-    daily["day_of_week"] = daily["date"].dt.dayofweek
-    daily["is_weekend"] = (daily["day_of_week"] >= 5).astype(int)
-    daily["is_q4"] = daily["month"].isin([10, 11, 12]).astype(int)
-    daily["is_holiday"] = daily["date"].isin(HOLIDAYS_2024).astype(int)
-
-    month_dummies = pd.get_dummies(daily["month"], prefix="month", drop_first=False)
-    platform_dummies = pd.get_dummies(daily["platform"], prefix="platform")
-
-    feature_df = pd.concat(
-        [daily, month_dummies, platform_dummies],
-        axis=1,
-    )
+    feature_df = add_calendar_columns(daily, region=region)
 
     # Drop rows without enough history for lag features.
     feature_df = feature_df.dropna(subset=[f"roas_last_{lag_days}"]).reset_index(
@@ -123,45 +154,63 @@ def prepare_daily_features(
 def build_feature_matrix(
     feature_df: pd.DataFrame,
     lag_days: int = 7,
-) -> Tuple[pd.DataFrame, pd.Series, pd.Series]:
+    encoding: str = "onehot",
+    encoder: Optional[CategoricalEncoder] = None,
+) -> Tuple[Union[pd.DataFrame, "sparse.csr_matrix"], pd.Series, pd.Series]:
     """
     Construct X and y matrices for modeling.
 
+    Categorical columns (month, platform) are encoded with ``encoder``, or a
+    new ``CategoricalEncoder(encoding)`` fitted on ``feature_df``; pass a
+    fitted encoder to reproduce the training layout when scoring.  With
+    ``encoding="sparse"`` X is a CSR matrix whose columns follow
+    ``feature_matrix_columns``.
+
     Returns
     -------
-    X : DataFrame of features.
+    X : DataFrame (or CSR matrix) of features.
     y_residual : Series of residual targets (roas - rolling mean).
     roas_last : Series of trailing roas to reconstruct absolute predictions later.
     """
-    exclude_cols = {
-        "revenue",
-        "clicks",
-        "conversions",
-        "impressions",
-        "date",
-        "platform",
-        "roas",
-    }
     residual_col = f"roas_last_{lag_days}"
 
-    base_cols = [
+    if encoder is None:
+        encoder = CategoricalEncoder(encoding)
+    y_residual = feature_df["residual"].copy()
+    roas_last = feature_df[residual_col].copy()
+    if encoder.fitted:
+        encoded = encoder.transform(feature_df)
+    else:
+        encoded = encoder.fit_transform(feature_df, y_residual)
+
+    base = feature_df[_base_columns(feature_df)]
+    if encoder.kind == "sparse":
+        from scipy import sparse
+
+        X = sparse.hstack(
+            [sparse.csr_matrix(base.to_numpy(dtype=np.float64)), encoded], format="csr"
+        )
+        return X, y_residual, roas_last
+
+    X = pd.concat([base, encoded], axis=1)
+    return X, y_residual, roas_last
+
+
+def _take_rows(X: Union[pd.DataFrame, "sparse.csr_matrix"], mask: np.ndarray):
+    return X.iloc[mask] if isinstance(X, pd.DataFrame) else X[mask]
+
+
+def _base_columns(feature_df: pd.DataFrame) -> List[str]:
+    return [
         col
         for col in feature_df.columns
-        if col not in exclude_cols and not col.startswith("month_")
-        and not col.startswith("platform_")
+        if col not in NON_FEATURE_COLUMNS and pd.api.types.is_numeric_dtype(feature_df[col])
     ]
-    month_cols = sorted([col for col in feature_df.columns if col.startswith("month_")])
-    platform_cols = sorted(
-        [col for col in feature_df.columns if col.startswith("platform_")]
-    )
 
-    feature_cols = base_cols + month_cols + platform_cols
-    feature_cols = [col for col in feature_cols if col != "residual"]
 
-    X = feature_df[feature_cols].copy()
-    y_residual = feature_df["residual"].copy()
-    roas_last = feature_df[residual_col].copy()
-    return X, y_residual, roas_last
+def feature_matrix_columns(feature_df: pd.DataFrame, encoder: CategoricalEncoder) -> List[str]:
+    """Column names of ``build_feature_matrix`` output, also for sparse X."""
+    return _base_columns(feature_df) + encoder.feature_names_
 
 
 def time_series_split_masks(
@@ -196,6 +245,9 @@ def train_residual_random_forest(
     """
     Tune and fit a RandomForestRegressor on residuals.
     """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import RandomizedSearchCV, TimeSeriesSplit
+
     rf = RandomForestRegressor(
         bootstrap=True,
         random_state=random_state,
@@ -218,7 +270,8 @@ def train_residual_random_forest(
         random_state=random_state,
         verbose=0,
     )
-    search.fit(X_train, y_train)
+    with stage("randomized_search_fit", rows_in=X_train.shape[0]):
+        search.fit(X_train, y_train)
     return search.best_estimator_
 
 
@@ -227,6 +280,8 @@ def evaluate_predictions(
     y_pred: np.ndarray,
 ) -> Dict[str, float]:
     """Return MAE, RMSE, and R² metrics."""
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
     return {
         "mae": float(mean_absolute_error(y_true, y_pred)),
         "rmse": float(mean_squared_error(y_true, y_pred) ** 0.5),
@@ -240,9 +295,15 @@ def run_week2_pipeline(
     metrics_dir: Optional[Path] = None,
     test_size: float = 0.2,
     lag_days: int = 7,
+    region: str = "US",
+    encoding: str = "onehot",
 ) -> ModelArtifacts:
     """
     Execute the Week 2 modeling workflow end-to-end.
+
+    ``encoding`` selects how month/platform enter the model (see
+    ``encoding.ENCODINGS``); the fitted encoder is saved next to the model,
+    together with a ``DriftMonitor`` of the training inputs.
     """
     models_dir.mkdir(parents=True, exist_ok=True)
     if metrics_dir:
@@ -250,14 +311,25 @@ def run_week2_pipeline(
     else:
         metrics_dir = models_dir
 
-    feature_df = prepare_daily_features(integrated_path, lag_days=lag_days)
-    X, y_residual, roas_last = build_feature_matrix(feature_df, lag_days=lag_days)
-
+    feature_df = prepare_daily_features(integrated_path, lag_days=lag_days, region=region)
     train_mask, test_mask = time_series_split_masks(feature_df["date"], test_size)
-    X_train, X_test = X.iloc[train_mask], X.iloc[test_mask]
-    y_train, y_test = y_residual.iloc[train_mask], y_residual.iloc[test_mask]
-    roas_train_last = roas_last.iloc[train_mask]
-    roas_test_last = roas_last.iloc[test_mask]
+
+    encoder = CategoricalEncoder(encoding)
+    if encoding == "target":
+        # Target statistics may only come from the training period: train rows
+        # get out-of-fold means, test rows the full training means.
+        X_train, y_train, roas_train_last = build_feature_matrix(
+            feature_df.loc[train_mask], lag_days=lag_days, encoder=encoder
+        )
+        X_test, y_test, roas_test_last = build_feature_matrix(
+            feature_df.loc[test_mask], lag_days=lag_days, encoder=encoder
+        )
+    else:
+        X, y_residual, roas_last = build_feature_matrix(feature_df, lag_days=lag_days, encoder=encoder)
+        X_train, X_test = _take_rows(X, train_mask), _take_rows(X, test_mask)
+        y_train, y_test = y_residual.iloc[train_mask], y_residual.iloc[test_mask]
+        roas_train_last = roas_last.iloc[train_mask]
+        roas_test_last = roas_last.iloc[test_mask]
     roas_train_actual = feature_df.loc[train_mask, "roas"]
     roas_test_actual = feature_df.loc[test_mask, "roas"]
 
@@ -273,25 +345,82 @@ def run_week2_pipeline(
         "train": evaluate_predictions(roas_train_actual, train_roas_pred),
         "test": evaluate_predictions(roas_test_actual, test_roas_pred),
         "baseline": {
-            "mae": float(mean_absolute_error(roas_test_actual, roas_test_last)),
+            "mae": evaluate_predictions(roas_test_actual, roas_test_last)["mae"],
         },
     }
 
     model_path = models_dir / "random_forest_roas.pkl"
     metrics_path = metrics_dir / "random_forest_roas_metrics.json"
 
+    encoder_path = models_dir / "feature_encoder.pkl"
+    drift_path = models_dir / "drift_monitor.json"
+
+    if not isinstance(X_train, pd.DataFrame):
+        train_df = feature_df.loc[train_mask]
+        X_train = pd.DataFrame(X_train.toarray(), columns=feature_matrix_columns(train_df, encoder))
+    train_dates = feature_df.loc[train_mask, "date"]
+    monitor = DriftMonitor.from_training(
+        X_train,
+        dates=train_dates,
+        trained_at=train_dates.max().strftime("%Y-%m-%d"),
+        report_only=[col for col in X_train.columns if col in DATE_FEATURES or col.startswith("month_")],
+    )
+
     pd.to_pickle(model, model_path)
+    pd.to_pickle(encoder, encoder_path)
+    monitor.save(drift_path)
     metrics_path.write_text(json.dumps(metrics, indent=2), encoding="utf-8")
 
-    return ModelArtifacts(model_path=model_path, metrics_path=metrics_path)
+    return ModelArtifacts(
+        model_path=model_path,
+        metrics_path=metrics_path,
+        encoder_path=encoder_path,
+        drift_path=drift_path,
+    )
+
+
+def feed_drift_monitor(
+    integrated_path: Path,
+    models_dir: Path,
+    lag_days: int = 7,
+    region: str = "US",
+) -> DriftMonitor:
+    """
+    Add the feature rows of ``integrated_path`` dated after the saved
+    monitor's ``trained_at`` to its live window and save it.
+
+    Days already in the live window are skipped, so re-running on the same
+    data does not count them twice.
+    """
+    monitor_path = models_dir / "drift_monitor.json"
+    monitor = DriftMonitor.load(monitor_path)
+    features = prepare_daily_features(integrated_path, lag_days=lag_days, region=region)
+    new = ~features["date"].dt.strftime("%Y-%m-%d").isin(list(monitor.days))
+    if monitor.trained_at is not None:
+        new &= features["date"] > pd.Timestamp(monitor.trained_at)
+    features = features.loc[new].reset_index(drop=True)
+    if features.empty:
+        return monitor
+
+    encoder = pd.read_pickle(models_dir / "feature_encoder.pkl")
+    X, _, _ = build_feature_matrix(features, lag_days=lag_days, encoder=encoder)
+    if not isinstance(X, pd.DataFrame):
+        X = pd.DataFrame(X.toarray(), columns=feature_matrix_columns(features, encoder))
+    monitor.update(X, dates=features["date"])
+    monitor.save(monitor_path)
+    return monitor
 
 
 __all__ = [
     "ModelArtifacts",
+    "aggregate_daily",
+    "add_calendar_columns",
     "prepare_daily_features",
     "build_feature_matrix",
+    "feature_matrix_columns",
     "time_series_split_masks",
     "train_residual_random_forest",
     "evaluate_predictions",
     "run_week2_pipeline",
+    "feed_drift_monitor",
 ]
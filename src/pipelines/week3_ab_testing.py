@@ -6,24 +6,25 @@ Provides reusable helpers to:
 2. load/clean archival test results,
 3. run Welch's t-test with effect sizes, and
 4. generate summary tables, figures, and a Markdown report.
+
+scipy and the plotting stack are imported inside the functions that need them,
+so importing this module does not pull them in.
 """
 
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
-from scipy import stats
-
 
-plt.rcParams["font.sans-serif"] = ["DejaVu Sans"]
-plt.rcParams["axes.unicode_minus"] = False
+from .hashing import frame_digest
+from .instrumentation import instrumented
+from .rendering import FigureTemplate, RenderConfig, render_figure, run_render_jobs
 
 
 @dataclass
@@ -35,6 +36,41 @@ class ABTestOutputs:
     report_md: Path
 
 
+@dataclass
+class ExperimentFigures:
+    """One experiment whose figures should be (re-)rendered."""
+
+    data_dir: Path
+    figures_dir: Path
+    learning_period: int = 7
+    render_config: Optional[RenderConfig] = None
+
+
+# Arm parameters of the demo experiment (see ``simulate_creative``).
+CREATIVE_A = dict(
+    spend_mean=1180,
+    spend_std=110,
+    imp_mean=88000,
+    imp_std=9000,
+    ctr_mean=0.026,
+    ctr_std=0.0022,
+    cvr_mean=0.031,
+    cvr_std=0.0028,
+    learning_penalty=0.82,
+)
+CREATIVE_B = dict(
+    spend_mean=1195,
+    spend_std=115,
+    imp_mean=90500,
+    imp_std=9500,
+    ctr_mean=0.0285,
+    ctr_std=0.0024,
+    cvr_mean=0.0345,
+    cvr_std=0.0030,
+    learning_penalty=0.86,
+)
+
+
 def simulate_creative(
     name: str,
     num_days: int,
@@ -49,19 +85,26 @@ def simulate_creative(
     learning_period: int,
     learning_penalty: float,
     avg_order_value: float = 86.0,
+    rng: Optional[np.random.Generator] = None,
 ) -> pd.DataFrame:
-    """Generate day-level metrics for a creative arm."""
+    """
+    Generate day-level metrics for a creative arm.
+
+    Draws come from ``rng`` only (a fresh unseeded generator if omitted), so
+    arms simulated from independent streams do not depend on call order.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
     days = np.arange(1, num_days + 1)
-    spend = np.random.normal(spend_mean, spend_std, num_days)
+    spend = rng.normal(spend_mean, spend_std, num_days)
     spend = np.clip(spend, spend_mean * 0.75, spend_mean * 1.35)
 
-    impressions = np.random.normal(imp_mean, imp_std, num_days)
+    impressions = rng.normal(imp_mean, imp_std, num_days)
     impressions = np.clip(impressions, imp_mean * 0.7, imp_mean * 1.4).astype(int)
 
-    ctr = np.random.normal(ctr_mean, ctr_std, num_days)
+    ctr = rng.normal(ctr_mean, ctr_std, num_days)
     ctr = np.clip(ctr, 0.005, None)
 
-    cvr = np.random.normal(cvr_mean, cvr_std, num_days)
+    cvr = rng.normal(cvr_mean, cvr_std, num_days)
     cvr = np.clip(cvr, 0.003, None)
 
     ctr[:learning_period] *= learning_penalty
@@ -97,45 +140,43 @@ def simulate_creative(
     )
 
 
+def _simulate_arm(arm: Tuple[str, Dict[str, float], np.random.SeedSequence, int, int]) -> pd.DataFrame:
+    name, params, stream, num_days, learning_period = arm
+    return simulate_creative(
+        name=name,
+        num_days=num_days,
+        learning_period=learning_period,
+        rng=np.random.default_rng(stream),
+        **params,
+    )
+
+
 def simulate_dataset(
     output_dir: Path,
     random_seed: int = 20241012,
     learning_period: int = 7,
     num_days: int = 35,
+    max_workers: Optional[int] = 1,
 ) -> Dict[str, Path]:
-    """Generate Creative A/B CSVs for demo purposes."""
-    output_dir.mkdir(parents=True, exist_ok=True)
-    np.random.seed(random_seed)
+    """
+    Generate Creative A/B CSVs for demo purposes.
 
-    creative_a = simulate_creative(
-        name="A",
-        num_days=num_days,
-        spend_mean=1180,
-        spend_std=110,
-        imp_mean=88000,
-        imp_std=9000,
-        ctr_mean=0.026,
-        ctr_std=0.0022,
-        cvr_mean=0.031,
-        cvr_std=0.0028,
-        learning_period=learning_period,
-        learning_penalty=0.82,
-    )
+    Each arm draws from its own child of ``SeedSequence(random_seed)``, so the
+    output is identical whatever ``max_workers``; any value other than 1
+    simulates the arms on a process pool.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stream_a, stream_b = np.random.SeedSequence(random_seed).spawn(2)
+    arms = [
+        ("A", CREATIVE_A, stream_a, num_days, learning_period),
+        ("B", CREATIVE_B, stream_b, num_days, learning_period),
+    ]
 
-    creative_b = simulate_creative(
-        name="B",
-        num_days=num_days,
-        spend_mean=1195,
-        spend_std=115,
-        imp_mean=90500,
-        imp_std=9500,
-        ctr_mean=0.0285,
-        ctr_std=0.0024,
-        cvr_mean=0.0345,
-        cvr_std=0.0030,
-        learning_period=learning_period,
-        learning_penalty=0.86,
-    )
+    if max_workers == 1:
+        creative_a, creative_b = [_simulate_arm(arm) for arm in arms]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            creative_a, creative_b = pool.map(_simulate_arm, arms)
 
     path_a = output_dir / "creative_a.csv"
     path_b = output_dir / "creative_b.csv"
@@ -187,12 +228,15 @@ def summarise_metrics(
     return pd.DataFrame(rows)
 
 
+@instrumented()
 def run_ttests(
     creative_a: pd.DataFrame,
     creative_b: pd.DataFrame,
     metrics: Iterable[str] = ("roas", "cpa", "ctr", "cvr"),
 ) -> pd.DataFrame:
     """Execute Welch's t-test and compute effect sizes."""
+    from scipy import stats
+
     rows = []
     for metric in metrics:
         a = creative_a[metric]
@@ -216,60 +260,91 @@ def run_ttests(
     return pd.DataFrame(rows)
 
 
+TREND_TEMPLATE = FigureTemplate(name="ab_test_roas_trend", figsize=(10, 5))
+DISTRIBUTION_TEMPLATE = FigureTemplate(
+    name="ab_test_comparison",
+    figsize=(14, 10),
+    nrows=2,
+    ncols=2,
+    style="whitegrid",
+)
+
+
+@instrumented()
 def plot_trend(
     creative_a: pd.DataFrame,
     creative_b: pd.DataFrame,
     learning_period: int,
     output_dir: Path,
+    render_config: Optional[RenderConfig] = None,
 ) -> Path:
     """Plot ROAS trend with learning period highlighted."""
     output_dir.mkdir(parents=True, exist_ok=True)
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.plot(creative_a["day"], creative_a["roas"], marker="o", label="Creative A")
-    ax.plot(creative_b["day"], creative_b["roas"], marker="o", label="Creative B")
-    ax.axvspan(1, learning_period, color="gray", alpha=0.15, label="Learning period")
-    ax.set_xlabel("Day")
-    ax.set_ylabel("ROAS")
-    ax.set_title("Daily ROAS trend (learning period shaded)")
-    ax.legend()
-    fig.tight_layout()
-    path = output_dir / "ab_test_roas_trend.png"
-    fig.savefig(path, dpi=300)
-    plt.close(fig)
-    return path
+
+    def draw(fig, axes) -> None:
+        ax = axes[0, 0]
+        ax.plot(creative_a["day"], creative_a["roas"], marker="o", label="Creative A")
+        ax.plot(creative_b["day"], creative_b["roas"], marker="o", label="Creative B")
+        ax.axvspan(1, learning_period, color="gray", alpha=0.15, label="Learning period")
+        ax.set_xlabel("Day")
+        ax.set_ylabel("ROAS")
+        ax.set_title("Daily ROAS trend (learning period shaded)")
+        ax.legend()
+
+    data_hash = frame_digest(
+        creative_a[["day", "roas"]],
+        creative_b[["day", "roas"]],
+        extra={"learning_period": learning_period},
+    )
+    return render_figure(
+        TREND_TEMPLATE,
+        draw,
+        output_dir / "ab_test_roas_trend",
+        data_hash,
+        render_config,
+    )
 
 
+@instrumented()
 def plot_distributions(
     creative_a: pd.DataFrame,
     creative_b: pd.DataFrame,
     output_dir: Path,
     metrics: Iterable[str] = ("roas", "cpa", "ctr", "cvr"),
+    render_config: Optional[RenderConfig] = None,
 ) -> Path:
     """Create boxplots comparing distributions across creatives."""
     output_dir.mkdir(parents=True, exist_ok=True)
-    sns.set_theme(style="whitegrid")
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    metrics = list(metrics)
     metric_titles = {"roas": "ROAS", "cpa": "CPA", "ctr": "CTR", "cvr": "CVR"}
-    for idx, metric in enumerate(metrics):
-        ax = axes[idx // 2, idx % 2]
-        plot_df = pd.DataFrame(
-            {
-                metric: pd.concat(
-                    [creative_a[metric], creative_b[metric]],
-                    ignore_index=True,
-                ),
-                "Creative": ["A"] * len(creative_a) + ["B"] * len(creative_b),
-            }
-        )
-        sns.boxplot(data=plot_df, x="Creative", y=metric, ax=ax)
-        ax.set_title(f"{metric_titles[metric]} distribution")
-        ax.set_xlabel("Creative")
-        ax.set_ylabel(metric_titles[metric])
-    fig.tight_layout()
-    path = output_dir / "ab_test_comparison.png"
-    fig.savefig(path, dpi=300)
-    plt.close(fig)
-    return path
+
+    def draw(fig, axes) -> None:
+        import seaborn as sns
+
+        for idx, metric in enumerate(metrics):
+            ax = axes[idx // 2, idx % 2]
+            plot_df = pd.DataFrame(
+                {
+                    metric: pd.concat(
+                        [creative_a[metric], creative_b[metric]],
+                        ignore_index=True,
+                    ),
+                    "Creative": ["A"] * len(creative_a) + ["B"] * len(creative_b),
+                }
+            )
+            sns.boxplot(data=plot_df, x="Creative", y=metric, ax=ax)
+            ax.set_title(f"{metric_titles[metric]} distribution")
+            ax.set_xlabel("Creative")
+            ax.set_ylabel(metric_titles[metric])
+
+    data_hash = frame_digest(creative_a[metrics], creative_b[metrics])
+    return render_figure(
+        DISTRIBUTION_TEMPLATE,
+        draw,
+        output_dir / "ab_test_comparison",
+        data_hash,
+        render_config,
+    )
 
 
 def build_report(
@@ -321,6 +396,7 @@ def run_week3_pipeline(
     figures_dir: Path,
     reports_dir: Path,
     learning_period: int = 7,
+    render_config: Optional[RenderConfig] = None,
 ) -> ABTestOutputs:
     """Execute A/B test analysis end-to-end."""
     figures_dir.mkdir(parents=True, exist_ok=True)
@@ -336,8 +412,12 @@ def run_week3_pipeline(
     summary.to_csv(summary_path, index=False)
     ttest.to_csv(ttest_path, index=False)
 
-    trend_path = plot_trend(creative_a, creative_b, learning_period, figures_dir)
-    boxplot_path = plot_distributions(a_stable, b_stable, figures_dir)
+    trend_path = plot_trend(
+        creative_a, creative_b, learning_period, figures_dir, render_config=render_config
+    )
+    boxplot_path = plot_distributions(
+        a_stable, b_stable, figures_dir, render_config=render_config
+    )
 
     report_path = reports_dir / "ab_test_report.md"
     build_report(
@@ -357,8 +437,46 @@ def run_week3_pipeline(
     )
 
 
+def _render_experiment(experiment: ExperimentFigures) -> Tuple[Path, Path]:
+    creative_a, creative_b = load_creatives(experiment.data_dir)
+    a_stable, b_stable = strip_learning_period(
+        creative_a, creative_b, experiment.learning_period
+    )
+    trend_path = plot_trend(
+        creative_a,
+        creative_b,
+        experiment.learning_period,
+        experiment.figures_dir,
+        render_config=experiment.render_config,
+    )
+    boxplot_path = plot_distributions(
+        a_stable,
+        b_stable,
+        experiment.figures_dir,
+        render_config=experiment.render_config,
+    )
+    return trend_path, boxplot_path
+
+
+def render_experiment_figures(
+    experiments: Iterable[ExperimentFigures],
+    max_workers: Optional[int] = None,
+) -> List[Tuple[Path, Path]]:
+    """
+    Render trend and distribution figures for several experiments.
+
+    Experiments are spread over worker processes using the Agg backend; pass
+    ``max_workers=1`` to render serially in the current process.  Returns the
+    (trend, boxplot) paths in the order of ``experiments``.
+    """
+    return run_render_jobs(_render_experiment, list(experiments), max_workers=max_workers)
+
+
 __all__ = [
     "ABTestOutputs",
+    "CREATIVE_A",
+    "CREATIVE_B",
+    "ExperimentFigures",
     "simulate_creative",
     "simulate_dataset",
     "load_creatives",
@@ -367,6 +485,7 @@ __all__ = [
     "run_ttests",
     "plot_trend",
     "plot_distributions",
+    "render_experiment_figures",
     "build_report",
     "run_week3_pipeline",
 ]
@@ -0,0 +1,17 @@
+"""Reproducibility of the Week 3 creative simulator."""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from src.pipelines.week3_ab_testing import simulate_dataset
+
+
+def test_simulate_dataset_does_not_depend_on_worker_count(tmp_path):
+    serial = simulate_dataset(tmp_path / "serial", random_seed=7, max_workers=1)
+    pooled = simulate_dataset(tmp_path / "pooled", random_seed=7, max_workers=2)
+
+    for key, path in serial.items():
+        pd.testing.assert_frame_equal(pd.read_csv(path), pd.read_csv(pooled[key]))
+        assert path.read_bytes() == pooled[key].read_bytes()
+